@@ -0,0 +1,119 @@
+"""
+Resumable, multi-process frame rendering.
+
+Frame `f` of the zoom and of the volume camera path depends only on `f` and
+the keyframes, so frames can be rendered in any order by any process:
+
+    render_batch(setup, range(720), './frames/zoom', 'zoom', workers=16)
+
+`setup` is a picklable, zero-argument callable (a module level function of
+the script) which runs once in every worker and returns `render(f) -> image`.
+Workers are started with `spawn`, so each one builds its own canvas / OpenGL
+context (or CPU renderer) instead of inheriting the parent's.
+
+Frames that already exist are skipped, so a crashed or interrupted batch is
+resumed by running it again. Frames are written to a temporary file and then
+renamed, so a frame on disk is always complete.
+"""
+
+import multiprocessing as mp
+from pathlib import Path
+from time import time
+import subprocess
+import os
+
+import vispy.io as io
+
+_render = None
+
+
+def format_eta(seconds):
+    """ seconds -> 'h:mm' """
+    minutes = int(round(seconds / 60))
+    return f"{minutes // 60}:{str(minutes % 60).zfill(2)}"
+
+
+def frame_path(directory, name, f):
+    return Path(directory) / f'{name}_{f}.png'
+
+
+def write_png_atomic(path, image):
+    """ write to a temporary name, then rename : never leaves half a frame """
+    path = Path(path)
+    tmp = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    io.write_png(str(tmp), image)
+    os.replace(tmp, path)
+
+
+def _init_worker(setup):
+    global _render
+    _render = setup()
+
+
+def _render_frame(job):
+    f, path = job
+    start = time()
+    write_png_atomic(path, _render(f))
+    return f, time() - start
+
+
+def render_batch(setup, frames, directory, name, workers=None, offset=0):
+    """
+        Render `frames` across `workers` processes into
+        `{directory}/{name}_{f + offset}.png`, skipping frames on disk
+
+        Frames are handed out one at a time, so slow frames (deep zooms,
+        dense volumes) don't leave other workers idle. Progress is reported
+        with a combined ETA from the throughput of all workers.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count()
+    frames = list(frames)
+
+    jobs = [(f, frame_path(directory, name, f + offset)) for f in frames]
+    jobs = [(f, p) for f, p in jobs if not p.exists()]
+
+    # stale temporaries from a crashed run
+    for tmp in directory.glob(f'{name}_*.png.*.tmp'):
+        tmp.unlink()
+
+    skipped = len(frames) - len(jobs)
+
+    print(f"BATCH >>> {name}: {len(jobs)} frames to render,"
+          f" {skipped} already done, {workers} workers")
+
+    if not jobs:
+        return
+
+    start = time()
+    ctx = mp.get_context('spawn')
+
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(setup,)) as pool:
+
+        for done, (f, seconds) in enumerate(
+                        pool.imap_unordered(_render_frame, jobs), start=1):
+
+            elapsed = time() - start
+            ETA = elapsed / done * (len(jobs) - done)
+
+            print(f">>> FRAME: {name}_{f + offset}.png in {round(seconds, 2)}s,"
+                  f" ETA {format_eta(ETA)}, {done + skipped} / {len(frames)}")
+
+    print(f"BATCH >>> {name}: done in {format_eta(time() - start)}")
+
+
+def encode_sequence(directory, name, out, fps=24, start_number=0,
+                        codec=('-c:v', 'prores_ks', '-profile:v', '3')):
+    """ encode `{directory}/{name}_%d.png` into the movie `out` """
+
+    cmd = (['ffmpeg', '-y', '-f', 'image2', '-framerate', str(fps),
+            '-start_number', str(start_number),
+            '-i', str(Path(directory) / f'{name}_%d.png')]
+           + list(codec) + [str(out)])
+
+    print('CONVERTING >>>', ' '.join(cmd))
+
+    return subprocess.run(cmd).returncode
@@ -0,0 +1,271 @@
+"""
+Headless CPU ray marcher for the triplebrot volume.
+
+`canvas.render()` in logistic_mandelbrot.py needs an OpenGL context. This is a
+Numba port of the same image formation, so frames can be rendered on machines
+without a display or a GPU:
+
+    - the ray setup of vispy's volume shader (enter at the front face of the
+      box, `nsteps = length / relative_step_size`)
+    - NEW_TRANSLUCENT_SNIPPETS : front to back compositing with val as alpha,
+      stopping once the accumulated alpha passes 0.99
+    - the colormap and color limits of the volume visual
+    - the TurntableCamera (azimuth, elevation, roll, distance, fov, center)
+
+Rows of pixels are distributed over all cores with `prange`.
+"""
+
+from numba import njit, prange
+import numpy as np
+import math
+
+from vispy.util import transforms
+from vispy.color import get_colormap
+
+
+def colormap_lut(cmap, n=1024):
+    """ sample a vispy colormap into an (n, 4) float32 lookup table """
+    return get_colormap(cmap).map(np.linspace(0, 1, n)).astype(np.float32)
+
+
+class HeadlessCamera:
+    """
+        Stand-in for `scene.cameras.TurntableCamera` with the attributes
+        `camera_move` animates, and the same camera to scene mapping.
+
+        size : (width, height) of the frame, used for the aspect ratio
+    """
+
+    def __init__(self, fov=2.0, size=(1280, 720), elevation=30.0,
+                        azimuth=30.0, roll=0.0, distance=None,
+                        center=(0.0, 0.0, 0.0), up='+z'):
+
+        if up != '+z':
+            raise ValueError(f"HeadlessCamera only supports up='+z', got {up!r}")
+
+        self.fov = fov
+        self.size = size
+        self.elevation = elevation
+        self.azimuth = azimuth
+        self.roll = roll
+        self.distance = distance
+        self.center = tuple(center)
+
+    def matrix(self):
+        """ camera -> scene transform (vispy row-vector convention) """
+
+        up = np.array((0, 0, 1))
+        forward = np.array((0, 1, 0))
+        right = np.cross(forward, up)
+
+        pp1 = np.array([(0, 0, 0), (0, 0, -1), (1, 0, 0), (0, 1, 0)])
+        pp2 = np.array([(0, 0, 0), forward, right, up])
+
+        rotation = (transforms.rotate(self.elevation, -right)
+                    .dot(transforms.rotate(self.azimuth, up))
+                    .dot(transforms.rotate(self.roll, forward)))
+
+        return np.linalg.multi_dot((
+            transforms.affine_map(pp1, pp2).T,
+            transforms.translate(-self.distance * forward),
+            rotation,
+            transforms.translate(self.center),
+        ))
+
+    def rays(self):
+        """ ray origin (3,) and per pixel directions (h, w, 3) in scene
+            coordinates; row 0 is the top of the frame like canvas.render()
+        """
+
+        w, h = self.size
+        M = self.matrix()
+
+        tan = math.tan(math.radians(max(0.01, self.fov)) / 2)
+
+        # pixel centres in normalized device coordinates
+        nx = (2 * (np.arange(w) + 0.5) / w - 1) * tan * (w / h)
+        ny = (1 - 2 * (np.arange(h) + 0.5) / h) * tan
+
+        dirs = np.empty((h, w, 3))
+        dirs[..., 0] = nx[None, :]
+        dirs[..., 1] = ny[:, None]
+        dirs[..., 2] = -1
+
+        origin = M[3, :3]
+        dirs = dirs @ M[:3, :3]
+
+        return origin, dirs
+
+
+def volume_center(matrix, shape):
+    """ scene position of the centre of a volume placed with `matrix`,
+        i.e. where `set_range` puts the camera center """
+
+    corners = np.array([[x, y, z, 1]
+                            for x in (-0.5, shape[2] - 0.5)
+                            for y in (-0.5, shape[1] - 0.5)
+                            for z in (-0.5, shape[0] - 0.5)])
+
+    scene = corners @ matrix
+    scene = scene[:, :3] / scene[:, 3:]
+
+    return tuple((scene.min(axis=0) + scene.max(axis=0)) / 2)
+
+
+@njit(cache=True)
+def sample(vol, x, y, z):
+    """ trilinear sample at data coordinates x (axis 2), y (axis 1),
+        z (axis 0), clamped to the edges like the volume texture """
+
+    nz, ny, nx = vol.shape
+
+    x = min(max(x, 0.0), nx - 1.0)
+    y = min(max(y, 0.0), ny - 1.0)
+    z = min(max(z, 0.0), nz - 1.0)
+
+    i0 = min(int(x), nx - 2) if nx > 1 else 0
+    j0 = min(int(y), ny - 2) if ny > 1 else 0
+    k0 = min(int(z), nz - 2) if nz > 1 else 0
+
+    i1 = min(i0 + 1, nx - 1)
+    j1 = min(j0 + 1, ny - 1)
+    k1 = min(k0 + 1, nz - 1)
+
+    fx = x - i0
+    fy = y - j0
+    fz = z - k0
+
+    c00 = vol[k0, j0, i0] * (1 - fx) + vol[k0, j0, i1] * fx
+    c01 = vol[k0, j1, i0] * (1 - fx) + vol[k0, j1, i1] * fx
+    c10 = vol[k1, j0, i0] * (1 - fx) + vol[k1, j0, i1] * fx
+    c11 = vol[k1, j1, i0] * (1 - fx) + vol[k1, j1, i1] * fx
+
+    c0 = c00 * (1 - fy) + c01 * fy
+    c1 = c10 * (1 - fy) + c11 * fy
+
+    return c0 * (1 - fz) + c1 * fz
+
+
+@njit(cache=True, parallel=True)
+def march(vol, lut, clim0, clim1, origin, dirs, step_size, bgcolor, image):
+    """
+        Core of the ray marcher.
+
+        origin, dirs : ray origin and directions in data coordinates
+        image        : (h, w, 4) uint8 output
+    """
+
+    h, w, _ = dirs.shape
+    nz, ny, nx = vol.shape
+    n_lut = lut.shape[0]
+
+    lo = (-0.5, -0.5, -0.5)
+    hi = (nx - 0.5, ny - 0.5, nz - 0.5)
+
+    for row in prange(h):
+        for col in range(w):
+
+            d = dirs[row, col]
+
+            # slab intersection with the volume box
+            t_near = -1e30
+            t_far = 1e30
+
+            for a in range(3):
+                if abs(d[a]) < 1e-12:
+                    if origin[a] < lo[a] or origin[a] > hi[a]:
+                        t_near = 1e30
+                    continue
+                t0 = (lo[a] - origin[a]) / d[a]
+                t1 = (hi[a] - origin[a]) / d[a]
+                t_near = max(t_near, min(t0, t1))
+                t_far = min(t_far, max(t0, t1))
+
+            t_near = max(t_near, 0.0)
+
+            r = 0.0
+            g = 0.0
+            b = 0.0
+            alpha = 0.0
+
+            nsteps = int((t_far - t_near) / step_size + 0.5)
+
+            if t_far > t_near and nsteps >= 1:
+
+                dt = (t_far - t_near) / nsteps
+
+                # before_loop : integrated_color = vec4(0)
+                for it in range(nsteps):
+
+                    t = t_near + it * dt
+
+                    val = sample(vol,
+                                 origin[0] + t * d[0],
+                                 origin[1] + t * d[1],
+                                 origin[2] + t * d[2])
+
+                    val = (val - clim0) / (clim1 - clim0)
+                    val = min(max(val, 0.0), 1.0)
+
+                    c = lut[int(val * (n_lut - 1) + 0.5)]
+
+                    # in_loop : val is used as the alpha of the sample
+                    a1 = alpha
+                    a2 = val * (1 - a1)
+                    alpha = max(a1 + a2, 0.001)
+
+                    r = r * a1 / alpha + c[0] * a2 / alpha
+                    g = g * a1 / alpha + c[1] * a2 / alpha
+                    b = b * a1 / alpha + c[2] * a2 / alpha
+
+                    if alpha > 0.99:
+                        # stop integrating if the fragment becomes opaque
+                        break
+
+            # after_loop + translucent blending over the canvas background
+            out_a = alpha + bgcolor[3] * (1 - alpha)
+
+            image[row, col, 0] = int(255 * min(1.0, r * alpha + bgcolor[0] * (1 - alpha)) + 0.5)
+            image[row, col, 1] = int(255 * min(1.0, g * alpha + bgcolor[1] * (1 - alpha)) + 0.5)
+            image[row, col, 2] = int(255 * min(1.0, b * alpha + bgcolor[2] * (1 - alpha)) + 0.5)
+            image[row, col, 3] = int(255 * min(1.0, out_a) + 0.5)
+
+
+def render_volume(vol, matrix, camera, lut, clim=None,
+                    relative_step_size=0.8, bgcolor=(0, 0, 0, 1)):
+    """
+        Render one RGBA frame of `vol` without OpenGL
+
+        vol     : (z, y, x) data, as handed to the volume visual
+        matrix  : 4x4 volume -> scene transform (`visual.transform.matrix`)
+        camera  : HeadlessCamera
+        lut     : colormap lookup table from `colormap_lut`
+        clim    : color limits, defaults to the data range like vispy
+
+        returns an (h, w, 4) uint8 image, same layout as canvas.render()
+    """
+
+    if clim is None:
+        clim = (float(vol.min()), float(vol.max()))
+
+    origin, dirs = camera.rays()
+
+    # rays into data coordinates; the transform is affine, rays stay rays
+    inv = np.linalg.inv(matrix)
+    origin = (np.append(origin, 1) @ inv)[:3]
+    dirs = dirs @ inv[:3, :3]
+
+    # step sizes are in voxels, as in the shader
+    dirs /= np.linalg.norm(dirs, axis=-1, keepdims=True)
+
+    w, h = camera.size
+    image = np.empty((h, w, 4), dtype=np.uint8)
+
+    clim1 = clim[1] if clim[1] != clim[0] else clim[0] + 1
+
+    march(vol, lut, float(clim[0]), float(clim1),
+            np.ascontiguousarray(origin), np.ascontiguousarray(dirs),
+            float(relative_step_size), np.asarray(bgcolor, dtype=np.float64),
+            image)
+
+    return image
@@ -0,0 +1,201 @@
+"""
+Frame sinks for recording animations.
+
+Before, every frame was written as a PNG on the render thread, `ffmpeg` was
+run over the image sequence after the last frame, and then the PNGs were
+deleted. A sink takes frames off the render thread instead:
+
+    sink = FFmpegSink('movie.mov', fps=24)
+    for f in frames:
+        sink.write(canvas.render(), f)  # blocks only if the queue is full
+    sink.close()                        # flush, wait for the encoder
+
+Frames go through a bounded queue to a worker thread. `FFmpegSink` pipes the
+raw RGBA bytes into an `ffmpeg` subprocess, so nothing touches the disk but
+the movie. `PNGSink` writes numbered PNGs, as before, for when the image
+sequence is wanted.
+"""
+
+from threading import Thread
+from pathlib import Path
+import subprocess
+import queue
+import os
+
+import numpy as np
+import vispy.io as io
+
+_DONE = object()
+
+# ffmpeg output arguments per movie container
+CODECS = {
+    'mov': ('-c:v', 'prores_ks', '-profile:v', '3'),
+    'mp4': ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '18'),
+}
+
+
+class FrameSink:
+    """
+        Base class : a bounded queue drained by a worker thread
+
+        queue_size : frames held in memory before `write` blocks
+    """
+
+    def __init__(self, queue_size=8):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._closed = False
+        self.frames = 0
+
+        self._worker = Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+
+            if item is _DONE:
+                break
+
+            if self._error is not None:
+                continue  # drain, so the render thread never deadlocks
+
+            try:
+                self.consume(*item)
+            except Exception as e:
+                self._error = e
+
+        try:
+            self.finish()
+        except Exception as e:
+            self._error = self._error or e
+
+    def _raise(self):
+        if self._error is not None:
+            raise RuntimeError(f"{type(self).__name__} failed") from self._error
+
+    def write(self, image, index=None):
+        """ queue one (h, w, 4) uint8 frame; `index` defaults to a counter """
+
+        if self._closed:
+            raise RuntimeError("write to a closed frame sink")
+
+        self._raise()
+
+        if index is None:
+            index = self.frames
+
+        self._queue.put((image, index))
+        self.frames += 1
+
+    def close(self):
+        """ flush the queue and wait for the worker (and encoder) to finish """
+
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_DONE)
+            self._worker.join()
+
+        self._raise()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- implemented by sinks, run on the worker thread
+
+    def consume(self, image, index):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class PNGSink(FrameSink):
+    """ numbered PNGs : `{directory}/{name}_{index}.png` """
+
+    def __init__(self, directory, name, queue_size=8):
+        self.directory = Path(directory)
+        self.name = name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        super().__init__(queue_size=queue_size)
+
+    def path(self, index):
+        return self.directory / f'{self.name}_{index}.png'
+
+    def consume(self, image, index):
+        io.write_png(str(self.path(index)), image)
+
+
+class FFmpegSink(FrameSink):
+    """
+        Pipe raw RGBA frames into an `ffmpeg` process
+
+        path   : output movie
+        codec  : ffmpeg output arguments, ProRes 422 HQ by default
+        The frame size is taken from the first frame.
+    """
+
+    def __init__(self, path, fps=24, codec=CODECS['mov'],
+                    ffmpeg='ffmpeg', queue_size=8):
+
+        self.path = Path(path)
+        self.fps = fps
+        self.codec = list(codec)
+        self.ffmpeg = ffmpeg
+        self.size = None
+        self._proc = None
+
+        super().__init__(queue_size=queue_size)
+
+    def command(self, width, height):
+        return ([self.ffmpeg, '-y', '-loglevel', 'error',
+                    '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                    '-s', f'{width}x{height}', '-framerate', str(self.fps),
+                    '-i', '-']
+                + self.codec + [str(self.path)])
+
+    def consume(self, image, index):
+
+        h, w = image.shape[:2]
+
+        if self._proc is None:
+            self.size = (w, h)
+            cmd = self.command(w, h)
+            print('ENCODING >>>', ' '.join(cmd))
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+        elif (w, h) != self.size:
+            raise ValueError(f"frame {index} is {w}x{h}, expected"
+                             f" {self.size[0]}x{self.size[1]}")
+
+        frame = np.ascontiguousarray(image, dtype=np.uint8)
+        self._proc.stdin.write(frame.data)
+
+    def finish(self):
+
+        if self._proc is None:
+            return
+
+        self._proc.stdin.close()
+        code = self._proc.wait()
+
+        if code != 0:
+            raise RuntimeError(f"ffmpeg exited with code {code}")
+
+
+def open_sink(kind, directory, name, fps=24, **kwargs):
+    """
+        `kind` is 'png' for an image sequence in `directory`, or a movie
+        extension ('mov', 'mp4', ...) for `{directory}/{name}.{kind}`
+    """
+
+    if kind == 'png':
+        return PNGSink(directory, name, **kwargs)
+
+    kwargs.setdefault('codec', CODECS.get(kind, CODECS['mov']))
+
+    return FFmpegSink(os.path.join(directory, f'{name}.{kind}'),
+                        fps=fps, **kwargs)
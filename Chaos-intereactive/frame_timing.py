@@ -0,0 +1,170 @@
+"""
+Frame timing for the interactive viewers.
+
+Each frame is cut into named spans, by default:
+
+    simulate : computing the points / volume level to show
+    transfer : handing them to the plot items (setData, set_data, uploads)
+    draw     : the repaint itself
+
+    timer = FrameTimer(log='timing.jsonl')
+
+    timer.begin()
+    with timer.span('simulate'):
+        pops = simulate(...)
+    with timer.span('transfer'):
+        line.set_data(pops)
+    ...                            # the draw span is closed by the canvas
+    timer.end()
+
+    timer.summary()  # 'frame 14.1/22.9 ms | simulate 9.8/17.0 | ...'
+
+The last `window` frames are kept per span, and `stats` gives the rolling
+p50 / p95 in milliseconds. With `log` set, every frame is appended to a JSON
+lines file, one object per frame, so runs can be compared afterwards:
+
+    {"name": "...", "index": 12, "t": <unix time>, "simulate": 3.1,
+     "transfer": 0.8, "draw": 5.2, "frame": 9.6}   # durations in ms
+
+Spans outside of `begin` / `end` are ignored, so repaints that aren't caused
+by a new frame (mouse hover, resize) don't pollute the statistics.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter, time
+import json
+
+import numpy as np
+
+STAGES = ('simulate', 'transfer', 'draw')
+
+
+class FrameTimer:
+    """
+        Rolling per-span frame timings
+
+        window : number of frames the statistics are taken over
+        log    : path of a JSON lines log, or None
+        name   : written into each log record, to tell viewers apart
+    """
+
+    def __init__(self, window=240, log=None, name=''):
+
+        self.window = window
+        self.name = name
+        self.frames = 0
+
+        self._history = {stage: deque(maxlen=window)
+                            for stage in STAGES + ('frame',)}
+
+        self._spans = {}
+        self._open = {}
+        self._frame_start = None
+
+        self._log = open(log, 'a') if log else None
+
+    @property
+    def active(self):
+        """ True between `begin` and `end` """
+        return self._frame_start is not None
+
+    def begin(self):
+        """ open a frame; a no-op if one is already open """
+
+        if self._frame_start is None:
+            self._frame_start = perf_counter()
+            self._spans = {}
+
+    def start(self, stage):
+        if self._frame_start is not None:
+            self._open[stage] = perf_counter()
+
+    def stop(self, stage):
+        t0 = self._open.pop(stage, None)
+        if t0 is not None and self._frame_start is not None:
+            self.add(stage, perf_counter() - t0)
+
+    @contextmanager
+    def span(self, stage):
+        """ time the body as (part of) `stage` of the open frame """
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop(stage)
+
+    def add(self, stage, seconds):
+        """ add a duration measured elsewhere (e.g. on a worker thread) """
+        if self._frame_start is not None:
+            self._spans[stage] = self._spans.get(stage, 0.0) + seconds
+
+    def end(self):
+        """ close the open frame and record it; a no-op if none is open """
+
+        if self._frame_start is None:
+            return
+
+        spans = {stage: 1e3 * s for stage, s in self._spans.items()}
+        spans['frame'] = 1e3 * (perf_counter() - self._frame_start)
+
+        for stage, ms in spans.items():
+            if stage not in self._history:
+                self._history[stage] = deque(maxlen=self.window)
+            self._history[stage].append(ms)
+
+        if self._log is not None:
+            record = {'name': self.name, 'index': self.frames, 't': time()}
+            record.update({k: round(v, 3) for k, v in spans.items()})
+            self._log.write(json.dumps(record) + '\n')
+
+        self.frames += 1
+        self._frame_start = None
+        self._open.clear()
+
+    def stats(self):
+        """ {stage: (p50, p95)} in milliseconds over the last `window` frames """
+
+        return {stage: tuple(np.percentile(h, (50, 95)))
+                    for stage, h in self._history.items() if len(h)}
+
+    def summary(self):
+        """ one line of p50/p95 per stage, for an overlay """
+
+        stats = self.stats()
+
+        if 'frame' not in stats:
+            return 'no frames yet'
+
+        p50, p95 = stats.pop('frame')
+        parts = [f'frame {p50:.1f}/{p95:.1f} ms (p50/p95)']
+        parts += [f'{stage} {a:.1f}/{b:.1f}' for stage, (a, b) in stats.items()]
+
+        return ' | '.join(parts)
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def time_canvas_draws(canvas, timer, on_frame=None):
+    """
+        Time the draws of a vispy canvas as the `draw` span, and end the
+        frame once the draw (including the GL flush) is done.
+
+        on_frame : called after each recorded frame, e.g. to refresh an overlay
+    """
+
+    def draw_started(event):
+        timer.start('draw')
+
+    def draw_done(event):
+        recorded = timer.active
+        timer.stop('draw')
+        timer.end()
+        if recorded and on_frame is not None:
+            on_frame()
+
+    canvas.events.draw.connect(draw_started, position='first')
+    canvas.events.draw.connect(draw_done, position='last')
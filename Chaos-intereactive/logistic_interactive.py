@@ -20,13 +20,17 @@ import pyqtgraph as pg
 
 from numba import jit, prange, njit
 import numpy as np
+import math
 
+from functools import lru_cache
 from pathlib import Path
 import sys
 
-from time import time
+from time import time, perf_counter
 import types
 
+from frame_timing import FrameTimer
+
 colors =  {
             'lightest':"#eeeeee",
             'lighter':"#e5e5e5",
@@ -50,6 +54,27 @@ txtfont.setPixelSize(txtlabelsize)
 
 brushes = { k: pg.mkBrush(c) for k, c in colors.items() }
 
+# iterates in the cobweb and time series; past `decimate_above` points in view
+# they are reduced per pixel of the view, so 10**6 stays interactive
+orbit_n = 100
+decimate_above = 4000
+
+# most points kept in the bifurcation plot; the oldest are overwritten
+bifurc_capacity = 200_000
+
+# full bifurcation diagram drawn behind the user's points, computed in the
+# background when the app starts : rates x population bins, in chunks of rates
+backdrop_rates = 2000
+backdrop_bins = 600
+backdrop_chunk = 50
+
+# rolling p50/p95 of the simulate / transfer / draw spans over the plots, and
+# optionally every frame appended to a JSON lines log
+show_timing = False
+timing_log = None # e.g. 'timing_interactive.jsonl'
+
+timing = FrameTimer(log=timing_log, name='logistic_interactive')
+
 pg.setConfigOptions(antialias=True)
 pg.setConfigOption('background', colors['dark'])
 pg.setConfigOption('foreground', colors['light'])
@@ -177,8 +202,9 @@ def get_function_points(model, r, n, start, end):
         x_vals, y_vals
     """
 
-    x_vals = np.linspace(start, end, n)
-    y_vals = [model(x, r) for x in x_vals]
+    x_vals = np.empty(n)
+    y_vals = np.empty(n)
+    function_points_kernel(model, r, start, end, x_vals, y_vals)
     return x_vals, y_vals
 
 def get_cobweb_points(model, r, x, n):
@@ -211,57 +237,179 @@ def get_cobweb_points(model, r, x, n):
         cobweb_x_vals, cobweb_y_vals
     """
 
-    cobweb_points = [(x, 0)]
-    for _ in range(n):
+    x_vals = np.empty(3*n + 1)
+    y_vals = np.empty(3*n + 1)
+    cobweb_points_kernel(model, r, x, x_vals, y_vals)
+    return x_vals, y_vals
+
+@njit(cache=True, nogil=True)
+def function_points_kernel(model, r, start, end, x_vals, y_vals):
+    """ fill preallocated x_vals, y_vals with the map evaluated on
+        len(x_vals) points evenly spaced in [start, end] """
+
+    n = len(x_vals)
+
+    for i in range(n):
+        x = start + (end - start) * i / max(n - 1, 1)
+        x_vals[i] = x
+        y_vals[i] = model(x, r)
+
+@njit(cache=True, nogil=True)
+def cobweb_points_kernel(model, r, x, x_vals, y_vals):
+    """ fill preallocated x_vals, y_vals (length 3n+1) with the cobweb
+        vertices (x, 0), then (x, f(x)), (f(x), f(x)), (f(x), f(f(x))), ... """
+
+    x_vals[0] = x
+    y_vals[0] = 0.0
+
+    for i in range((len(x_vals) - 1) // 3):
         y1 = model(x, r)
-        cobweb_points.append((x, y1))
-        cobweb_points.append((y1, y1))
         y2 = model(y1, r)
-        cobweb_points.append((y1, y2))
-        x = y1
-    return zip(*cobweb_points)
 
-def cobweb_plot(plt, idx=-1,
-                model=logistic_map, r=0, cobweb_x=0.5,
+        x_vals[3*i + 1] = x
+        y_vals[3*i + 1] = y1
 
-                function_n=1000,
+        x_vals[3*i + 2] = y1
+        y_vals[3*i + 2] = y1
 
-                cobweb_n=100, num_discard=0,
-                title='', filename='', show=True, save=True,
-                start=0, end=1, figsize=(6,6), diagonal_linewidth=1.35,
-                cobweb_linewidth=1, function_linewidth=1.5,
-                folder='images', dpi=300, bbox_inches='tight', pad=0.1):
+        x_vals[3*i + 3] = y1
+        y_vals[3*i + 3] = y2
 
-    plt.clear()
+        x = y1
 
-    initial_pop = float(cobweb_x)
+@lru_cache(maxsize=64)
+def cobweb_buffers(model, r, x, n, function_n, start, end):
+    """
+    Function curve, full cobweb and population series for one (r, x), computed
+    once and cached; animation frames only take longer prefixes of these.
 
-    stride_idx = (idx-1)*3
+    Returns
+    -------
+    tuple
+        func_x_vals, func_y_vals, cobweb_x_vals, cobweb_y_vals, series
+        (read-only arrays)
+    """
 
     func_x_vals, func_y_vals = get_function_points(
                         model=model, r=r, n=function_n, start=start, end=end)
     cobweb_x_vals, cobweb_y_vals = get_cobweb_points(
-                        model=model, r=r, x=cobweb_x, n=cobweb_n)
+                        model=model, r=r, x=x, n=n)
 
-    cobweb_x_vals = cobweb_x_vals[:stride_idx]
-    cobweb_y_vals = cobweb_y_vals[:stride_idx]
+    # population at each step : x0, f(x0), f(f(x0)), ...
+    series = np.concatenate(([x,], cobweb_y_vals[1::3]))
 
-    plt.setTitle(f"Cobweb Plot")
+    buffers = (func_x_vals, func_y_vals, cobweb_x_vals, cobweb_y_vals, series)
 
-    diagonal_line = plt.plot((0,1), (0,1))
-    diagonal_line.setPen(width=diagonal_linewidth)
+    for b in buffers:
+        b.flags.writeable = False
 
-    function_line = pg.PlotDataItem(x=func_x_vals, y=func_y_vals)
-    function_line.setPen(color=colors['lomid'], width=3.0)
-    function_line = plt.addItem(function_line)
+    return buffers
 
-    sizes = 1/np.linspace(.1,1,len(cobweb_x_vals))
-    sizes = np.maximum(5, sizes)
+@njit(cache=True)
+def minmax_envelope(y, i0, i1, buckets):
+    """ reduce y[i0:i1] (x is the index) to the min and max of each of
+        `buckets` equal index ranges, in index order; returns t, y """
 
-    cobweb_line = plt.plot(cobweb_x_vals, cobweb_y_vals, symbol='o', symbolSize=sizes)
-    cobweb_line.setPen(color=colors['lomid'], width=cobweb_linewidth)
-    cobweb_line.setSymbolPen(color=(1,1,1,0), width=0.0)
-    cobweb_line.setSymbolBrush(color=colors['himid'])
+    n = i1 - i0
+
+    t_out = np.empty(2*buckets)
+    y_out = np.empty(2*buckets)
+    m = 0
+
+    for b in range(buckets):
+        lo = i0 + (n * b) // buckets
+        hi = i0 + (n * (b + 1)) // buckets
+
+        if hi <= lo:
+            continue
+
+        imin = lo
+        imax = lo
+
+        for i in range(lo + 1, hi):
+            if y[i] < y[imin]:
+                imin = i
+            if y[i] > y[imax]:
+                imax = i
+
+        first = min(imin, imax)
+        last = max(imin, imax)
+
+        t_out[m] = first
+        y_out[m] = y[first]
+        m += 1
+
+        if last != first:
+            t_out[m] = last
+            y_out[m] = y[last]
+            m += 1
+
+    return t_out[:m], y_out[:m]
+
+@njit(cache=True)
+def pixel(v, v0, scale, n):
+    """ pixel index of v, clamped to -1 .. n (off view), shifted by one """
+    return min(max(math.floor((v - v0) * scale), -1), n) + 1
+
+@njit(cache=True)
+def cobweb_segments(x, y, x0, x1, y0, y1, width, height):
+    """
+    Indices k of the cobweb segments (x[k], y[k]) -> (x[k+1], y[k+1]) worth
+    drawing in a width x height view of [x0, x1] x [y0, y1].
+
+    Every cobweb segment but the first runs between the diagonal and the
+    curve, vertically or horizontally, so its diagonal end is fixed by its
+    pixel column (or row). A segment is dropped if one in the same column
+    (row) already ends in the same pixel on the curve side; zero length
+    segments are dropped. A chaotic orbit of 10**6 steps comes down to a
+    few segments per pixel column and row.
+    """
+
+    W = width + 2
+    H = height + 2
+
+    sx = width / (x1 - x0)
+    sy = height / (y1 - y0)
+
+    seen_v = np.zeros((W, H), dtype=np.bool_) # column, row of the far end
+    seen_h = np.zeros((H, W), dtype=np.bool_) # row, column of the far end
+
+    keep = np.empty(len(x) - 1, dtype=np.int64)
+    m = 0
+
+    for k in range(len(x) - 1):
+        xa = x[k]
+        ya = y[k]
+        xb = x[k + 1]
+        yb = y[k + 1]
+
+        if xa == xb and ya == yb:
+            continue
+
+        if xa == xb and (ya == xa or yb == xa):
+            c = pixel(xa, x0, sx, width)
+            r = pixel(yb if ya == xa else ya, y0, sy, height)
+
+            if seen_v[c, r]:
+                continue
+            seen_v[c, r] = True
+
+        elif ya == yb and (xa == ya or xb == ya):
+            r = pixel(ya, y0, sy, height)
+            c = pixel(xb if xa == ya else xa, x0, sx, width)
+
+            if seen_h[r, c]:
+                continue
+            seen_h[r, c] = True
+
+        keep[m] = k
+        m += 1
+
+    return keep[:m]
+
+def style_axes(plt):
+    """ fonts, tick offsets and label nudge shared by the cobweb and time
+        series plots; applied once, when the plot items are created """
 
     xaxis = plt.getAxis("bottom")
     #xaxis.setTickSpacing(4,4)
@@ -281,73 +429,429 @@ def cobweb_plot(plt, idx=-1,
     yaxis.label.setFont(txtfont)
     plt.titleLabel.item.setFont(txtfont)
 
-    return np.concatenate(([initial_pop,], np.array(cobweb_y_vals[1::3])))
+def view_pixels(vb):
+    """ view range and size in pixels of a ViewBox """
+    (x0, x1), (y0, y1) = vb.viewRange()
+    return x0, x1, y0, y1, max(1, int(vb.width())), max(1, int(vb.height()))
+
+class SeriesLOD:
+    """
+    Level of detail for the time series.
+
+    Up to `threshold` points in view, the line and markers get the points
+    themselves. Past that, the line gets the min and max of every pixel
+    column of the view (same picture, at most two points per column) and
+    the markers are hidden. Recomputed whenever the view moves or resizes.
 
-def series_plot(plt, y_vals, idx=100, r=0, xall=False):
+    The envelope is stroked with a 1px pen : a wide antialiased pen over a
+    dense zigzag is the slowest thing QPainter does, and adds nothing once
+    every column is filled anyway.
+    """
+
+    def __init__(self, plt, line, scat, threshold=decimate_above):
+
+        self.vb = plt.getViewBox()
+        self.line = line
+        self.scat = scat
+        self.threshold = threshold
+
+        self.pen = line.opts['pen']
+        self.thin = pg.mkPen(self.pen.color(), width=1)
+
+        self.y = None
+        self.size = 10
+        self.view = None
+
+        self.vb.sigRangeChanged.connect(self.refresh)
+        self.vb.sigResized.connect(self.refresh)
+
+    def detach(self):
+        """ stop following the view; the items are being removed """
+        self.vb.sigRangeChanged.disconnect(self.refresh)
+        self.vb.sigResized.disconnect(self.refresh)
+
+    def set_data(self, y, size):
+        self.y = y
+        self.size = size
+        self.view = None
+        self.refresh()
+
+    def refresh(self, *args):
+
+        if self.y is None:
+            return
+
+        n = len(self.y)
+
+        if n <= self.threshold:
+            if self.view is None:
+                t = np.arange(n)
+                self.line.setData(x=t, y=self.y, pen=self.pen)
+                self.scat.setData(x=t, y=self.y, size=self.size)
+                self.view = ()
+            return
+
+        x0, x1, _, _, width, _ = view = view_pixels(self.vb)
+
+        if view == self.view:
+            return
+
+        self.view = view
+
+        # one point either side, so the line runs off the edges
+        i0 = min(max(math.floor(x0), 0), n)
+        i1 = min(max(math.ceil(x1) + 1, 0), n)
+
+        if i1 - i0 <= self.threshold:
+            t = np.arange(i0, i1)
+            y = self.y[i0:i1]
+            self.line.setData(x=t, y=y, pen=self.pen)
+            self.scat.setData(x=t, y=y, size=self.size)
+        else:
+            t, y = minmax_envelope(self.y, i0, i1, width)
+            self.line.setData(x=t, y=y, pen=self.thin)
+            self.scat.setData(x=[], y=[])
+
+class CobwebLOD:
+    """
+    Level of detail for the cobweb.
+
+    Up to `threshold` vertices the cobweb is drawn as it always was, a
+    polyline with markers. Past that, only the segments that light up new
+    pixels of the view are kept (`cobweb_segments`) and drawn as
+    independent pairs, without markers.
+    """
+
+    def __init__(self, plt, line, threshold=decimate_above):
+
+        self.vb = plt.getViewBox()
+        self.line = line
+        self.threshold = threshold
+
+        self.x = None
+        self.y = None
+        self.view = None
+
+        self.vb.sigRangeChanged.connect(self.refresh)
+        self.vb.sigResized.connect(self.refresh)
+
+    def detach(self):
+        """ stop following the view; the items are being removed """
+        self.vb.sigRangeChanged.disconnect(self.refresh)
+        self.vb.sigResized.disconnect(self.refresh)
+
+    def set_data(self, x, y):
+        self.x = x
+        self.y = y
+        self.view = None
+        self.refresh()
+
+    def refresh(self, *args):
+
+        if self.x is None:
+            return
+
+        if len(self.x) <= self.threshold:
+            if self.view is None:
+                sizes = 1/np.linspace(.1,1,len(self.x))
+                sizes = np.maximum(5, sizes)
+
+                self.line.setData(self.x, self.y, connect='all',
+                                    symbol='o', symbolSize=sizes)
+                self.view = ()
+            return
+
+        view = view_pixels(self.vb)
+
+        if view == self.view:
+            return
+
+        self.view = view
+
+        k = cobweb_segments(self.x, self.y, *view)
+
+        xs = np.empty(2*len(k))
+        ys = np.empty(2*len(k))
+        xs[0::2] = self.x[k]
+        xs[1::2] = self.x[k + 1]
+        ys[0::2] = self.y[k]
+        ys[1::2] = self.y[k + 1]
+
+        self.line.setData(xs, ys, connect='pairs', symbol=None)
+
+def cobweb_plot(plt, idx=-1,
+                model=logistic_map, r=0, cobweb_x=0.5, buffers=None,
+
+                function_n=1000,
+
+                cobweb_n=orbit_n, num_discard=0,
+                title='', filename='', show=True, save=True,
+                start=0, end=1, figsize=(6,6), diagonal_linewidth=1.35,
+                cobweb_linewidth=1, function_linewidth=1.5,
+                folder='images', dpi=300, bbox_inches='tight', pad=0.1):
+
+    initial_pop = float(cobweb_x)
+
+    stride_idx = (idx-1)*3
+
+    if buffers is None:
+        with timing.span('simulate'):
+            buffers = cobweb_buffers(model, float(r), initial_pop, cobweb_n,
+                                        function_n, start, end)
+
+    (func_x_vals, func_y_vals,
+     cobweb_x_vals, cobweb_y_vals, series) = buffers
+
+    # prefix views of the precomputed buffers
+    cobweb_x_vals = cobweb_x_vals[:stride_idx]
+    cobweb_y_vals = cobweb_y_vals[:stride_idx]
+
+    if len(plt.items) == 0:
+        # __init__ : items and styling are built once, then only fed data
 
-    plt.clear()
-    plt.setTitle("Population vs Time, growth rate: {:4.2f}".format(r))
+        plt.setTitle(f"Cobweb Plot")
+
+        diagonal_line = plt.plot((0,1), (0,1))
+        diagonal_line.setPen(width=diagonal_linewidth)
+
+        function_line = pg.PlotDataItem()
+        function_line.setPen(color=colors['lomid'], width=3.0)
+        plt.addItem(function_line)
+
+        cobweb_line = plt.plot([], [], symbol='o')
+        cobweb_line.setPen(color=colors['lomid'], width=cobweb_linewidth)
+        cobweb_line.setSymbolPen(color=(1,1,1,0), width=0.0)
+        cobweb_line.setSymbolBrush(color=colors['himid'])
+        cobweb_line.lod = CobwebLOD(plt, cobweb_line)
+
+        style_axes(plt)
+
+    else:
+        # __update__
+        diagonal_line, function_line, cobweb_line = plt.items[:3]
+
+    with timing.span('transfer'):
+        function_line.setData(func_x_vals, func_y_vals)
+        cobweb_line.lod.set_data(cobweb_x_vals, cobweb_y_vals)
+
+    # series values behind the visible cobweb vertices (ys at 1, 4, 7, ...)
+    return series[:1 + (len(cobweb_y_vals) + 1)//3]
+
+def series_plot(plt, y_vals, idx=None, r=0, xall=False):
 
-    t = np.arange(len(y_vals))
     y = y_vals[:idx]
-    t = t[:idx]
 
-    if len(t) < 20:
+    if len(plt.items) == 0:
+        # __init__ : items and styling are built once, then only fed data
+
+        plt.setYRange(*[0,1])
+        plt.showGrid(x=True, y=True)
+
+        line = plt.plot()
+        line.setPen(color=colors['lomid'], width=3.0)
+
+        scat = pg.ScatterPlotItem(name='series')
+        scat.setPen(color=(1,1,1,0), width=0.0)
+        scat.setBrush(color=colors['himid'])
+        plt.addItem(scat)
+
+        line.lod = SeriesLOD(plt, line, scat)
+
+        style_axes(plt)
+
+    else:
+        # __update__
+        line, scat = plt.items[:2]
+
+    title = "Population vs Time, growth rate: {:4.2f}".format(r)
+
+    if plt.titleLabel.text != title:
+        plt.setTitle(title)
+
+    if len(y) < 20:
         plt.setXRange(*[0,20])
     else:
         if not xall:
-            plt.setXRange(*[len(t)-20, len(t)])
+            plt.setXRange(*[len(y)-20, len(y)])
         else:
             plt.setXRange(*[0, 30])
 
-    plt.setYRange(*[0,1])
-    plt.showGrid(x=True, y=True)
-
-    s = 20/len(t)
+    s = 20/len(y)
     s = max(10,s)
 
-    line = plt.plot(x=t, y=y)
-    line.setPen(color=colors['lomid'], width=3.0)
+    with timing.span('transfer'):
+        line.lod.set_data(y, s)
 
-    scat = pg.ScatterPlotItem(x=t, y=y, size=s, name='series')
-    scat.setPen(color=(1,1,1,0), width=0.0)
-    scat.setBrush(color=colors['himid'])
-    plt.addItem(scat)
+@njit(cache=True, nogil=True)
+def bifurcation_density(rate_min, rate_max, num_rates, rate_start, rate_stop,
+                            num_bins, num_discard=500, num_gens=1000,
+                            initial_pop=0.5):
+    """
+    Histogram of the population over `num_gens` generations (after
+    `num_discard`) for rates rate_start..rate_stop-1 of `num_rates` evenly
+    spaced in [rate_min, rate_max].
 
-    xaxis = plt.getAxis("bottom")
-    #xaxis.setTickSpacing(4,4)
+    Releases the GIL, so it can run on a worker thread while the UI stays live.
+    Serial on purpose : a parallel region started from a QThread keeps the
+    TBB / OpenMP pool alive and the interpreter hangs on exit.
 
-    xaxis.tickFont = numfont
-    xaxis.setStyle(tickTextOffset = 20)
+    Returns
+    -------
+    ndarray
+        (rate_stop - rate_start, num_bins) float32 counts
+    """
 
-    yaxis = plt.getAxis("left")
-    #yaxis.setTickSpacing(.2, .2)
+    density = np.zeros((rate_stop - rate_start, num_bins), dtype=np.float32)
 
-    yaxis.resizeEvent = types.MethodType(custom_axis_item_resizeEvent, yaxis)
+    for i in range(rate_stop - rate_start):
 
-    yaxis.tickFont = numfont
-    yaxis.setStyle(tickTextOffset = 10, tickLength=10)
+        rate = rate_min + (rate_max - rate_min) * (rate_start + i) / (num_rates - 1)
+        pop = initial_pop
 
-    xaxis.label.setFont(txtfont)
-    yaxis.label.setFont(txtfont)
-    plt.titleLabel.item.setFont(txtfont)
+        for _ in range(num_discard):
+            pop = logistic_map(pop, rate)
+
+        for _ in range(num_gens):
+            pop = logistic_map(pop, rate)
+            b = min(max(int(pop * num_bins), 0), num_bins - 1)
+            density[i, b] += 1
+
+    return density
+
+class BackdropWorker(QtCore.QThread):
+    """ computes the bifurcation density over [0, 4] chunk by chunk and
+        streams each chunk back to the GUI thread """
+
+    chunk = QtCore.pyqtSignal(int, object)
+
+    def __init__(self, num_rates=backdrop_rates, num_bins=backdrop_bins,
+                    chunk_size=backdrop_chunk, parent=None):
+        super(BackdropWorker, self).__init__(parent)
+        self.num_rates = num_rates
+        self.num_bins = num_bins
+        self.chunk_size = chunk_size
+
+    def run(self):
+        for start in range(0, self.num_rates, self.chunk_size):
+
+            if self.isInterruptionRequested():
+                return
+
+            stop = min(start + self.chunk_size, self.num_rates)
+            density = bifurcation_density(0.0, 4.0, self.num_rates,
+                                            start, stop, self.num_bins)
+            self.chunk.emit(start, density)
+
+class Backdrop:
+    """ image layer under the bifurcation points, filled in as chunks of the
+        background computation arrive """
+
+    def __init__(self, plt, num_rates=backdrop_rates, num_bins=backdrop_bins):
+
+        self.density = np.zeros((num_rates, num_bins), dtype=np.float32)
+
+        self.image = pg.ImageItem()
+        self.image.setZValue(-100)
+
+        # transparent where empty, towards `lomid` where dense
+        lut = np.zeros((256, 4), dtype=np.ubyte)
+        lut[:, :3] = np.array(QtGui.QColor(colors['lomid']).getRgb()[:3])
+        lut[:, 3] = np.linspace(0, 160, 256)
+        self.image.setLookupTable(lut)
+
+        # array axis 0 -> rates [0, 4], axis 1 -> population [0, 1]
+        tr = QtGui.QTransform()
+        tr.scale(4 / num_rates, 1 / num_bins)
+        self.image.setTransform(tr)
+
+        # added to the view box, not the plot, so `plt.items` (and Clear)
+        # only ever see the user's points
+        plt.getViewBox().addItem(self.image, ignoreBounds=True)
+
+        self.levels = (0, np.log1p(1000) / 2)
+
+    def add_chunk(self, start, density):
+        self.density[start:start + len(density)] = np.log1p(density)
+        self.image.setImage(self.density, levels=self.levels, autoLevels=False)
+
+class PointRing:
+    """
+    Fixed capacity ring buffer of scatter points for the bifurcation plot.
+
+    Positions live in preallocated arrays and pushing a batch only writes
+    that batch, so the cost of an update doesn't grow with the session.
+    The newest batch is also kept on its own, to be drawn as a second layer
+    on top of the ring. Each layer has a single size and brush (`old`,
+    `new`), so `view` and `newest` return plain float arrays for `setData`.
+    """
+
+    def __init__(self, capacity=bifurc_capacity, size=1, new_size=5,
+                    brush=brushes['lomid'], new_brush=brushes['himid']):
+
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0
+
+        self.old = (size, brush)
+        self.new = (new_size, new_brush)
+
+        self.x = np.empty(capacity)
+        self.y = np.empty(capacity)
+
+        self.new_x = np.empty(0)
+        self.new_y = np.empty(0)
+
+    def push(self, xs, ys):
+
+        xs = xs[-self.capacity:]
+        ys = ys[-self.capacity:]
+
+        idx = (self.head + np.arange(len(xs))) % self.capacity
+
+        self.x[idx] = xs
+        self.y[idx] = ys
+
+        self.new_x = xs.copy()
+        self.new_y = ys.copy()
+
+        self.head = (self.head + len(xs)) % self.capacity
+        self.count = min(self.count + len(xs), self.capacity)
+
+    def view(self):
+        n = self.count
+        return self.x[:n], self.y[:n]
 
-def bifurc_plot(plt, y_vals, r=0, ipop=0.5, discard=64):
+    def newest(self):
+        return self.new_x, self.new_y
+
+def bifurc_plot(plt, y_vals, r=0, ipop=0.5, discard=64,
+                    capacity=bifurc_capacity):
 
     if (y_vals.shape[0]) < discard:
         return
 
     ys = y_vals[discard:]
     xs = np.repeat(r,len(ys))
-    s = 1
-    new_s = 5
 
     if len(plt.items) == 0:
         # __init__
-        bifurcation = pg.ScatterPlotItem(x=xs, y=ys, size=new_s, antialias=True, name='bifurc')
-        bifurcation.setBrush(color=colors['himid'], alpha=0.5, width=1)
-        bifurcation.setPen(color=(0,0,0,0), width=0, alpha=0.5)
-        plt.addItem(bifurcation)
+        ring = PointRing(capacity)
+        ring.push(xs, ys)
+        x, y = ring.view()
+        new_x, new_y = ring.newest()
+
+        # the whole ring, and the newest batch highlighted on top of it
+        bifurcation = pg.ScatterPlotItem(x=x, y=y, size=ring.old[0],
+                                            brush=ring.old[1], antialias=True,
+                                            name='bifurc')
+        newest = pg.ScatterPlotItem(x=new_x, y=new_y, size=ring.new[0],
+                                        brush=ring.new[1], antialias=True)
+
+        for item in (bifurcation, newest):
+            item.setPen(color=(0,0,0,0), width=0, alpha=0.5)
+            plt.addItem(item)
+
+        bifurcation.ring = ring
 
         plt.titleLabel.item.setFont(txtfont)
 
@@ -368,23 +872,69 @@ def bifurc_plot(plt, y_vals, r=0, ipop=0.5, discard=64):
 
     else:
         # __update__
-        bifurcation = plt.items[0]
+        bifurcation, newest = plt.items[:2]
+
+        with timing.span('transfer'):
+            bifurcation.ring.push(xs, ys)
+            x, y = bifurcation.ring.view()
+            new_x, new_y = bifurcation.ring.newest()
+
+            bifurcation.setData(x, y)
+            newest.setData(new_x, new_y)
+
+    plt.setXRange(*[0,4])
+    plt.setYRange(*[0,1])
 
-        n_new = len(xs)
+class PlotCompute(QtCore.QObject):
+    """
+    Fills the cobweb / series buffers for a (rate, initial pop.) off the GUI
+    thread. Lives on its own QThread; `request` is queued to it, `result`
+    carries the buffers back to the GUI thread with the parameters they
+    were computed for.
+    """
 
-        xs = np.concatenate((xs, bifurcation.data['x']))
-        ys = np.concatenate((ys, bifurcation.data['y']))
+    request = QtCore.pyqtSignal(float, float)
+    result = QtCore.pyqtSignal(float, float, object, float) # ..., seconds
 
-        ss = np.repeat(1,len(xs))
-        ss[0:n_new] = new_s
+    def __init__(self, parent=None):
+        super(PlotCompute, self).__init__(parent)
+        self.request.connect(self.compute)
 
-        bs = [brushes['lomid'] for b in range(len(xs))]
-        bs[0:n_new] = [brushes['himid'] for _ in range(n_new)]
+    @QtCore.pyqtSlot(float, float)
+    def compute(self, rate, ipop):
+        start = perf_counter()
+        # uncached : the buffers travel with the result, and the lru_cache
+        # stays the GUI thread's own
+        buffers = cobweb_buffers.__wrapped__(logistic_map, rate, ipop,
+                                                orbit_n, 1000, 0, 1)
+        self.result.emit(rate, ipop, buffers, perf_counter() - start)
 
-        bifurcation.setData(xs,ys, size=ss, brush=bs)
+class TimedLayout(pg.GraphicsLayoutWidget):
+    """ GraphicsLayoutWidget whose repaints are the `draw` span of `timing`
+        and close its frame; shows the p50/p95 overlay if `show_timing` """
 
-    plt.setXRange(*[0,4])
-    plt.setYRange(*[0,1])
+    def __init__(self, *args, **kwargs):
+        super(TimedLayout, self).__init__(*args, **kwargs)
+
+        self.hud = QLabel(self)
+        self.hud.setStyleSheet(f"color: {colors['light']};"
+                                " background-color: transparent;")
+        self.hud.move(10, 10)
+        self.hud.setVisible(show_timing)
+
+    def paintEvent(self, event):
+
+        recorded = timing.active
+
+        with timing.span('draw'):
+            super(TimedLayout, self).paintEvent(event)
+
+        timing.end()
+
+        # refreshing the label is not free; a few times a second is plenty
+        if recorded and show_timing and timing.frames % 10 == 1:
+            self.hud.setText(timing.summary())
+            self.hud.adjustSize()
 
 class Controls(QWidget):
     def __init__(self, variable='', parent=None):
@@ -573,7 +1123,7 @@ class Widget(QWidget):
         self.controls.setValues()
         self.horizontalLayout.addWidget(self.controls)
 
-        self.win = pg.GraphicsLayoutWidget()
+        self.win = TimedLayout()
 
         self.setWindowTitle("Logistic Map 🤯")
         self.horizontalLayout.addWidget(self.win)
@@ -592,16 +1142,40 @@ class Widget(QWidget):
                                                 'bottom':"Rates"}),
         ]
 
+        self.backdrop = Backdrop(self.plots[2])
+        self.backdrop_worker = BackdropWorker(parent=self)
+        self.backdrop_worker.chunk.connect(self.backdrop.add_chunk)
+        self.backdrop_worker.start()
+
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.animate_plot)
         self.animate = False
         self.f = 0
 
+        # parameter changes are coalesced into one request per frame and
+        # computed on a worker, one request at a time
+        self.compute_thread = QtCore.QThread(self)
+        self.compute = PlotCompute()
+        self.compute.moveToThread(self.compute_thread)
+        self.compute.result.connect(self.on_computed)
+        self.compute_thread.start()
+        self.app.aboutToQuit.connect(self.stop_workers)
+
+        self.frame_timer = QtCore.QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(16)
+        self.frame_timer.timeout.connect(self.dispatch_update)
+
+        self.computed = None # (rate, ipop, buffers) waiting to be drawn
+        self.pending = False # parameters changed since the last request
+        self.busy = False # a request is in flight
+
         self.update_plot()
 
-        self.controls.rate.valueChanged.connect(self.update_plot)
-        self.controls.rate_box.valueChanged.connect(self.update_plot)
-        self.controls.ipop.valueChanged.connect(self.update_plot)
+        self.controls.rate.valueChanged.connect(self.request_update)
+        self.controls.rate_box.valueChanged.connect(self.request_update)
+        self.controls.ipop.valueChanged.connect(self.request_update)
+        self.controls.ipop_box.valueChanged.connect(self.request_update)
         self.controls.cobweb_box.stateChanged.connect(self.update_plot)
         self.controls.series_box.stateChanged.connect(self.update_plot)
         self.controls.bifurc_box.stateChanged.connect(self.update_plot)
@@ -609,9 +1183,24 @@ class Widget(QWidget):
         self.controls.clear.pressed.connect(self.clear)
         self.controls.animb.pressed.connect(self.animate_toggle)
 
+    def stop_workers(self):
+        self.backdrop_worker.requestInterruption()
+        self.backdrop_worker.wait()
+        self.compute_thread.quit()
+        self.compute_thread.wait()
+
+    def closeEvent(self, event):
+        self.stop_workers()
+        timing.close()
+        super(Widget, self).closeEvent(event)
+
     def clear(self):
         print('Clear')
         for p in self.plots:
+            # the LODs would keep refreshing removed items on every pan
+            for item in p.items:
+                if hasattr(item, 'lod'):
+                    item.lod.detach()
             p.clear()
         self.update_plot()
 
@@ -646,6 +1235,45 @@ class Widget(QWidget):
         else:
             print(f'Unknown keypress: {event.key()}, "{event.text()}"')
 
+    def request_update(self):
+        """ note that the parameters changed; at most one dispatch per frame """
+
+        self.pending = True
+
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def dispatch_update(self):
+        """ send the current parameters to the worker, unless it is busy,
+            in which case they are sent when its result comes back """
+
+        if self.busy or not self.pending:
+            return
+
+        self.pending = False
+        self.busy = True
+
+        # the frame runs from the request to the repaint showing its result
+        timing.begin()
+
+        self.compute.request.emit(float(self.controls.rateval),
+                                  float(self.controls.ipopval))
+
+    def on_computed(self, rate, ipop, buffers, seconds):
+
+        self.busy = False
+        timing.add('simulate', seconds)
+
+        # only one request is in flight, so every result answers the newest
+        # request sent and is drawn; parameters that changed meanwhile are
+        # sent right after, as a single request for the latest values
+        self.computed = (rate, ipop, buffers)
+        self.update_plot()
+        self.computed = None
+
+        if self.pending:
+            self.frame_timer.start()
+
     def update_plot(self):
 
         if self.animate and self.f == 0:
@@ -677,10 +1305,15 @@ class Widget(QWidget):
 
         """ redraw plots ; controlled by checkmarks """
 
-        rate = self.controls.rateval
-        ipop = self.controls.ipopval
+        timing.begin()
 
-        y_vals = cobweb_plot(self.plots[0], idx=0, r=rate, cobweb_x=ipop)
+        if self.computed is not None:
+            rate, ipop, buffers = self.computed
+        else:
+            rate, ipop, buffers = self.controls.rateval, self.controls.ipopval, None
+
+        y_vals = cobweb_plot(self.plots[0], idx=0, r=rate, cobweb_x=ipop,
+                                buffers=buffers)
 
         if self.controls.cobweb_box.isChecked():
             self.plots[0].setVisible(True)
@@ -701,6 +1334,8 @@ class Widget(QWidget):
 
     def animate_plot(self):
 
+        timing.begin()
+
         rate = self.controls.rateval
         ipop = self.controls.ipopval
 
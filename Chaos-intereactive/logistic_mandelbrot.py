@@ -18,42 +18,36 @@ Code structure is roughly:
 """
 
 from vispy.color import get_colormaps, BaseColormap
-from vispy import app, scene, io
+from vispy import app, scene
 import vispy.visuals.volume
 import vispy
 
 from numba import jit, njit, prange
 from time import time
-import vispy.io as io
 import numpy as np
 import math
 
 from pathlib import Path
 
-import os
+from volume_store import (VolumeStore, write_volume, convert_npz,
+                          build_pyramid, write_pyramid, pyramid_path)
+from cpu_render import (HeadlessCamera, colormap_lut, render_volume,
+                        volume_center)
+from frame_sink import open_sink, CODECS
+from batch_render import render_batch, encode_sequence
+from frame_timing import FrameTimer, time_canvas_draws
 
 # ---- FUNCTIONS
 
 def ffmpeg():
-    """ Render the frames we have created into a ProRes mov"""
-
-    global rec_prefix, project_name, dropbox_folder
-
-    convert_cmd = (f"""ffmpeg -f image2 -framerate 24"""
-                       f""" -i {rec_prefix}/{project_name}/{project_name}_%d.png"""
-                       f""" -c:v prores_ks -profile:v 3 {dropbox_folder}/{project_name}.mov""")
-
-    print('CONVERTING >>>', convert_cmd)
-
-    os.system(convert_cmd)
-
-    dir = (f"./{rec_prefix}/{project_name}")
+    """ Finish the recording : flush the frame sink and wait for the encoder
+        to write the ProRes mov (or the last PNGs)
+    """
 
-    print('REMOVING >>>', dir)
+    global project_name
 
-    filelist = [f for f in os.listdir(dir) if f.endswith(".png") ]
-    for f in filelist:
-        os.remove(os.path.join(dir, f))
+    sink.close()
+    timing.close()
 
     print(f"{project_name} is rendered")
 
@@ -322,20 +316,60 @@ rec_prefix = './frames'
 project_name = f'fractal_mandelbrot_{D}'
 frame_dir = Path(f'{rec_prefix}/{project_name}')
 
+# 'mov' streams frames straight into ffmpeg (ProRes, in rec_prefix),
+# 'png' keeps the numbered image sequence in frame_dir instead
+rec_format = 'mov'
+
 # Record frames?
 rec = False
 
+# Render frames on the CPU, without OpenGL (for machines with no display/GPU)
+# implies rec = True
+headless = False
+
+# Render frames in this many worker processes (0 = off), resuming from any
+# frames already in frame_dir. Uses the CPU renderer, implies headless = True
+batch = 0
+
 # Playback keyframes?
 play = True
 
 # Generate data?
 generate = False
 
+# Slice the data to reveal only the logistic map
+slice = 0
+
+# Quantization of the chunked volume store ('uint16' or 'float16')
+store_dtype = 'uint16'
+store_chunks = 64
+
+# Levels of detail : coarse, max-pooled copies (D/2, D/4, ...) are shown while
+# the camera moves, and the full resolution once it has been still for a bit
+lod = True
+lod_levels = 3 # number of coarse levels
+lod_moving = 2 # level shown while the camera moves
+lod_still = 0.3 # seconds without camera motion before refining
+
+# p50/p95 of the simulate (camera path) / transfer (volume upload) / draw
+# spans in the corner of the viewer, and optionally every frame to a log
+show_timing = False
+timing_log = None # e.g. 'timing_mandelbrot.jsonl'
+
 
 # ---- RUNTIME
 
+if batch:
+    headless = True
+
+if headless:
+    rec = True
+
 data_prefix = './data'
 datafile = f'{data_prefix}/fractal_mandelbrot_data{D}_iter{I}_ovs{Omax}.npz'
+storefile = f'{data_prefix}/fractal_mandelbrot_data{D}_iter{I}_ovs{Omax}.tbv'
+# full resolution, decoded once and memory-mapped by every batch worker
+sharedfile = f'{data_prefix}/fractal_mandelbrot_data{D}_iter{I}_ovs{Omax}.f32.npy'
 
 if not Path(rec_prefix).exists():
     Path(rec_prefix).mkdir()
@@ -346,9 +380,28 @@ if not Path(data_prefix).exists():
 if not frame_dir.exists() and rec:
     frame_dir.mkdir()
 
+if rec and not batch:
+    if rec_format == 'png':
+        sink = open_sink('png', frame_dir, project_name)
+    else:
+        sink = open_sink(rec_format, rec_prefix, project_name, fps=24)
+
 if not generate:
-    # Read volume
-    vol = np.load(datafile)['data']
+
+    if not Path(storefile).exists():
+        # one-off conversion of a legacy .npz volume
+        print("CONVERTING", datafile, ">>>", storefile)
+        convert_npz(datafile, storefile, chunks=store_chunks, dtype=store_dtype)
+
+    # Open volume; only the chunks we ask for are decompressed
+    store = VolumeStore(storefile)
+
+    if slice:
+        mid = store.shape[1]//2
+        vol = store[:, mid - 1 : mid + 2, :]
+        print(f"Read {store.bytes_read*1e-9:.3f}GB compressed from {storefile}")
+    else:
+        vol = None # read level by level, see `load_level`
 
 else:
 
@@ -373,7 +426,11 @@ else:
 
     GB = vol.size * vol.itemsize * 1e-9
     print("SAVING GIGABYTES = ", GB)
-    np.savez(datafile, data=vol)
+    write_volume(storefile, vol, chunks=store_chunks, dtype=store_dtype,
+                    attrs={'D': D, 'I': I, 'O': O})
+    pyramid = build_pyramid(vol, lod_levels)
+    write_pyramid(storefile, pyramid, chunks=store_chunks, dtype=store_dtype)
+    GB = Path(storefile).stat().st_size * 1e-9
     print("DUSTED!")
 
     print(f"{project_name} at {D},{I},{O} is done and dusted"
@@ -392,20 +449,92 @@ else:
 #print(f"done filtering! {(time()-start)/D**3} sec / voxel")
 
 
-# Increase the visibility of the x-z plane (where the logistic map lies)
-vol[:,vol.shape[1]//2,:] = np.sqrt(vol[:,vol.shape[1]//2,:])
+def enhance_plane(v):
+    """ Increase the visibility of the x-z plane (where the logistic map lies) """
+    v[:,v.shape[1]//2,:] = np.sqrt(v[:,v.shape[1]//2,:])
+    return v
 
-# Slice the data to reveal only the logistic map
-slice = 0
+# Coarse levels for interactive viewing (not useful for the 3-plane slice)
+use_lod = lod and not slice and not rec
 
-if slice:
-    vol = vol[:,vol.shape[1]//2 -1 : vol.shape[1]//2 + 2,:]
+if vol is None:
 
-# Prepare canvas
-canvas = scene.SceneCanvas(keys='interactive', size=rec_size, show=not rec)
+    # Levels are only decompressed the first time they are shown, so the
+    # viewer starts from a coarse level and reads full resolution on demand
+    level_stores = [store]
 
-# Set up a viewbox to display the image with interactive pan/zoom
-view = canvas.central_widget.add_view()
+    if use_lod:
+        while pyramid_path(storefile, len(level_stores)).exists():
+            level_stores.append(
+                VolumeStore(pyramid_path(storefile, len(level_stores))))
+
+    levels = [None] * len(level_stores)
+
+    if use_lod and len(levels) == 1:
+        print("BUILDING LEVELS OF DETAIL")
+        pyramid = build_pyramid(store.read(), lod_levels)
+        write_pyramid(storefile, pyramid, chunks=store_chunks, dtype=store_dtype)
+        levels = [enhance_plane(v) for v in pyramid]
+
+    full_shape = store.shape
+
+    # same color limits at every level, so switching doesn't flicker; the
+    # header holds the volume extremes, only the enhanced plane is read
+    plane = np.sqrt(store[:, full_shape[1]//2, :])
+    clim = (float(min(store.min, plane.min())), float(max(store.max, plane.max())))
+
+else:
+
+    if slice and generate:
+        vol = vol[:,vol.shape[1]//2 -1 : vol.shape[1]//2 + 2,:]
+
+    levels = [enhance_plane(v) for v in (pyramid if use_lod else [vol])]
+
+    full_shape = vol.shape
+    clim = (float(vol.min()), float(vol.max()))
+
+def level_shape(k):
+    """ shape of level of detail `k`, without reading it """
+    return levels[k].shape if levels[k] is not None else level_stores[k].shape
+
+if use_lod:
+    print("LEVELS OF DETAIL", [level_shape(k) for k in range(len(levels))])
+
+def load_level(k):
+    """ level of detail `k`, read from its store the first time it's needed """
+
+    if levels[k] is None:
+        level_store = level_stores[k]
+        levels[k] = enhance_plane(level_store.read())
+        print(f"Read {level_store.bytes_read*1e-9:.3f}GB compressed"
+                f" from {level_store.path}")
+
+    return levels[k]
+
+def decode_shared():
+    """ decode level 0 into `sharedfile`, unless it is newer than the store.
+        Decoded a slab of chunks at a time, so the full float32 volume is
+        never in memory; batch workers map it read-only and share its pages """
+
+    if (Path(sharedfile).exists() and
+            Path(sharedfile).stat().st_mtime >= Path(storefile).stat().st_mtime):
+        return
+
+    print("DECODING", storefile, ">>>", sharedfile)
+
+    tmp = Path(sharedfile + '.tmp')
+
+    with VolumeStore(storefile) as source:
+        out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32,
+                                        shape=source.shape)
+        for i in range(0, source.shape[0], source.chunks):
+            out[i : i + source.chunks] = source[i : i + source.chunks]
+
+    enhance_plane(out)
+    out.flush()
+    del out
+
+    tmp.replace(sharedfile)
 
 stepsize = .1  # step size inside the fragment shader : 0.1 is highest quality
 
@@ -442,36 +571,88 @@ class NewVolume(scene.visuals.Volume):
         self._rendering_methods['translucent'] = NEW_TRANSLUCENT_SNIPPETS
         super().__init__(*args, **kwargs)
 
-# Create the volume visuals, only one is visible
-volume1 = NewVolume(vol, parent = view.scene,
-                                cmap = 'nipy_spectral_r', # colormap
-                                method = 'translucent', # shader method
-                                relative_step_size = stepsize)
+def volume_transform(data_shape):
+    """ rescale the volume to look like a `normal` mandelbrot set
+
+        data_shape is the shape of the level being shown; coarse levels are
+        stretched back over the extent of the full resolution volume
+    """
+
+    transform = scene.MatrixTransform()
+
+    # visual x, y, z are data axes 2, 1, 0
+    transform.scale([full_shape[2]/data_shape[2],
+                     full_shape[1]/data_shape[1],
+                     full_shape[0]/data_shape[0]])
+
+    transform.scale([1,2/3,1])
+    transform.rotate(90, [0,1,0])
+
+    # translate the entire volume to be in the middle
+    if not slice:
+        transform.translate([0, 1/6 * full_shape[1], full_shape[0]])
+    else:
+        transform.translate([0, (2/3-.4)*full_shape[1], full_shape[0]])
+
+    return transform
+
+def place_volume(visual, data_shape):
+    visual.transform = volume_transform(data_shape)
+
+# level of detail currently uploaded; the viewer starts coarse
+level = min(lod_moving, len(levels)-1) if use_lod else 0
+
+timing = FrameTimer(log=timing_log, name=project_name)
+
+if not headless:
+
+    # Prepare canvas
+    canvas = scene.SceneCanvas(keys='interactive', size=rec_size, show=not rec)
+
+    # Set up a viewbox to display the image with interactive pan/zoom
+    view = canvas.central_widget.add_view()
+
+    # Create the volume visuals, only one is visible
+    volume1 = NewVolume(load_level(level), parent = view.scene,
+                                    clim = clim,
+                                    cmap = 'nipy_spectral_r', # colormap
+                                    method = 'translucent', # shader method
+                                    relative_step_size = stepsize)
 
+    place_volume(volume1, level_shape(level))
 
+    cam = scene.cameras.TurntableCamera(parent=view.scene, fov=2.0,
+                                         name='Turntable')
+    view.camera = cam
 
-# rescale the volume to look like a `normal` mandelbrot set
-volume1.transform = scene.MatrixTransform()
-volume1.transform.scale([1,2/3,1])
-volume1.transform.rotate(90, [0,1,0])
+    if show_timing and not rec:
+        hud = scene.visuals.Text('', parent=canvas.scene, color='white',
+                                    anchor_x='left', anchor_y='top',
+                                    pos=(10, 10), font_size=10)
+    else:
+        hud = None
+
+    def update_hud():
+        if hud is not None and timing.frames % 10 == 1:
+            hud.text = timing.summary()
+
+    time_canvas_draws(canvas, timing, on_frame=update_hud)
 
-# translate the entire volume to be in the middle
-if not slice:
-    volume1.transform.translate([0, 1/6 * vol.shape[1], vol.shape[0]])
 else:
-    volume1.transform.translate([0, (2/3-.4)*vol.shape[1], vol.shape[0]])
 
+    # Same camera and volume placement, ray marched on the CPU
+    volume_matrix = volume_transform(full_shape).matrix
+    lut = colormap_lut('nipy_spectral_r')
 
-cam = scene.cameras.TurntableCamera(parent=view.scene, fov=2.0,
-                                     name='Turntable')
+    cam = HeadlessCamera(fov=2.0, size=rec_size)
+    cam.center = volume_center(volume_matrix, full_shape)
 
 # Start distance (empircally determined)
-Ds = 5000 * vol.shape[0]/100
+Ds = 5000 * full_shape[0]/100
 
-view.camera = cam
-view.camera.elevation = 90
-view.camera.azimuth = 0
-view.camera.distance = Ds
+cam.elevation = 90
+cam.azimuth = 0
+cam.distance = Ds
 
 @njit
 def smooth(f, start, end):
@@ -528,32 +709,111 @@ def camera_move(camera, f, F):
 
             val = smooth(fader, keyframes[k][phase],
                                  keyframes[k][phase + 1])
-            setattr(view.camera, k, val)
+            setattr(camera, k, val)
 
         except IndexError:
             print('length mismatch for', k)
 
     return len(keyframes['azimuth']) * F
 
+def camera_state(camera):
+    return (camera.azimuth, camera.elevation, camera.distance,
+            camera.fov, tuple(camera.center))
+
+def set_level(k):
+    """ upload level of detail `k` into the volume visual """
+
+    global level
+
+    k = min(k, len(levels)-1)
+
+    if k == level:
+        return
+
+    with timing.span('transfer'):
+        volume1.set_data(load_level(k), clim=clim)
+        place_volume(volume1, levels[k].shape)
+    level = k
+
+last_state = None
+last_moved = 0
+
+def update_level_of_detail():
+    """ coarse while the camera moves, refine one level at a time
+        once it has been still for `lod_still` seconds
+    """
+
+    global last_state, last_moved
+
+    state = camera_state(cam)
+
+    if state != last_state:
+        last_moved = time()
+        set_level(lod_moving)
+
+    elif level > 0 and time() - last_moved > lod_still:
+        set_level(level - 1)
+
+    last_state = state
+
+def render_frame():
+    """ the current frame as an RGBA image """
+
+    # neither path emits a draw event, so the frame is closed here
+    with timing.span('draw'):
+        if headless:
+            image = render_volume(load_level(0), volume_matrix, cam, lut,
+                                    clim=clim, relative_step_size=stepsize)
+        else:
+            image = canvas.render()
+
+    timing.end()
+
+    return image
+
+def batch_setup():
+    """ runs once in every batch worker; returns the frame renderer """
+
+    import numba
+
+    # share the cores between workers instead of oversubscribing them
+    numba.set_num_threads(max(1, numba.config.NUMBA_NUM_THREADS // batch))
+
+    # the parent decoded the volume once (`decode_shared`); every worker
+    # maps the same file instead of holding its own copy
+    if vol is None:
+        levels[0] = np.load(sharedfile, mmap_mode='r')
+
+    def render(f):
+        camera_move(cam, f, F)
+        return render_frame()
+
+    return render
+
 def update(event):
     global view, f, F, vol, volume1, canvas, rec, rec_prefix, project_name, \
             play
 
     start = time()
+    timing.begin()
 
     if not play:
         if rec:
             play = True
 
     if play:
-        maxF = camera_move(view.camera, f, F)
+        with timing.span('simulate'):
+            maxF = camera_move(cam, f, F)
+
+    if len(levels) > 1:
+        update_level_of_detail()
 
     f += 1
 
     if rec:
 
-        image = canvas.render()
-        io.write_png(f'{rec_prefix}/{project_name}/{project_name}_{f}.png', image)
+        image = render_frame()
+        sink.write(image, f)
 
         ETA = (time() - start) * (maxF-f) # (time / frame) * frames remaining
         ETA = (ETA / 60) / 60 # seconds to hours
@@ -563,20 +823,45 @@ def update(event):
 
         print('saved frame', f, 'eta:', ETA)
 
-# Implement axis connection with cam
-@canvas.events.mouse_move.connect
-def on_mouse_move(event):
-    pass
+if not headless:
+
+    # Implement axis connection with cam
+    @canvas.events.mouse_move.connect
+    def on_mouse_move(event):
+        pass
 
 
-# Implement key presses
-@canvas.events.key_press.connect
-def on_key_press(event):
-    pass
+    # Implement key presses
+    @canvas.events.key_press.connect
+    def on_key_press(event):
+        pass
 
 
 if __name__ == '__main__':
 
     print(f"{project_name} started rendering")
+
+    if batch:
+        # the last keyframe is where the camera path ends
+        frames = camera_move(cam, 0, F) - F
+
+        if vol is None:
+            decode_shared()
+
+        # files are numbered from 1, like update()
+        render_batch(batch_setup, range(frames), frame_dir, project_name,
+                        workers=batch, offset=1)
+
+        if rec_format != 'png':
+            encode_sequence(frame_dir, project_name, start_number=1,
+                            out=f'{rec_prefix}/{project_name}.{rec_format}',
+                            codec=CODECS.get(rec_format, CODECS['mov']))
+        quit()
+
+    if headless:
+        # camera_move calls ffmpeg() and quits after the last keyframe
+        while True:
+            update(None)
+
     a = app.Timer(connect=update, start=True, app=canvas.app)
     app.run()
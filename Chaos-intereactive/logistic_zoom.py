@@ -18,7 +18,6 @@ Code structure is roughly:
 
 from vispy import app, gloo
 import vispy.plot as vp
-import vispy.io as io
 import numpy as np
 import vispy
 
@@ -27,10 +26,12 @@ from vispy.scene.visuals import Text
 from pathlib import Path
 from time import time
 
-import os
-
 from numba import jit, prange
 
+from frame_sink import open_sink, CODECS
+from batch_render import render_batch, encode_sequence
+from frame_timing import FrameTimer, time_canvas_draws
+
 # --------------------------------------------------------------------------
 # --- PARAMETERS
 
@@ -45,6 +46,18 @@ rates = 5000
 rec_prefix = './frames'
 project_name = 'logistic_zoom'
 
+# 'mov' streams frames straight into ffmpeg, 'png' keeps the image sequence
+rec_format = 'mov'
+
+# Render frames in this many worker processes (0 = off), resuming from any
+# frames already in frame_dir. Each worker opens its own (hidden) canvas.
+batch_workers = 0
+
+# p50/p95 of the simulate / transfer / draw spans in the corner (never drawn
+# into recorded frames), and optionally every frame to a JSON lines log
+show_timing = False
+timing_log = None # e.g. 'timing_zoom.jsonl'
+
 # Adding this in makes the visualization only create bifurcation labels
 #project_name += '_labels'
 
@@ -52,6 +65,8 @@ project_name = 'logistic_zoom'
 
 frame_dir = Path(f'{rec_prefix}/{project_name}')
 
+timing = FrameTimer(log=timing_log, name=project_name)
+
 if not frame_dir.exists() and record_project:
     frame_dir.mkdir()
 
@@ -214,11 +229,12 @@ def zoom_plot(target, RATES, ENDS, first=False):
     if not first and not 'labels' in project_name:
         start = time()
         print('... Simulating between', RATES, ENDS,'gens, rates', gens, rates)
-        pops = simulate(num_gens=gens, num_rates=rates,
+        with timing.span('simulate'):
+            pops = simulate(num_gens=gens, num_rates=rates,
 
-                                rate_min=RATES[0], rate_max=RATES[1],
+                                    rate_min=RATES[0], rate_max=RATES[1],
 
-                                num_discard = 1000, initial_pop=0.5)
+                                    num_discard = 1000, initial_pop=0.5)
         print('>>> DONE', round(time()-start,2),'s')
 
     elif first and 'labels' in project_name:
@@ -267,9 +283,10 @@ def zoom_plot(target, RATES, ENDS, first=False):
     else:
 
         if pops is not None:
-            target.set_data(pops, symbol='o', width=0, edge_width = 0,
-                                      face_color=color, edge_color=color,
-                                      marker_size=size)
+            with timing.span('transfer'):
+                target.set_data(pops, symbol='o', width=0, edge_width = 0,
+                                          face_color=color, edge_color=color,
+                                          marker_size=size)
             target.update()
 
 def linear_interp(x, in_min, in_max, out_min, out_max):
@@ -323,6 +340,23 @@ class Figure(vp.Fig):
         else:
             timer_spf = 1 / self.rec_fps
 
+        if self.rec:
+            if self.rec['format'] == 'png':
+                self.sink = open_sink('png', f"{self.rec['pre']}/{self.rec['name']}",
+                                        self.rec['name'])
+            else:
+                self.sink = open_sink(self.rec['format'], '.', self.rec['name'],
+                                        fps=self.rec_fps)
+
+        if show_timing and not self.rec:
+            self.hud = Text('', parent=self.scene, color='black',
+                                anchor_x='left', anchor_y='top', pos=(10, 10))
+            self.hud.font_size = 10
+        else:
+            self.hud = None
+
+        time_canvas_draws(self, timing, on_frame=self.update_hud)
+
         self.t = app.Timer(timer_spf, connect=self.on_timer, start=True)#, iterations=1)
         self.c_frames = 30 * self.rec_fps # frames per chapter
         self.f_max = self.c_frames * (len(keyframes)-1)
@@ -378,9 +412,14 @@ class Figure(vp.Fig):
 
         super(Figure, self).on_draw(event)
 
+    def update_hud(self):
+        if self.hud is not None and timing.frames % 10 == 1:
+            self.hud.text = timing.summary()
+
     def on_timer(self, event):
 
         start = time()
+        timing.begin()
 
         if not hasattr(self, 'plotted'):
             zoom_plot_ret = zoom_plot(self, [0,4], [0,1], first=True)
@@ -395,41 +434,23 @@ class Figure(vp.Fig):
 
             C = len(keyframes)
             c = self.f // self.c_frames
-            z = (self.f/self.c_frames) % 1
-            #print(self.f, z, c, C)
 
             if c >= C-1:
                 if self.rec:
                     self.close()
                 self.done()
 
-            else:
-                #         0      1     2        3
-                # LRBA = left, right, bottom, aspect
-                LRBA = smooth(z, keyframes[c], keyframes[c+1])
-
-                left = LRBA[0]
-                bottom = LRBA[2]
-                width = LRBA[1] - LRBA[0]
-                height = width * 1/LRBA[3]
-
-                # left, bottom, width, height
-                rect = (left, bottom, width, height)
-
-                self.camera.rect = tuple(rect)
-
-            rect = self.camera.rect
-            rates = [rect.left, rect.right]
-            ends = [rect.bottom, rect.top]
-
-            zoom_plot(self.plotted, rates, ends)
+            self.show_frame(self.f)
 
             if self.rec:
-                rec_prefix = self.rec['pre']
                 project_name = self.rec['name']
 
-                image = self.render()
-                io.write_png(f'{rec_prefix}/{project_name}/{project_name}_{self.f}.png', image)
+                # render() draws without emitting a draw event
+                with timing.span('draw'):
+                    image = self.render()
+                timing.end()
+
+                self.sink.write(image, self.f)
 
                 ETA = (time() - start) * (self.f_max-self.f) # (time / frame) * frames remaining
                 ETA = (ETA / 60) / 60 # seconds to hours
@@ -444,37 +465,78 @@ class Figure(vp.Fig):
 
             self.f += 1
 
-    def done(self):
+    def show_frame(self, f):
+        """ move the camera to frame `f` of the zoom and resimulate the
+            bifurcations in view; depends only on `f` and the keyframes
+        """
 
-        if self.rec:
+        C = len(keyframes)
+        c = f // self.c_frames
+        z = (f/self.c_frames) % 1
+        #print(f, z, c, C)
 
-            rec_prefix = self.rec['pre']
-            project_name = self.rec['name']
+        if c < C-1:
+            #         0      1     2        3
+            # LRBA = left, right, bottom, aspect
+            LRBA = smooth(z, keyframes[c], keyframes[c+1])
 
-            convert_cmd = (f"""ffmpeg -f image2 -framerate {self.rec_fps}"""
-                               f""" -i {rec_prefix}/{project_name}/{project_name}_%d.png"""
-                               f""" -c:v prores_ks -profile:v 3 {project_name}.mov""")
+            left = LRBA[0]
+            bottom = LRBA[2]
+            width = LRBA[1] - LRBA[0]
+            height = width * 1/LRBA[3]
 
-            print('CONVERTING >>>', convert_cmd)
+            # left, bottom, width, height
+            rect = (left, bottom, width, height)
 
-            os.system(convert_cmd)
+            self.camera.rect = tuple(rect)
 
-            dir = (f"./{rec_prefix}/{project_name}")
-            filelist = [f for f in os.listdir(dir) if f.endswith(".png") ]
-            for f in filelist:
-                os.remove(os.path.join(dir, f))
+        rect = self.camera.rect
+        rates = [rect.left, rect.right]
+        ends = [rect.bottom, rect.top]
+
+        zoom_plot(self.plotted, rates, ends)
+
+    def render_frame(self, f):
+        """ frame `f` as an RGBA image, for batch rendering """
+        self.f = f
+        self.show_frame(f)
+        return self.render()
+
+    def done(self):
+
+        if self.rec:
+
+            # flush the queued frames and wait for the encoder
+            self.sink.close()
+            timing.close()
 
             print("Logistic zoom is completed")
             exit()
 
 
-if record_project:
-    rec_dict = {'pre':rec_prefix, 'name':project_name}
+if record_project and not batch_workers:
+    rec_dict = {'pre':rec_prefix, 'name':project_name, 'format':rec_format}
 else:
     rec_dict = None
 
 fig = Figure(show=False, title="Log Zoom", size=(2538, 1080),
                 record=rec_dict)
 
+def batch_setup():
+    """ runs once in every batch worker; returns the frame renderer """
+    return fig.render_frame
+
 if __name__ == '__main__':
-    fig.show(run=True)
+
+    if batch_workers:
+
+        render_batch(batch_setup, range(fig.f_max), frame_dir, project_name,
+                        workers=batch_workers)
+
+        if rec_format != 'png':
+            encode_sequence(frame_dir, project_name, fps=fig.rec_fps,
+                            out=f'{project_name}.{rec_format}',
+                            codec=CODECS.get(rec_format, CODECS['mov']))
+
+    else:
+        fig.show(run=True)
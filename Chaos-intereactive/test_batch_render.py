@@ -0,0 +1,55 @@
+"""
+Tests for batch_render : frames rendered by spawned workers land under the
+right names, and a second run only renders what is missing.
+"""
+
+import numpy as np
+import vispy.io as io
+
+from batch_render import render_batch, frame_path, format_eta, write_png_atomic
+
+
+def frame(f):
+    """ a frame whose pixels encode its number """
+    image = np.zeros((3, 5, 4), dtype=np.uint8)
+    image[..., 0] = f
+    image[..., 3] = 255
+    return image
+
+def setup():
+    # module level, so the spawned workers can unpickle it
+    return frame
+
+
+def test_render_batch_and_resume(tmp_path):
+    render_batch(setup, range(8), tmp_path, 'zoom', workers=2, offset=1)
+
+    paths = [frame_path(tmp_path, 'zoom', f + 1) for f in range(8)]
+    assert sorted(tmp_path.iterdir()) == sorted(paths)
+    for f, path in enumerate(paths):
+        assert io.read_png(str(path))[0, 0, 0] == f
+
+    # lose two frames, leave a temporary from a crashed worker behind
+    kept = {p: p.stat().st_mtime_ns for p in paths}
+    for p in paths[2], paths[5]:
+        p.unlink()
+        del kept[p]
+    (tmp_path / 'zoom_3.png.1234.tmp').write_bytes(b'half a frame')
+
+    render_batch(setup, range(8), tmp_path, 'zoom', workers=2, offset=1)
+
+    assert sorted(tmp_path.iterdir()) == sorted(paths)
+    assert io.read_png(str(paths[2]))[0, 0, 0] == 2
+    assert io.read_png(str(paths[5]))[0, 0, 0] == 5
+    assert {p: p.stat().st_mtime_ns for p in kept} == kept
+
+def test_write_png_atomic(tmp_path):
+    path = tmp_path / 'f_0.png'
+    write_png_atomic(path, frame(7))
+    assert [p.name for p in tmp_path.iterdir()] == ['f_0.png']
+    np.testing.assert_array_equal(io.read_png(str(path)), frame(7))
+
+def test_format_eta():
+    assert format_eta(0) == '0:00'
+    assert format_eta(59 * 60) == '0:59'
+    assert format_eta(3 * 3600 + 5 * 60 + 20) == '3:05'
@@ -0,0 +1,130 @@
+"""
+Tests for cpu_render : front to back compositing against values worked out
+by hand, and the headless camera against the TurntableCamera it replaces.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from vispy.scene.cameras import TurntableCamera
+from vispy.util import transforms
+
+from cpu_render import (HeadlessCamera, march, render_volume, volume_center,
+                        colormap_lut)
+
+
+# lut index is int(val * 4 + 0.5) : 0 -> blue, 0.25 -> green, 0.5 -> red
+LUT = np.array([[0, 0, 1, 1], [0, 1, 0, 1], [1, 0, 0, 1],
+                [1, 1, 1, 1], [1, 1, 1, 1]], dtype=np.float32)
+
+BLACK = np.array([0, 0, 0, 1], dtype=np.float64)
+
+
+def march_along_x(vol, step, bgcolor=BLACK):
+    """ one ray along +x through the middle of the (y, z) face """
+    image = np.zeros((1, 1, 4), dtype=np.uint8)
+    origin = np.array([-10.0, 1.5, 1.5])
+    dirs = np.array([[[1.0, 0.0, 0.0]]])
+    march(vol, LUT, 0.0, 1.0, origin, dirs, step, bgcolor, image)
+    return image[0, 0]
+
+
+def test_compositing_by_hand():
+    # x = 0, 1 at 0.5, x = 2, 3 at 0 : the ray enters at x = -0.5 and leaves
+    # at x = 3.5, 8 steps of 0.5 sample x = -0.5, 0, ..., 3.0, i.e. four
+    # samples of 0.5 (red), one of 0.25 (green, halfway) and three of 0
+    vol = np.zeros((4, 4, 4), dtype=np.float32)
+    vol[:, :, :2] = 0.5
+
+    # after the reds    : alpha = 1 - 0.5**4 = 0.9375, color red
+    # the green sample  : a2 = 0.25 * 0.0625 = 0.015625, alpha = 0.953125
+    # premultiplied out : r = 0.9375, g = 0.015625; zeros add nothing
+    np.testing.assert_array_equal(march_along_x(vol, 0.5),
+                                  [round(255 * 0.9375), round(255 * 0.015625),
+                                   0, 255])
+
+def test_uniform_volume():
+    # 8 samples of 0.3 : alpha = 1 - 0.7**8, color stays the lut entry 1
+    vol = np.full((4, 4, 4), 0.3, dtype=np.float32)
+    alpha = 1 - 0.7**8
+    np.testing.assert_array_equal(march_along_x(vol, 0.5),
+                                  [0, round(255 * alpha), 0, 255])
+
+    # over a transparent background the alpha channel is the ray's own
+    pixel = march_along_x(vol, 0.5, bgcolor=np.zeros(4))
+    assert pixel[3] == round(255 * alpha)
+
+def test_opaque_front_stops_the_ray():
+    vol = np.zeros((4, 4, 4), dtype=np.float32)
+    vol[:, :, 0] = 1.0                     # white, opaque
+    vol[:, :, 1:] = 0.5                    # red, never reached
+    np.testing.assert_array_equal(march_along_x(vol, 0.5), [255, 255, 255, 255])
+
+def test_missed_rays_show_the_background():
+    image = np.zeros((1, 1, 4), dtype=np.uint8)
+    march(np.ones((4, 4, 4), dtype=np.float32), LUT, 0.0, 1.0,
+          np.array([-10.0, 10.0, 1.5]), np.array([[[1.0, 0.0, 0.0]]]),
+          0.5, np.array([0.2, 0.4, 0.6, 1.0]), image)
+    np.testing.assert_array_equal(image[0, 0], [51, 102, 153, 255])
+
+
+CAMERAS = [dict(azimuth=0, elevation=90, distance=50, center=(0, 0, 0)),
+           dict(azimuth=30, elevation=30, distance=120, center=(4, -2, 7)),
+           dict(azimuth=-75, elevation=-10, distance=80, center=(10, 5, 0),
+                roll=15)]
+
+@pytest.mark.parametrize('params', CAMERAS)
+def test_camera_matches_turntable(params):
+    size = (64, 48)
+    fov = 20.0
+
+    turntable = TurntableCamera(fov=fov, **params)
+    turntable._update_projection_transform(*size)  # what the viewbox does
+
+    camera = HeadlessCamera(fov=fov, size=size, **params)
+    np.testing.assert_allclose(camera.matrix(), turntable.transform.matrix,
+                               atol=1e-9)
+
+    # every ray, pushed through the turntable view and projection, lands on
+    # the centre of its own pixel
+    origin, dirs = camera.rays()
+    points = origin + 10 * dirs
+
+    to_camera = np.linalg.inv(turntable.transform.matrix)
+    clip = np.c_[points.reshape(-1, 3), np.ones(points[..., 0].size)] \
+        @ to_camera @ turntable._projection.matrix
+    ndc = (clip[:, :2] / clip[:, 3:]).reshape(size[1], size[0], 2)
+
+    w, h = size
+    px = 2 * (np.arange(w) + 0.5) / w - 1
+    py = 1 - 2 * (np.arange(h) + 0.5) / h
+    np.testing.assert_allclose(ndc[..., 0], np.broadcast_to(px, (h, w)), atol=1e-9)
+    np.testing.assert_allclose(ndc[..., 1], np.broadcast_to(py[:, None], (h, w)),
+                               atol=1e-9)
+
+def test_render_volume_centred_view():
+    # a bright cube seen face on is centred and symmetric in the frame
+    vol = np.zeros((9, 9, 9), dtype=np.float32)
+    vol[3:6, 3:6, 3:6] = 1.0
+    matrix = transforms.translate((-4, -4, -4))
+
+    camera = HeadlessCamera(fov=30.0, size=(41, 41), elevation=0, azimuth=0,
+                            distance=40, center=volume_center(matrix, vol.shape))
+    assert camera.center == pytest.approx((0, 0, 0))
+
+    image = render_volume(vol, matrix, camera, colormap_lut('grays'),
+                          relative_step_size=0.25)
+
+    lit = image[..., 0] > 0
+    assert lit[20, 20] and not lit[0, 0]
+    np.testing.assert_array_equal(lit, lit[::-1])
+    np.testing.assert_array_equal(lit, lit[:, ::-1])
+
+    # the rays through the solid core (3 voxels) are lit, those that miss
+    # the interpolated edge (5 voxels) are not
+    def pixels(half_width, depth):
+        return 2 * 20.5 * (half_width / depth) / math.tan(math.radians(15))
+
+    assert pixels(1.5, 41.5) <= lit[20].sum() <= pixels(2.5, 37.5)
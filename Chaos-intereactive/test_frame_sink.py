@@ -0,0 +1,90 @@
+"""
+Tests for frame_sink : the bounded queue hands every frame to the worker in
+order, and worker errors reach the render thread.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from frame_sink import FrameSink, PNGSink
+
+
+class ListSink(FrameSink):
+    """ keeps (index, first pixel) of every frame, optionally slowly """
+
+    def __init__(self, queue_size=2, gate=None, fail_at=None):
+        self.consumed = []
+        self.finished = False
+        self.gate = gate
+        self.fail_at = fail_at
+        super().__init__(queue_size=queue_size)
+
+    def consume(self, image, index):
+        if self.gate is not None:
+            self.gate.wait()
+        if index == self.fail_at:
+            raise OSError('disk full')
+        self.consumed.append((index, int(image[0, 0, 0])))
+
+    def finish(self):
+        self.finished = True
+
+
+def frame(value):
+    return np.full((4, 6, 4), value, dtype=np.uint8)
+
+
+def test_frames_arrive_in_order():
+    with ListSink() as sink:
+        for f in range(50):
+            sink.write(frame(f))
+        sink.write(frame(99), index=1000)
+
+    assert sink.consumed == [(f, f) for f in range(50)] + [(1000, 99)]
+    assert sink.frames == 51
+    assert sink.finished
+
+
+def test_write_blocks_when_the_queue_is_full():
+    gate = threading.Event()
+    sink = ListSink(queue_size=2, gate=gate)
+
+    # one frame held by the worker, two in the queue, the fourth must wait
+    writer = threading.Thread(target=lambda: [sink.write(frame(f))
+                                              for f in range(4)])
+    writer.start()
+    writer.join(timeout=0.5)
+    assert writer.is_alive()
+
+    gate.set()
+    writer.join(timeout=5)
+    sink.close()
+    assert [i for i, _ in sink.consumed] == [0, 1, 2, 3]
+
+
+def test_worker_errors_are_raised_on_close():
+    sink = ListSink(fail_at=3)
+    for f in range(10):
+        try:
+            sink.write(frame(f))
+        except RuntimeError:
+            break
+
+    with pytest.raises(RuntimeError) as info:
+        sink.close()
+    assert isinstance(info.value.__cause__, OSError)
+    assert [i for i, _ in sink.consumed] == [0, 1, 2]
+
+    with pytest.raises(RuntimeError):
+        sink.write(frame(0))
+
+
+def test_png_sink(tmp_path):
+    with PNGSink(tmp_path, 'movie') as sink:
+        for f in range(3):
+            sink.write(frame(10 * f), f + 1)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        ['movie_1.png', 'movie_2.png', 'movie_3.png']
@@ -0,0 +1,93 @@
+"""
+Tests for frame_timing : spans add up per frame, statistics are taken over
+the window, and only frames between begin / end are recorded.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from vispy.util.event import EmitterGroup, Event
+
+from frame_timing import FrameTimer, time_canvas_draws
+
+
+def record(timer, **spans):
+    timer.begin()
+    for stage, ms in spans.items():
+        timer.add(stage, ms / 1e3)
+    timer.end()
+
+
+def test_stats_over_the_window():
+    timer = FrameTimer(window=100)
+    for i in range(150):
+        record(timer, simulate=i, transfer=1.0)
+
+    stats = timer.stats()
+    np.testing.assert_allclose(stats['simulate'],
+                               np.percentile(np.arange(50, 150), (50, 95)))
+    assert stats['transfer'] == pytest.approx((1.0, 1.0))
+    assert 'draw' not in stats
+    assert timer.frames == 150
+
+def test_spans_add_up_within_a_frame():
+    timer = FrameTimer()
+    timer.begin()
+    timer.add('simulate', 0.002)
+    timer.add('simulate', 0.003)
+    with timer.span('transfer'):
+        pass
+    timer.begin()                   # already open : no-op
+    timer.end()
+
+    assert timer.stats()['simulate'][0] == pytest.approx(5.0)
+    assert timer.stats()['transfer'][0] >= 0
+    assert timer.stats()['frame'][0] >= 0
+
+def test_spans_outside_frames_are_ignored():
+    timer = FrameTimer()
+    with timer.span('draw'):
+        pass
+    timer.add('simulate', 1.0)
+    timer.end()
+
+    assert timer.frames == 0
+    assert timer.stats() == {}
+    assert timer.summary() == 'no frames yet'
+
+def test_summary_and_log(tmp_path):
+    log = tmp_path / 'timing.jsonl'
+    timer = FrameTimer(log=log, name='zoom')
+    record(timer, simulate=3.0, custom=1.5)
+    record(timer, simulate=5.0)
+    timer.close()
+
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r['index'] for r in lines] == [0, 1]
+    assert [r['name'] for r in lines] == ['zoom', 'zoom']
+    assert [r['simulate'] for r in lines] == [3.0, 5.0]
+    assert lines[0]['custom'] == 1.5 and 'custom' not in lines[1]
+    assert lines[1]['frame'] >= 0
+
+    summary = timer.summary()
+    assert summary.startswith('frame ')
+    assert 'simulate 4.0/4.9' in summary
+
+def test_time_canvas_draws():
+    canvas = type('Canvas', (), {})()
+    canvas.events = EmitterGroup(source=canvas, draw=Event)
+
+    timer = FrameTimer()
+    frames = []
+    time_canvas_draws(canvas, timer, on_frame=lambda: frames.append(timer.frames))
+
+    canvas.events.draw()            # a repaint outside of a frame
+    timer.begin()
+    canvas.events.draw()            # closes the frame
+
+    assert frames == [1]
+    assert timer.frames == 1
+    assert 'draw' in timer.stats()
+    assert not timer.active
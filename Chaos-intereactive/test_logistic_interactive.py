@@ -0,0 +1,160 @@
+"""
+Tests for the plots of the interactive viewer : cobweb buffers, the bounded
+ring of bifurcation points and its two scatter layers, the min/max envelope
+and the per-pixel cobweb decimation, each against a plain Python reference.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+import pyqtgraph as pg
+
+from logistic_interactive import (logistic_map, cobweb_buffers, PointRing,
+                                  bifurc_plot, minmax_envelope, cobweb_segments)
+
+
+def orbit(r, x, n):
+    xs = [x]
+    for _ in range(n):
+        x = r * x * (1 - x)
+        xs.append(x)
+    return np.array(xs)
+
+
+def test_cobweb_buffers():
+    r, x0, n = 3.83, 0.2, 300
+    func_x, func_y, cob_x, cob_y, series = cobweb_buffers(
+                                    logistic_map, r, x0, n, 101, 0, 1)
+
+    np.testing.assert_allclose(func_x, np.linspace(0, 1, 101))
+    np.testing.assert_allclose(func_y, r * func_x * (1 - func_x))
+
+    xs = orbit(r, x0, n + 1)
+    np.testing.assert_array_equal(series, xs[:n + 1])
+
+    # (x, 0), then (x_k, x_k+1), (x_k+1, x_k+1), (x_k+1, x_k+2), ...
+    assert (cob_x[0], cob_y[0]) == (x0, 0)
+    np.testing.assert_array_equal(cob_x[1::3], xs[:n])
+    np.testing.assert_array_equal(cob_y[1::3], xs[1:n + 1])
+    np.testing.assert_array_equal(cob_x[2::3], xs[1:n + 1])
+    np.testing.assert_array_equal(cob_y[2::3], xs[1:n + 1])
+    np.testing.assert_array_equal(cob_y[3::3], xs[2:n + 2])
+
+    assert not series.flags.writeable
+    assert cobweb_buffers(logistic_map, r, x0, n, 101, 0, 1)[4] is series
+
+
+def ring_points(ring):
+    """ (x, y) of the ring in push order, oldest first """
+    x, y = ring.view()[:2]
+    order = (ring.head - ring.count + np.arange(ring.count)) % ring.capacity
+    return x[order], y[order]
+
+
+def test_point_ring_keeps_the_newest_points():
+    ring = PointRing(capacity=10)
+    pushed = []
+
+    for r in range(6):
+        ys = np.linspace(0, 1, 3) + r
+        ring.push(np.repeat(float(r), 3), ys)
+        pushed += list(zip([float(r)] * 3, ys))
+
+        x, y = ring_points(ring)
+        assert list(zip(x, y)) == pushed[-10:]
+        assert ring.count == min(len(pushed), 10)
+
+def test_point_ring_keeps_the_newest_batch_apart():
+    ring = PointRing(capacity=7)
+    for r in range(4):
+        ring.push(np.repeat(float(r), 3), np.arange(3.0))
+
+    # the ring wrapped; the newest batch is still whole, and plain floats
+    new_x, new_y = ring.newest()
+    np.testing.assert_array_equal(new_x, [3.0] * 3)
+    np.testing.assert_array_equal(new_y, np.arange(3.0))
+
+    for a in ring.view() + ring.newest():
+        assert a.dtype == np.float64
+
+def test_bifurc_plot_draws_the_newest_batch_on_top():
+    plt = pg.PlotItem()
+    y_vals = orbit(3.9, 0.3, 100)
+    for r in (3.5, 3.9):
+        bifurc_plot(plt, y_vals, r=r, discard=64, capacity=50)
+
+    history, newest = plt.items[:2]
+    assert newest.zValue() >= history.zValue()
+    assert plt.items.index(newest) > plt.items.index(history)
+
+    x, y = newest.getData()
+    np.testing.assert_array_equal(x, 3.9)
+    np.testing.assert_array_equal(y, y_vals[64:])
+    assert len(history.getData()[0]) == 50
+
+    # one brush and size per layer, kept across setData
+    assert history.opts['size'] == 1 and newest.opts['size'] == 5
+    assert newest.opts['brush'].color() != history.opts['brush'].color()
+
+def test_point_ring_batch_larger_than_capacity():
+    ring = PointRing(capacity=4)
+    ring.push(np.zeros(10), np.arange(10.0))
+    x, y = ring_points(ring)
+    np.testing.assert_array_equal(y, [6, 7, 8, 9])
+
+
+@pytest.mark.parametrize('i0, i1, buckets', [(0, 1000, 7), (13, 517, 50),
+                                             (0, 30, 100)])
+def test_minmax_envelope(i0, i1, buckets):
+    y = orbit(3.9, 0.3, 1000)
+    t, v = minmax_envelope(y, i0, i1, buckets)
+
+    assert np.all(np.diff(t) > 0)
+    np.testing.assert_array_equal(v, y[t.astype(int)])
+
+    # every non-empty bucket keeps its own minimum and maximum
+    n = i1 - i0
+    for b in range(buckets):
+        lo, hi = i0 + n * b // buckets, i0 + n * (b + 1) // buckets
+        if hi > lo:
+            inside = (t >= lo) & (t < hi)
+            assert v[inside].min() == y[lo:hi].min()
+            assert v[inside].max() == y[lo:hi].max()
+            assert inside.sum() <= 2
+
+
+def segment_key(xa, ya, xb, yb, x0, x1, y0, y1, width, height):
+    """ what a segment covers on screen : column or row, and its far end """
+
+    def px(v, v0, v1, n):
+        return min(max(math.floor((v - v0) * n / (v1 - v0)), -1), n)
+
+    if xa == xb and (ya == xa or yb == xa):
+        return ('v', px(xa, x0, x1, width),
+                px(yb if ya == xa else ya, y0, y1, height))
+    if ya == yb and (xa == ya or xb == ya):
+        return ('h', px(ya, y0, y1, height),
+                px(xb if xa == ya else xa, x0, x1, width))
+    return ('other', xa, ya, xb, yb)
+
+
+@pytest.mark.parametrize('view', [(0, 1, 0, 1, 40, 30),
+                                  (0.3, 0.6, 0.5, 0.9, 64, 48)])
+def test_cobweb_segments_cover_the_same_pixels(view):
+    _, _, x, y, _ = cobweb_buffers(logistic_map, 3.97, 0.4, 5000, 10, 0, 1)
+    keep = cobweb_segments(x, y, *view)
+
+    keys = [segment_key(x[k], y[k], x[k + 1], y[k + 1], *view)
+            for k in range(len(x) - 1)
+            if (x[k], y[k]) != (x[k + 1], y[k + 1])]
+    kept = [segment_key(x[k], y[k], x[k + 1], y[k + 1], *view) for k in keep]
+
+    assert np.all(np.diff(keep) > 0)
+    assert len(kept) == len(set(kept))
+    assert set(kept) == set(keys)
+    assert len(keep) < len(x) // 10
@@ -0,0 +1,86 @@
+"""
+Tests for volume_store : round trips through a `.tbv` file, partial reads,
+and the max-pooled pyramid against a brute force 2x2x2 max.
+"""
+
+import numpy as np
+import pytest
+
+from volume_store import (VolumeStore, write_volume, downsample_max,
+                          build_pyramid, write_pyramid, read_pyramid,
+                          pyramid_path, convert_npz)
+
+
+@pytest.fixture
+def vol():
+    rng = np.random.default_rng(0)
+    return rng.random((37, 20, 45)).astype(np.float32) * 5 - 1
+
+
+@pytest.mark.parametrize('dtype, atol', [('uint16', 6 / 65535),
+                                          ('float16', 4 * 2**-11)])
+def test_round_trip(tmp_path, vol, dtype, atol):
+    path = write_volume(tmp_path / 'v.tbv', vol, chunks=16, dtype=dtype,
+                        attrs={'D': 37})
+
+    with VolumeStore(path) as store:
+        assert store.shape == vol.shape
+        assert store.attrs == {'D': 37}
+        assert store.min == pytest.approx(vol.min())
+        assert store.max == pytest.approx(vol.max())
+        np.testing.assert_allclose(store.read(), vol, atol=atol)
+
+
+def test_partial_reads_only_touch_their_chunks(tmp_path, vol):
+    path = write_volume(tmp_path / 'v.tbv', vol, chunks=16)
+
+    with VolumeStore(path) as store:
+        full = store.read()
+        total = store.bytes_read
+
+    with VolumeStore(path) as store:
+        np.testing.assert_array_equal(store[:, 7, :], full[:, 7, :])
+        np.testing.assert_array_equal(store[3:30, -1, 40], full[3:30, -1, 40])
+        np.testing.assert_array_equal(store[..., 5:9], full[..., 5:9])
+        assert 0 < store.bytes_read < 3 * total
+
+    with VolumeStore(path) as store:
+        store[:, 7, :]
+        assert store.bytes_read < total
+
+        with pytest.raises(IndexError):
+            store[::2]
+        with pytest.raises(IndexError):
+            store[37]
+
+
+def test_convert_npz(tmp_path, vol):
+    np.savez_compressed(tmp_path / 'v.npz', data=vol)
+    path = convert_npz(tmp_path / 'v.npz', tmp_path / 'v.tbv')
+
+    with VolumeStore(path) as store:
+        np.testing.assert_allclose(store.read(), vol, atol=6 / 65535)
+
+
+def test_downsample_max_matches_brute_force(vol):
+    small = downsample_max(vol)
+    assert small.shape == tuple(-(-n // 2) for n in vol.shape)
+
+    for i, j, k in np.ndindex(*small.shape):
+        block = vol[2*i:2*i + 2, 2*j:2*j + 2, 2*k:2*k + 2]
+        assert small[i, j, k] == block.max()
+
+
+def test_pyramid_round_trip(tmp_path, vol):
+    pyramid = build_pyramid(vol, levels=5, min_size=4)
+    assert [v.shape for v in pyramid] == [(37, 20, 45), (19, 10, 23),
+                                          (10, 5, 12)]
+
+    write_pyramid(tmp_path / 'v.tbv', pyramid, chunks=8)
+    assert pyramid_path(tmp_path / 'v.tbv', 0) == tmp_path / 'v.tbv'
+    assert pyramid_path(tmp_path / 'v.tbv', 2).name == 'v_L2.tbv'
+
+    levels = read_pyramid(tmp_path / 'v.tbv')
+    assert len(levels) == 2
+    for stored, level in zip(levels, pyramid[1:]):
+        np.testing.assert_allclose(stored, level, atol=6 / 65535)
@@ -0,0 +1,375 @@
+"""
+Chunked, compressed storage for the triplebrot volume.
+
+`np.load(datafile)['data']` has to decompress the whole array before anything
+can be drawn, which is 8 GB at D=1000. Here the volume is cut into cubic
+chunks, each chunk is quantized (uint16 or float16) and zlib compressed on its
+own, and an index of chunk offsets lives in a footer at the end of the file.
+
+A `VolumeStore` only reads and decodes the chunks a request touches, so
+opening the viewer, reading a slab or a single plane is proportional to the
+bytes needed rather than to the size of the volume.
+
+Coarse, max-pooled copies of the volume (D/2, D/4, ...) are kept in sibling
+files `<name>_L1.tbv`, `<name>_L2.tbv`, ... for interactive viewing.
+
+File layout (`.tbv`):
+    MAGIC
+    chunk 0, chunk 1, ... (zlib streams, C order over the chunk grid)
+    header (utf-8 json: shape, chunks, dtype, scale, offset, index, attrs)
+    header offset (uint64, little endian)
+    MAGIC
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import itertools
+import struct
+import json
+import zlib
+import os
+
+import numpy as np
+
+MAGIC = b'TBVOL\x00\x01\x00'
+FOOTER = struct.Struct('<Q')
+
+QUANTIZATIONS = ('uint16', 'float16')
+
+
+def quantize(block, dtype, scale, offset):
+    """ map float data into the stored dtype """
+
+    if dtype == 'uint16':
+        q = np.rint((block - offset) / scale)
+        return np.clip(q, 0, 65535).astype('<u2')
+
+    return ((block - offset) / scale).astype('<f2')
+
+
+def dequantize(block, scale, offset):
+    """ inverse of `quantize`, always returns float32 """
+    return block.astype(np.float32) * np.float32(scale) + np.float32(offset)
+
+
+def write_volume(path, vol, chunks=64, dtype='uint16', level=6, attrs=None):
+    """
+        Write `vol` into a chunked store at `path`
+
+        chunks : edge length of the cubic chunks
+        dtype  : 'uint16' (linear over [min, max]) or 'float16'
+                 (normalized by max abs value)
+        level  : zlib compression level
+        attrs  : json-able dict kept alongside the data
+    """
+
+    if dtype not in QUANTIZATIONS:
+        raise ValueError(f"dtype must be one of {QUANTIZATIONS}, got {dtype}")
+
+    vol = np.asarray(vol)
+    vmin = float(vol.min())
+    vmax = float(vol.max())
+
+    if dtype == 'uint16':
+        offset = vmin
+        scale = (vmax - vmin) / 65535 if vmax > vmin else 1.0
+    else:
+        offset = 0.0
+        scale = max(abs(vmin), abs(vmax)) or 1.0
+
+    grid = [range(0, n, chunks) for n in vol.shape]
+
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+
+    index = []
+
+    with open(tmp, 'wb') as fh:
+        fh.write(MAGIC)
+
+        for corner in itertools.product(*grid):
+            region = tuple(slice(c, c + chunks) for c in corner)
+            q = quantize(vol[region], dtype, scale, offset)
+            payload = zlib.compress(np.ascontiguousarray(q).tobytes(), level)
+
+            index.append([fh.tell(), len(payload)])
+            fh.write(payload)
+
+        header = {
+            'shape': list(vol.shape),
+            'chunks': chunks,
+            'dtype': dtype,
+            'scale': scale,
+            'offset': offset,
+            'min': vmin,
+            'max': vmax,
+            'index': index,
+            'attrs': attrs or {},
+        }
+
+        header_offset = fh.tell()
+        fh.write(json.dumps(header).encode('utf-8'))
+        fh.write(FOOTER.pack(header_offset))
+        fh.write(MAGIC)
+
+    os.replace(tmp, path)
+
+    return path
+
+
+def downsample_max(vol):
+    """
+        Halve every axis of `vol` by taking the max over each 2x2x2 block.
+        Odd axes are edge-padded, so the result has shape ceil(shape / 2).
+
+        Max pooling (rather than averaging) keeps thin, bright filaments of
+        the triplebrot visible at coarse levels.
+    """
+
+    pad = [(0, n % 2) for n in vol.shape]
+
+    if any(p for _, p in pad):
+        vol = np.pad(vol, pad, mode='edge')
+
+    a, b, c = (n // 2 for n in vol.shape)
+
+    return vol.reshape(a, 2, b, 2, c, 2).max(axis=(1, 3, 5))
+
+
+def build_pyramid(vol, levels=3, min_size=16):
+    """
+        Multi-resolution (mipmap) pyramid : [vol, vol/2, vol/4, ...]
+
+        levels   : number of coarse levels to add below `vol`
+        min_size : stop before any axis would get smaller than this
+    """
+
+    pyramid = [vol]
+
+    for _ in range(levels):
+        if min(pyramid[-1].shape) // 2 < min_size:
+            break
+        pyramid.append(downsample_max(pyramid[-1]))
+
+    return pyramid
+
+
+def pyramid_path(path, level):
+    """ file holding pyramid `level` of the store at `path` (0 is `path`) """
+    path = Path(path)
+    if level == 0:
+        return path
+    return path.with_name(f'{path.stem}_L{level}{path.suffix}')
+
+
+def write_pyramid(path, pyramid, **kwargs):
+    """ write the coarse levels (pyramid[1:]) next to the store at `path` """
+    for level, vol in enumerate(pyramid[1:], start=1):
+        write_volume(pyramid_path(path, level), vol,
+                        attrs={'level': level}, **kwargs)
+
+
+def read_pyramid(path):
+    """
+        Read whatever coarse levels exist next to the store at `path`,
+        finest first. Returns an empty list if none were written.
+    """
+
+    pyramid = []
+    level = 1
+
+    while pyramid_path(path, level).exists():
+        with VolumeStore(pyramid_path(path, level)) as store:
+            pyramid.append(store.read())
+        level += 1
+
+    return pyramid
+
+
+def convert_npz(npz_path, path, **kwargs):
+    """ one-off conversion of a legacy `np.savez` volume into a store """
+    vol = np.load(npz_path)['data']
+    return write_volume(path, vol, **kwargs)
+
+
+class VolumeStore:
+    """
+        Lazy reader for a `.tbv` chunked volume
+
+        store = VolumeStore(path)
+        store.shape                  # no chunks decoded yet
+        plane = store[:, 500, :]     # decodes only chunks crossing y = 500
+        vol = store.read()           # everything, as float32
+
+        Decoded chunks are kept in a small LRU cache (`cache_bytes`) so that
+        neighbouring requests don't decompress the same chunk twice.
+    """
+
+    def __init__(self, path, cache_bytes=256 * 2**20):
+        self.path = Path(path)
+        self._fh = open(self.path, 'rb')
+
+        self._fh.seek(-(FOOTER.size + len(MAGIC)), os.SEEK_END)
+        footer = self._fh.read(FOOTER.size + len(MAGIC))
+
+        if footer[FOOTER.size:] != MAGIC:
+            raise ValueError(f"{self.path} is not a chunked volume store")
+
+        header_offset, = FOOTER.unpack(footer[:FOOTER.size])
+        header_size = (self.path.stat().st_size - header_offset
+                       - FOOTER.size - len(MAGIC))
+
+        self._fh.seek(header_offset)
+        header = json.loads(self._fh.read(header_size).decode('utf-8'))
+
+        self.shape = tuple(header['shape'])
+        self.chunks = header['chunks']
+        self.stored_dtype = np.dtype('<u2' if header['dtype'] == 'uint16'
+                                     else '<f2')
+        self.scale = header['scale']
+        self.offset = header['offset']
+        self.min = header['min']
+        self.max = header['max']
+        self.attrs = header['attrs']
+
+        self.grid = tuple(-(-n // self.chunks) for n in self.shape)
+        self._index = header['index']
+
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self.cache_limit = cache_bytes
+
+        self.bytes_read = 0
+
+    # --- plumbing
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return (f"VolumeStore({str(self.path)!r}, shape={self.shape},"
+                f" chunks={self.chunks}, dtype={self.stored_dtype.name})")
+
+    # --- chunk access
+
+    def chunk_shape(self, ci, cj, ck):
+        c = self.chunks
+        return tuple(min(c, n - i * c)
+                        for n, i in zip(self.shape, (ci, cj, ck)))
+
+    def chunk(self, ci, cj, ck):
+        """ decoded (float32) chunk at chunk-grid coordinates ci, cj, ck """
+
+        key = (ci, cj, ck)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        flat = (ci * self.grid[1] + cj) * self.grid[2] + ck
+        offset, nbytes = self._index[flat]
+
+        self._fh.seek(offset)
+        payload = self._fh.read(nbytes)
+        self.bytes_read += nbytes
+
+        q = np.frombuffer(zlib.decompress(payload), dtype=self.stored_dtype)
+        block = dequantize(q.reshape(self.chunk_shape(*key)),
+                            self.scale, self.offset)
+
+        self._cache[key] = block
+        self._cache_bytes += block.nbytes
+
+        while self._cache_bytes > self.cache_limit and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cache_bytes -= old.nbytes
+
+        return block
+
+    # --- region access
+
+    def read(self):
+        """ the whole volume as a float32 array """
+        return self[:, :, :]
+
+    def _normalize(self, key):
+
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        if any(k is Ellipsis for k in key):
+            e = key.index(Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:e] + fill + key[e + 1:]
+
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        if len(key) != self.ndim:
+            raise IndexError(f"too many indices for volume of shape {self.shape}")
+
+        bounds = []
+        squeeze = []
+
+        for axis, (k, n) in enumerate(zip(key, self.shape)):
+
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                if step != 1:
+                    raise IndexError("VolumeStore only supports unit-step slices")
+                bounds.append((start, max(start, stop)))
+
+            else:
+                i = int(k)
+                i = i + n if i < 0 else i
+                if not 0 <= i < n:
+                    raise IndexError(f"index {k} out of range for axis {axis}")
+                bounds.append((i, i + 1))
+                squeeze.append(axis)
+
+        return bounds, tuple(squeeze)
+
+    def __getitem__(self, key):
+
+        bounds, squeeze = self._normalize(key)
+        c = self.chunks
+
+        out = np.empty([b - a for a, b in bounds], dtype=np.float32)
+
+        chunk_ranges = [range(a // c, -(-b // c)) for a, b in bounds]
+
+        for ci, cj, ck in itertools.product(*chunk_ranges):
+
+            block = self.chunk(ci, cj, ck)
+
+            src = []
+            dst = []
+
+            for (a, b), i in zip(bounds, (ci, cj, ck)):
+                lo = max(a, i * c)
+                hi = min(b, (i + 1) * c)
+                src.append(slice(lo - i * c, hi - i * c))
+                dst.append(slice(lo - a, hi - a))
+
+            out[tuple(dst)] = block[tuple(src)]
+
+        if squeeze:
+            out = out.squeeze(axis=squeeze)
+
+        return out
@@ -1,7 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 from matplotlib.widgets import Slider
 
+from ensamble import ensamble_uniforme, evolucion_ensamble
+
 # PARTE 1
 
 # Parámetros iniciales
@@ -55,19 +58,37 @@ def generar_datos(r, x0, num_iter):
 r_inicial = 2.0      # Tasa de crecimiento inicial
 x0_inicial = 0.1     # Población inicial (como porcentaje del máximo)
 num_iter = 100        # Número de iteraciones
+n_ensamble = 100_000  # Poblaciones iniciales (10^5: se recalcula con cada slider)
+ancho_ensamble = 0.01   # Ancho del ensamble alrededor de x0
 
 # Genera los datos iniciales
 datos = generar_datos(r_inicial, x0_inicial, num_iter)
 
-# Configuración de la figura y el gráfico
-fig, ax = plt.subplots()
-plt.subplots_adjust(left=0.1, bottom=0.3)
+# Densidad de un ensamble de poblaciones alrededor de x0 en cada iteración
+def densidad_ensamble(r, x0):
+    x0s = ensamble_uniforme(x0, ancho_ensamble, n_ensamble)
+    return evolucion_ensamble(x0s, r, num_iter)
+
+# Configuración de la figura y los gráficos
+fig, (ax, ax_ens) = plt.subplots(1, 2, figsize=(12, 5))
+plt.subplots_adjust(left=0.1, bottom=0.3, wspace=0.3)
 linea, = ax.plot(datos, marker='o', linestyle='-', color='b')
 ax.set_ylim(0, 1)
 ax.set_xlabel("Iteración")
 ax.set_ylabel("Población (X)")
 ax.set_title("Evolución de la población de conejos (Mapa Logístico)")
 
+# Panel del ensamble: densidad de población (color) por iteración
+imagen_ens = ax_ens.imshow(densidad_ensamble(r_inicial, x0_inicial).T,
+                           origin='lower', aspect='auto', cmap='magma',
+                           norm=LogNorm(1e-2, 1e2),
+                           extent=[-0.5, num_iter + 0.5, 0, 1])
+ax_ens.set_facecolor("black")   # densidad cero
+ax_ens.set_xlabel("Iteración")
+ax_ens.set_ylabel("Población (X)")
+ax_ens.set_title(f"Densidad de {n_ensamble} poblaciones iniciales")
+fig.colorbar(imagen_ens, ax=ax_ens, label="Densidad")
+
 # Configuración de los sliders
 ax_r = plt.axes([0.15, 0.15, 0.75, 0.03])
 slider_r = Slider(ax_r, 'r', 0.1, 4.0, valinit=r_inicial)
@@ -81,6 +102,7 @@ def actualizar(val):
     x0_poblacion_inicial = slider_x0.val
     nuevos_datos = generar_datos(r, x0_poblacion_inicial, num_iter)
     linea.set_ydata(nuevos_datos)
+    imagen_ens.set_data(densidad_ensamble(r, x0_poblacion_inicial).T)
     fig.canvas.draw_idle()
 
 # Conecta los sliders a la función de actualización
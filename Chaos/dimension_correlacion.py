@@ -0,0 +1,201 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from numba import njit
+
+# --------------------------------------------
+# Dimensión de correlación (Grassberger-Procaccia)
+#
+#   C(eps) = fracción de pares de puntos a distancia < eps
+#   C(eps) ~ eps^D2   =>   D2 = pendiente de log C frente a log eps
+#
+# Los puntos son vectores de retardo de la órbita; la distancia es la del
+# máximo. En vez de calcular las N^2 distancias, los puntos se ordenan por
+# la primera coordenada y para cada punto de referencia solo se miran los
+# que caen en la ventana [x - eps_max, x + eps_max] (búsqueda binaria). Cada
+# par se suma una vez en un histograma sobre todos los radios a la vez.
+# --------------------------------------------
+
+# --------------------------------------------
+# 1) Órbita del mapa logístico y embebido con retardo
+# --------------------------------------------
+@njit(cache=True)
+def orbita_logistica(r, x0, num_iter, descartar=1000):
+    """
+    r: tasa de crecimiento
+    x0: población inicial
+    num_iter: cuántas iteraciones guardamos
+    descartar: cuántas iteraciones descartamos (transitorio)
+    """
+    x = x0
+    for _ in range(descartar):
+        x = r * x * (1 - x)
+    datos = np.empty(num_iter)
+    for i in range(num_iter):
+        x = r * x * (1 - x)
+        datos[i] = x
+    return datos
+
+def embebido(serie, dim, retardo=1):
+    """
+    Vectores (x_i, x_{i+retardo}, ..., x_{i+(dim-1)*retardo}) como un
+    array (dim, n), una fila por coordenada.
+    """
+    serie = np.asarray(serie, dtype=float)
+    n = len(serie) - (dim - 1) * retardo
+    return np.stack([serie[k * retardo:k * retardo + n] for k in range(dim)])
+
+# --------------------------------------------
+# 2) Conteo de vecinos en todos los radios en una pasada
+# --------------------------------------------
+@njit(cache=True)
+def _contar_vecinos(coords, posicion, referencias, radios, theiler):
+    """
+    coords: puntos (dim, n) ordenados por la primera coordenada
+    posicion: índice en la serie original de cada punto (ventana de Theiler)
+    referencias: puntos (en el orden ordenado) para los que se cuentan vecinos
+    radios: radios crecientes
+
+    Devuelve (hist, pares): hist[k] = pares con radios[k-1] <= d < radios[k]
+    (hist[0]: d < radios[0]) y pares = número de pares válidos.
+    """
+    dim, n = coords.shape
+    eps_max = radios[-1]
+    hist = np.zeros(len(radios), dtype=np.int64)
+    pares = 0
+
+    for i in referencias:
+        xi = coords[0, i]
+        lo = np.searchsorted(coords[0], xi - eps_max, side='right')
+        hi = np.searchsorted(coords[0], xi + eps_max, side='left')
+
+        for j in range(lo, hi):
+            if abs(posicion[j] - posicion[i]) < theiler:
+                continue
+            d = abs(coords[0, j] - xi)
+            for k in range(1, dim):
+                d = max(d, abs(coords[k, j] - coords[k, i]))
+                if d >= eps_max:
+                    break
+            if d < eps_max:
+                hist[np.searchsorted(radios, d, side='right')] += 1
+
+        # vecinos posibles: todos menos los de la ventana de Theiler
+        p = posicion[i]
+        pares += n - (min(n - 1, p + theiler - 1) - max(0, p - theiler + 1) + 1)
+
+    return hist, pares
+
+def _correlacion_dim(serie, dim, retardo, radios, theiler, n_referencias, semilla):
+    """Suma de correlación C(radios) para una dimensión de embebido."""
+    puntos = embebido(serie, dim, retardo)
+    orden = np.argsort(puntos[0], kind='stable')
+    coords = np.ascontiguousarray(puntos[:, orden])
+    n = coords.shape[1]
+
+    if n_referencias is None or n_referencias >= n:
+        referencias = np.arange(n)
+    else:
+        rng = np.random.default_rng(semilla)
+        referencias = np.sort(rng.choice(n, n_referencias, replace=False))
+
+    hist, pares = _contar_vecinos(coords, orden, referencias,
+                                  np.asarray(radios, dtype=float), theiler)
+    return np.cumsum(hist) / pares
+
+# --------------------------------------------
+# 3) Suma de correlación para varias dimensiones (en paralelo)
+# --------------------------------------------
+def suma_correlacion(serie, dims=range(1, 6), radios=None, retardo=1, theiler=1,
+                     n_referencias=10000, semilla=0, workers=None):
+    """
+    serie: órbita (1-D)
+    dims: dimensiones de embebido; cada una se calcula en un proceso
+    radios: radios crecientes; por defecto 21 entre 1e-4 y 1e-2 veces el
+            rango de la serie
+    theiler: se excluyen los pares con |i - j| < theiler (1 = solo i == j)
+    n_referencias: puntos de referencia al azar (None = todos); los vecinos
+                   se buscan siempre entre todos los puntos
+    workers: procesos del pool (None = os.cpu_count(), 1 = sin pool)
+
+    Devuelve (radios, C) con C de forma (len(dims), len(radios)).
+    """
+    serie = np.asarray(serie, dtype=float)
+    dims = list(dims)
+    if radios is None:
+        radios = np.logspace(-4, -2, 21) * (serie.max() - serie.min())
+    radios = np.asarray(radios, dtype=float)
+
+    tareas = [(serie, d, retardo, radios, theiler, n_referencias, semilla)
+              for d in dims]
+    if workers == 1:
+        C = [_correlacion_dim(*tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            C = list(pool.map(_correlacion_dim, *zip(*tareas)))
+
+    return radios, np.array(C)
+
+# --------------------------------------------
+# 4) Pendientes: dimensión de correlación
+# --------------------------------------------
+def pendientes_locales(radios, C):
+    """d log C / d log eps entre radios consecutivos, (len(dims), len(radios) - 1)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.diff(np.log(C), axis=-1) / np.diff(np.log(radios))
+
+def dimension_correlacion(radios, C, eps_min=None, eps_max=None):
+    """
+    Ajuste lineal de log C frente a log eps en [eps_min, eps_max] (por
+    defecto todos los radios), una pendiente por dimensión de embebido.
+    """
+    radios = np.asarray(radios)
+    mascara = np.ones(len(radios), dtype=bool)
+    if eps_min is not None:
+        mascara &= radios >= eps_min
+    if eps_max is not None:
+        mascara &= radios <= eps_max
+
+    return np.array([np.polyfit(np.log(radios[mascara]), np.log(fila[mascara]), 1)[0]
+                     for fila in np.atleast_2d(C)])
+
+
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+
+    num_iter = 1_000_000
+    dims = range(1, 6)
+
+    # r = 4: caos en todo [0, 1] (D2 = 1)
+    # r = 3.5699456...: punto de acumulación de Feigenbaum (D2 ~ 0.5)
+    casos = [(4.0, 'r = 4'), (3.5699456718695445, 'r = r_inf (Feigenbaum)')]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+
+    for (r, nombre), marca in zip(casos, ('o', 's')):
+        serie = orbita_logistica(r, 0.3, num_iter, 10_000)
+
+        inicio = time.time()
+        radios, C = suma_correlacion(serie, dims)
+        D2 = dimension_correlacion(radios, C)
+        print(f'{nombre}: {num_iter} puntos en {time.time() - inicio:.1f} s,'
+              f' D2 = {np.round(D2, 3)}')
+
+        for d, fila in zip(dims, C):
+            ax1.loglog(radios, fila, marker=marca, ms=3, label=f'{nombre}, m = {d}')
+        medios = np.sqrt(radios[1:] * radios[:-1])
+        for d, fila in zip(dims, pendientes_locales(radios, C)):
+            ax2.semilogx(medios, fila, marker=marca, ms=3)
+
+    ax1.set_xlabel("eps")
+    ax1.set_ylabel("C(eps)")
+    ax1.set_title("Suma de correlación")
+    ax1.legend(fontsize=7)
+    ax2.set_xlabel("eps")
+    ax2.set_ylabel("d log C / d log eps")
+    ax2.set_title("Pendientes locales (dimensión de correlación)")
+    ax2.set_ylim(0, 1.5)
+    ax2.grid(True)
+
+    plt.tight_layout()
+    plt.show()
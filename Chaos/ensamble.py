@@ -0,0 +1,86 @@
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+# --------------------------------------------
+# Evolución de un ensamble de condiciones iniciales
+#
+# En vez de seguir una sola trayectoria desde x0, se itera el mapa logístico
+# a la vez para muchas poblaciones iniciales (10^6 o más) y en cada paso se
+# cuenta cuántas caen en cada intervalo de [0, 1]. El resultado es la
+# densidad de población en función de la iteración, un array
+# (num_iter + 1, bins) listo para imshow: se ve cómo una distribución
+# estrecha se estira y se pliega hasta llenar el atractor.
+# --------------------------------------------
+
+# --------------------------------------------
+# 1) Condiciones iniciales
+# --------------------------------------------
+def ensamble_uniforme(x0, ancho, n):
+    """
+    n poblaciones iniciales equiespaciadas en [x0 - ancho/2, x0 + ancho/2],
+    recortadas a [0, 1].
+    """
+    return np.clip(np.linspace(x0 - ancho / 2, x0 + ancho / 2, n), 0.0, 1.0)
+
+# --------------------------------------------
+# 2) Histograma por iteración (Numba, en paralelo)
+# --------------------------------------------
+@njit(parallel=True, cache=True)
+def _contar(x0s, r, num_iter, bins, n_bloques):
+    """
+    Cada bloque de condiciones iniciales se itera en un hilo y cuenta en su
+    propio histograma (num_iter + 1, bins); al final se suman.
+    """
+    n = len(x0s)
+    parciales = np.zeros((n_bloques, num_iter + 1, bins), dtype=np.int64)
+
+    for b in prange(n_bloques):
+        for i in range(b * n // n_bloques, (b + 1) * n // n_bloques):
+            x = x0s[i]
+            for t in range(num_iter + 1):
+                # fuera de [0, 1] (o nan) la población ya no cuenta
+                if not 0.0 <= x <= 1.0:
+                    break
+                parciales[b, t, min(int(x * bins), bins - 1)] += 1
+                x = r * x * (1 - x)
+
+    return parciales.sum(axis=0)
+
+def evolucion_ensamble(x0s, r, num_iter, bins=200):
+    """
+    x0s: poblaciones iniciales (array 1-D)
+    r: tasa de crecimiento
+    num_iter: número de iteraciones (la fila 0 es la distribución inicial)
+    bins: intervalos en [0, 1]
+
+    Devuelve la densidad (num_iter + 1, bins): fila t = histograma de X_t
+    normalizado para que integre 1 en [0, 1].
+    """
+    x0s = np.ascontiguousarray(x0s, dtype=float)
+    cuentas = _contar(x0s, float(r), num_iter, bins, get_num_threads())
+    return cuentas * (bins / len(x0s))
+
+
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    num_iter = 60
+    x0s = ensamble_uniforme(0.2, 0.01, 1_000_000)
+
+    fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+    for ax, r in zip(axes, (3.2, 3.5, 3.9)):
+        inicio = time.time()
+        densidad = evolucion_ensamble(x0s, r, num_iter)
+        print(f'r = {r}: {len(x0s)} poblaciones x {num_iter} iteraciones'
+              f' en {time.time() - inicio:.2f} s')
+
+        ax.imshow(densidad.T, origin='lower', aspect='auto', cmap='magma',
+                  norm=LogNorm(1e-2, 1e2), extent=[-0.5, num_iter + 0.5, 0, 1])
+        ax.set_xlabel("Iteración")
+        ax.set_ylabel("Población (X)")
+        ax.set_title(f"Densidad del ensamble, r = {r}")
+
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,177 @@
+import numpy as np
+
+# --------------------------------------------
+# Densidad invariante por el método de Ulam
+#
+# Se divide [0, 1] en n intervalos. La probabilidad de pasar del intervalo
+# i al j en un paso del mapa logístico es la fracción de i que cae en j:
+#
+#   P[i, j] = |{x en i : r x (1 - x) en j}| / |i|
+#
+# y se calcula exactamente con la inversa del mapa en cada rama monótona.
+# P es una matriz de Markov dispersa (cada fila solo tiene unos pocos
+# destinos, como mucho r + 2). Su vector propio por la izquierda de valor
+# propio 1, p = p P, aproxima la densidad invariante. En lugar de iterar una
+# órbita larga e histogramarla, se hace iteración de potencias sobre p: cada
+# paso es un producto disperso, O(n * destinos), y en caos converge en unos
+# cientos de pasos.
+#
+# La matriz se guarda en formato de coordenadas (filas, columnas, pesos) y
+# el producto p P es un np.bincount. Para varios valores de r las matrices
+# se apilan en bloques diagonales y se resuelven todas a la vez.
+# --------------------------------------------
+
+# --------------------------------------------
+# 1) Matriz de transición de Ulam
+# --------------------------------------------
+def matriz_ulam(r, n=1000):
+    """
+    r: tasa de crecimiento (0 < r <= 4)
+    n: número de intervalos en [0, 1]
+
+    Devuelve (filas, columnas, pesos): P[filas[k], columnas[k]] = pesos[k],
+    sin repetidos, con cada fila sumando 1.
+    """
+    bordes = np.linspace(0, 1, n + 1)
+    a, b, fila = bordes[:-1], bordes[1:], np.arange(n)
+
+    # el intervalo que contiene 0.5 se parte en sus dos ramas monótonas
+    centro = (a < 0.5) & (b > 0.5)
+    a = np.concatenate([a, np.full(centro.sum(), 0.5)])
+    b = np.concatenate([np.where(centro, 0.5, b), b[centro]])
+    fila = np.concatenate([fila, fila[centro]])
+
+    # imagen [lo, hi] de cada trozo y los intervalos j que toca
+    fa, fb = r * a * (1 - a), r * b * (1 - b)
+    lo, hi = np.minimum(fa, fb), np.maximum(fa, fb)
+    j0 = np.minimum((lo * n).astype(np.int64), n - 1)
+    tocados = np.minimum((hi * n).astype(np.int64), n - 1) - j0 + 1
+
+    trozo = np.repeat(np.arange(len(a)), tocados)
+    primero = np.repeat(np.cumsum(tocados) - tocados, tocados)
+    j = j0[trozo] + np.arange(tocados.sum()) - primero
+
+    # longitud de la preimagen de [y1, y2]; es la misma en las dos ramas
+    def preimagen(y):
+        return 0.5 * (1 - np.sqrt(np.maximum(1 - 4 * y / r, 0)))
+
+    y1 = np.maximum(lo[trozo], j / n)
+    y2 = np.minimum(hi[trozo], (j + 1) / n)
+    longitud = preimagen(y2) - preimagen(y1)
+
+    # pares (i, j) repetidos se suman en un solo peso
+    codigos, repetidos = np.unique(fila[trozo] * n + j, return_inverse=True)
+    pesos = np.bincount(repetidos, weights=longitud)
+    filas, columnas = codigos // n, codigos % n
+
+    no_nulos = pesos > 0
+    filas, columnas, pesos = filas[no_nulos], columnas[no_nulos], pesos[no_nulos]
+    return filas, columnas, pesos / np.bincount(filas, weights=pesos)[filas]
+
+# --------------------------------------------
+# 2) Iteración de potencias dispersa
+# --------------------------------------------
+def _potencias(filas, columnas, pesos, n_bloques, n, tol, max_iter, cada=50):
+    """
+    Vector estacionario de cada bloque (n x n) de una matriz dispersa por
+    bloques diagonales; filas y columnas son bloque * n + estado.
+
+    Se itera p <- (p + p P) / 2: mismo vector estacionario que P, pero sin
+    oscilar cuando el atractor es un ciclo (ventanas periódicas). Cada
+    `cada` pasos se quitan los bloques cuyo cambio (L1) ya es menor que tol.
+    """
+    p = np.full((n_bloques, n), 1.0 / n)
+    bloque = filas // n
+    activos = np.arange(n_bloques)
+    paso = 0
+
+    while len(activos) and paso < max_iter:
+        # submatriz de los bloques activos, renumerados 0..len(activos) - 1
+        numero = np.full(n_bloques, -1)
+        numero[activos] = np.arange(len(activos))
+        dentro = numero[bloque] >= 0
+        f = numero[bloque[dentro]] * n + filas[dentro] % n
+        c = numero[bloque[dentro]] * n + columnas[dentro] % n
+        w = pesos[dentro]
+
+        q = p[activos].ravel()
+        for _ in range(min(cada, max_iter - paso)):
+            nuevo = 0.5 * (q + np.bincount(c, weights=w * q[f], minlength=len(q)))
+            cambio = np.abs(nuevo - q).reshape(-1, n).sum(axis=1)
+            q = nuevo
+            paso += 1
+
+        p[activos] = q.reshape(-1, n)
+        activos = activos[cambio >= tol]
+
+    return p
+
+def densidad_invariante(r, n=1000, tol=1e-10, max_iter=20000):
+    """
+    Densidad invariante del mapa logístico para un valor de r.
+
+    Devuelve (centros, densidad): centros de los n intervalos y la densidad
+    en cada uno, normalizada para que integre 1 en [0, 1].
+    """
+    filas, columnas, pesos = matriz_ulam(r, n)
+    p = _potencias(filas, columnas, pesos, 1, n, tol, max_iter)
+    return (np.arange(n) + 0.5) / n, p[0] * n
+
+def densidad_bifurcacion(r_values, n=400, tol=1e-8, max_iter=20000):
+    """
+    Densidad invariante para cada r de r_values, con todas las matrices en
+    una sola matriz dispersa por bloques. Devuelve un array (len(r_values), n):
+    cada fila es una columna del diagrama de bifurcación coloreada por
+    densidad.
+    """
+    r_values = np.asarray(r_values, dtype=float)
+    bloques = [matriz_ulam(r, n) for r in r_values]
+
+    desplazamiento = np.repeat(np.arange(len(r_values)) * n,
+                               [len(b[0]) for b in bloques])
+    filas = np.concatenate([b[0] for b in bloques]) + desplazamiento
+    columnas = np.concatenate([b[1] for b in bloques]) + desplazamiento
+    pesos = np.concatenate([b[2] for b in bloques])
+
+    p = _potencias(filas, columnas, pesos, len(r_values), n, tol, max_iter)
+    return p * n
+
+
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    # r = 4: densidad exacta 1 / (pi sqrt(x (1 - x)))
+    inicio = time.time()
+    centros, densidad = densidad_invariante(4.0)
+    bordes = np.linspace(0, 1, len(centros) + 1)
+    exacta = np.diff(2 / np.pi * np.arcsin(np.sqrt(bordes))) * len(centros)
+    print(f'r = 4: {time.time() - inicio:.3f} s,'
+          f' error L1 = {np.abs(densidad - exacta).sum() / len(centros):.2e}')
+
+    r_min, r_max = 2.4, 4.0
+    r_values = np.linspace(r_min, r_max, 800)
+    inicio = time.time()
+    imagen = densidad_bifurcacion(r_values)
+    print(f'{len(r_values)} valores de r en {time.time() - inicio:.1f} s')
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+
+    ax1.plot(centros, densidad, lw=1, label='Ulam')
+    ax1.plot(centros, exacta, 'k--', lw=1, label='1 / (pi sqrt(x (1 - x)))')
+    ax1.set_xlabel("X")
+    ax1.set_ylabel("Densidad")
+    ax1.set_title("Densidad invariante, r = 4")
+    ax1.set_ylim(0, 5)
+    ax1.legend()
+
+    ax2.imshow(imagen.T, origin='lower', aspect='auto', cmap='magma',
+               norm=LogNorm(1e-2, 1e2), extent=[r_min, r_max, 0, 1])
+    ax2.set_facecolor("black")
+    ax2.set_xlabel("r")
+    ax2.set_ylabel("X")
+    ax2.set_title("Diagrama de Bifurcación coloreado por densidad")
+
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from dimension_correlacion import (orbita_logistica, embebido, suma_correlacion,
+                                   dimension_correlacion)
+
+# --------------------------------------------
+# Suma de correlación frente a las N^2 distancias
+# --------------------------------------------
+def correlacion_directa(serie, dim, radios, theiler):
+    puntos = embebido(serie, dim).T
+    d = np.abs(puntos[:, None, :] - puntos[None, :, :]).max(axis=2)
+    i, j = np.indices(d.shape)
+    validos = np.abs(i - j) >= theiler
+    return np.array([(d[validos] < eps).sum() for eps in radios]) / validos.sum()
+
+@pytest.mark.parametrize('theiler', [1, 5])
+def test_suma_correlacion(theiler):
+    serie = orbita_logistica(3.9, 0.3, 600)
+    radios = np.logspace(-3, -0.5, 12)
+
+    radios, C = suma_correlacion(serie, dims=[1, 2, 4], radios=radios,
+                                 theiler=theiler, n_referencias=None, workers=1)
+
+    for fila, dim in zip(C, [1, 2, 4]):
+        np.testing.assert_allclose(fila, correlacion_directa(serie, dim, radios,
+                                                             theiler))
+
+def test_pool_y_referencias():
+    serie = orbita_logistica(4.0, 0.3, 2000)
+    radios = np.logspace(-3, -1, 5)
+
+    _, C1 = suma_correlacion(serie, dims=[1, 2], radios=radios,
+                             n_referencias=300, workers=1)
+    _, C2 = suma_correlacion(serie, dims=[1, 2], radios=radios,
+                             n_referencias=300, workers=2)
+    np.testing.assert_array_equal(C1, C2)
+
+def test_dimension_r4():
+    # r = 4: la órbita llena [0, 1], D2 = 1 (con 2 * 10^4 puntos sale ~0.9)
+    serie = orbita_logistica(4.0, 0.3, 20000)
+    radios, C = suma_correlacion(serie, dims=[1, 2], workers=1)
+    np.testing.assert_allclose(dimension_correlacion(radios, C), 1, atol=0.15)
@@ -0,0 +1,22 @@
+import numpy as np
+
+from ensamble import ensamble_uniforme, evolucion_ensamble
+
+# --------------------------------------------
+# Histograma por iteración frente a iterar el ensamble con numpy
+# --------------------------------------------
+def test_evolucion_ensamble():
+    x = ensamble_uniforme(0.2, 0.05, 10_001)
+    densidad = evolucion_ensamble(x, 3.9, 30, bins=64)
+
+    for t in range(31):
+        cuentas = np.bincount(np.minimum((x * 64).astype(int), 63), minlength=64)
+        np.testing.assert_allclose(densidad[t], cuentas * 64 / len(x))
+        x = 3.9 * x * (1 - x)
+
+def test_poblaciones_fuera_de_rango():
+    # con r > 4 las poblaciones que salen de [0, 1] dejan de contar
+    densidad = evolucion_ensamble(ensamble_uniforme(0.5, 0.1, 1000), 4.2, 5, 10)
+    assert densidad[0].sum() == 10
+    assert np.all(np.diff(densidad.sum(axis=1)) <= 0)
+    assert densidad[-1].sum() < 10
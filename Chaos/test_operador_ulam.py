@@ -0,0 +1,52 @@
+import numpy as np
+
+from operador_ulam import matriz_ulam, densidad_invariante, densidad_bifurcacion
+
+# --------------------------------------------
+# Matriz de Ulam y densidad invariante
+# --------------------------------------------
+def test_filas_suman_uno():
+    for r in (2.9, 3.5, 3.83, 4.0):
+        filas, columnas, pesos = matriz_ulam(r, 200)
+        np.testing.assert_allclose(np.bincount(filas, weights=pesos), 1)
+        assert np.all(pesos > 0)
+        assert len(np.unique(filas * 200 + columnas)) == len(filas)
+
+def test_pesos_frente_a_muestreo():
+    # fracción de cada intervalo que cae en cada destino, con muchos puntos
+    r, n = 3.7, 50
+    filas, columnas, pesos = matriz_ulam(r, n)
+    P = np.zeros((n, n))
+    P[filas, columnas] = pesos
+
+    x = (np.arange(n * 20000) + 0.5) / (n * 20000)
+    destino = np.minimum((r * x * (1 - x) * n).astype(int), n - 1)
+    muestreo = np.zeros((n, n))
+    np.add.at(muestreo, ((x * n).astype(int), destino), 1 / 20000)
+
+    np.testing.assert_allclose(P, muestreo, atol=1e-3)
+
+def test_densidad_r4():
+    # r = 4: densidad exacta 1 / (pi sqrt(x (1 - x))); Ulam la aproxima por
+    # intervalos y converge despacio cerca de las singularidades de 0 y 1
+    errores = []
+    for n in (200, 800):
+        _, densidad = densidad_invariante(4.0, n)
+        bordes = np.linspace(0, 1, n + 1)
+        exacta = np.diff(2 / np.pi * np.arcsin(np.sqrt(bordes))) * n
+
+        assert abs(densidad.sum() / n - 1) < 1e-12
+        # masa en 10 tramos de [0, 1]
+        masa = densidad.reshape(10, -1).sum(axis=1) / n
+        np.testing.assert_allclose(masa, exacta.reshape(10, -1).sum(axis=1) / n,
+                                   atol=0.03)
+        errores.append(np.abs(densidad - exacta).sum() / n)
+
+    assert errores[1] < errores[0] < 0.1
+
+def test_bifurcacion_igual_que_uno_a_uno():
+    r_values = [2.8, 3.2, 3.6, 3.9]
+    imagen = densidad_bifurcacion(r_values, n=150, tol=1e-12)
+    for r, fila in zip(r_values, imagen):
+        _, densidad = densidad_invariante(r, 150, tol=1e-12)
+        np.testing.assert_allclose(fila, densidad, atol=1e-6)
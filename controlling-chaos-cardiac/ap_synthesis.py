@@ -0,0 +1,91 @@
+"""
+Síntesis rápida de la señal de voltaje a partir de los tiempos de latido.
+
+`generate_voltage` sumaba la plantilla latido a latido: para cada latido
+construía `rel_t` y una máscara sobre toda la señal y evaluaba
+`np.vectorize(ap_waveform)` muestra a muestra, es decir O(latidos x muestras)
+llamadas a Python.
+
+Aquí la parte exponencial de la plantilla se calcula una sola vez por paso de
+muestreo y todos los latidos se suman de una vez con `np.bincount`. El coste es
+O(latidos x longitud de la plantilla).
+
+La colocación de cada latido es exacta a nivel de sub-muestra: si el latido
+cae a una fracción `f` de muestra antes de la muestra k = 0, el decaimiento en
+la muestra k vale exp(-f dt / tau) * exp(-(k dt - t_peak) / tau), es decir la
+plantilla precalculada por un factor por latido. Solo las pocas muestras de
+la subida (t < t_peak) se evalúan aparte.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+# =============================================================================
+# 1. Plantilla del potencial de acción
+# =============================================================================
+@lru_cache(maxsize=16)
+def ap_template(dt, t_peak=0.01, tau_decay=0.05, tol=1e-7):
+    """
+    Decaimiento de la plantilla de `ap_waveform`, exp(-(k dt - t_peak) / tau),
+    para k desde 0 hasta que cae por debajo de `tol`, y número de muestras de
+    la subida.
+
+    Devuelve (decaimiento, muestras de subida). El resultado se guarda en
+    caché y es de solo lectura.
+    """
+    duration = t_peak + tau_decay * np.log(1 / tol)
+    length = int(np.ceil(duration / dt)) + 1
+
+    decay = np.exp(-(np.arange(length) * dt - t_peak) / tau_decay)
+    decay.flags.writeable = False
+
+    # muestras que pueden caer antes de t_peak (con desfase de hasta dt)
+    n_rise = min(int(np.ceil(t_peak / dt)) + 1, length)
+
+    return decay, n_rise
+
+
+# =============================================================================
+# 2. Suma de los latidos
+# =============================================================================
+def synthesize_voltage(beat_times, n_samples, dt, t_peak=0.01,
+                       tau_decay=0.05, block=1024):
+    """
+    Señal sin ruido de `n_samples` muestras (t_i = i * dt) con un potencial de
+    acción en cada tiempo de `beat_times`.
+
+    Cada latido aporta a las muestras con t_i >= bt. Los latidos se procesan
+    en bloques de `block` para acotar la memoria.
+    """
+    decay, n_rise = ap_template(dt, t_peak, tau_decay)
+    length = len(decay)
+
+    beat_times = np.asarray(beat_times, dtype=float)
+    beat_times = beat_times[(beat_times >= 0) & (beat_times <= (n_samples - 1) * dt)]
+
+    v = np.zeros(n_samples)
+    k = np.arange(length)
+
+    for start in range(0, len(beat_times), block):
+        bt = beat_times[start:start + block]
+
+        first = np.ceil(bt / dt)
+
+        # tiempo de la primera muestra tras el latido, en [0, dt)
+        lag = (first * dt - bt)[:, None]
+
+        values = np.exp(-lag / tau_decay) * decay[None, :]
+
+        rel = lag + k[None, :n_rise] * dt
+        values[:, :n_rise] = np.where(rel < t_peak, (rel / t_peak) ** 2,
+                                      values[:, :n_rise])
+
+        index = first.astype(np.int64)[:, None] + k[None, :]
+
+        inside = index < n_samples
+        v += np.bincount(index[inside], weights=values[inside],
+                         minlength=n_samples)
+
+    return v
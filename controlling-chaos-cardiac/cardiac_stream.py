@@ -0,0 +1,139 @@
+"""
+Generador de la señal cardiaca en tiempo real, por bloques.
+
+`generate_voltage` construye toda la señal de una vez para una duración fija.
+Aquí la señal se produce en bloques de tamaño fijo y sin fin:
+
+    stream = CardiacStream(r=3.8, fs=1000, block=256)
+    for t0, v in stream.blocks(duration=3600):   # una hora, memoria constante
+        ...
+    stream.r = 3.5                               # cambia r en vivo
+
+Entre bloques se conserva el estado del mapa logístico, el tiempo del próximo
+latido y la cola de los potenciales de acción que siguen decayendo en el
+bloque siguiente, así que la señal es continua. `RingBuffer` guarda las
+últimas muestras para una gráfica con desplazamiento.
+"""
+
+import numpy as np
+
+from ap_synthesis import ap_template, synthesize_voltage
+
+
+# =============================================================================
+# 1. Generador por bloques
+# =============================================================================
+class CardiacStream:
+    """
+    Señal de voltaje con intervalos del mapa logístico, bloque a bloque.
+
+    r puede cambiarse en cualquier momento; el cambio se aplica a partir del
+    siguiente intervalo. Las muestras están en t_i = i / fs.
+    """
+
+    def __init__(self, r=3.2, fs=1000, block=256, x0=0.5, noise=0.02,
+                 scale_min=0.20, scale_max=0.40, t_peak=0.01,
+                 tau_decay=0.05, seed=None):
+        self.r = r
+        self.fs = fs
+        self.dt = 1 / fs
+        self.block = block
+        self.x = x0
+        self.noise = noise
+        self.scale_min = scale_min
+        self.scale_max = scale_max
+        self.t_peak = t_peak
+        self.tau_decay = tau_decay
+        self.rng = np.random.default_rng(seed)
+
+        decay, _ = ap_template(self.dt, t_peak, tau_decay)
+
+        # bloque actual + cola de los latidos ya colocados
+        self._acc = np.zeros(block + len(decay))
+
+        self.samples = 0        # muestras producidas
+        self.beats = 0          # latidos colocados
+
+        # tiempo del próximo latido, relativo al inicio del bloque actual
+        self._next_beat = self._interval()
+
+    def _interval(self):
+        """Avanza el mapa un paso y devuelve el intervalo escalado (s)."""
+        self.x = self.r * self.x * (1 - self.x)
+        return self.scale_min + (self.scale_max - self.scale_min) * self.x
+
+    def next_block(self):
+        """Devuelve (t0, v) con las `block` muestras siguientes."""
+        span = self.block * self.dt
+
+        beats = []
+        while self._next_beat < span:
+            beats.append(self._next_beat)
+            self._next_beat += self._interval()
+
+        if beats:
+            self._acc += synthesize_voltage(beats, len(self._acc), self.dt,
+                                            self.t_peak, self.tau_decay)
+            self.beats += len(beats)
+
+        v = self._acc[:self.block].copy()
+
+        # la cola pasa al principio para el siguiente bloque
+        self._acc[:-self.block] = self._acc[self.block:]
+        self._acc[-self.block:] = 0
+        self._next_beat -= span
+
+        t0 = self.samples * self.dt
+        self.samples += self.block
+
+        if self.noise:
+            v += self.noise * self.rng.standard_normal(self.block)
+        np.clip(v, 0, 1.2, out=v)
+
+        return t0, v
+
+    def blocks(self, duration=None):
+        """Generador de bloques (t0, v); sin fin si `duration` es None."""
+        n = None if duration is None else int(np.ceil(duration / (self.block * self.dt)))
+        i = 0
+        while n is None or i < n:
+            yield self.next_block()
+            i += 1
+
+
+# =============================================================================
+# 2. Buffer circular
+# =============================================================================
+class RingBuffer:
+    """Últimas `capacity` muestras, en un array de tamaño fijo."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity)
+        self.head = 0
+        self.count = 0
+
+    def write(self, values):
+        values = np.asarray(values)[-self.capacity:]
+        n = len(values)
+        end = self.head + n
+
+        if end <= self.capacity:
+            self.data[self.head:end] = values
+        else:
+            k = self.capacity - self.head
+            self.data[self.head:] = values[:k]
+            self.data[:n - k] = values[k:]
+
+        self.head = end % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def latest(self, n=None):
+        """Últimas `n` muestras (todas por defecto) en orden cronológico."""
+        n = self.count if n is None else min(n, self.count)
+        start = (self.head - n) % self.capacity
+
+        if start + n <= self.capacity:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:],
+                               self.data[:start + n - self.capacity]))
@@ -1,7 +1,14 @@
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button
 
+from ap_synthesis import synthesize_voltage
+from cardiac_stream import CardiacStream, RingBuffer
+from regime_sweep import draw_regimes, regime_legend_handles, regime_map
+from state_table import StateTable
+
 # =============================================================================
 # 1. Modelo del intervalo entre latidos (mapa logístico)
 # =============================================================================
@@ -40,19 +47,13 @@ def ap_waveform(t, t_peak=0.01, tau_decay=0.05):
     else:
         return np.exp(-(t - t_peak) / tau_decay)
 
-ap_vec = np.vectorize(ap_waveform)
-
 def generate_voltage(beat_times, total_time=5.0, fs=1000, noise=0.02):
     """
     Construye la señal de voltaje sumando la plantilla en cada tiempo de latido.
+    La plantilla se precalcula una vez por paso de muestreo (ap_synthesis.py).
     """
     t = np.linspace(0, total_time, int(total_time * fs))
-    v = np.zeros_like(t)
-    for bt in beat_times:
-        if bt <= total_time:
-            rel_t = t - bt
-            mask = rel_t >= 0
-            v[mask] += ap_vec(rel_t[mask])
+    v = synthesize_voltage(beat_times, len(t), total_time / (len(t) - 1))
     v += noise * np.random.randn(len(v))
     v = np.clip(v, 0, 1.2)          # evitar valores negativos irreales
     return t, v
@@ -65,9 +66,23 @@ TOTAL_TIME = 5.0          # segundos
 N_INTERVALS = 200         # número de intervalos a generar
 TRANSIENT = 50            # intervalos iniciales a descartar para el mapa
 
+# Modo tiempo real (botón 'Tiempo real')
+STREAM_FS = 1000          # Hz
+STREAM_BLOCK = 256        # muestras por bloque
+STREAM_WINDOW = 5.0       # segundos visibles en la gráfica con desplazamiento
+
+# Estados precalculados para los 151 valores del slider (state_table.py)
+table = StateTable(2.5, 4.0, 0.01, n_intervals=N_INTERVALS,
+                   transient=TRANSIENT, total_time=TOTAL_TIME)
+
+stream = None             # CardiacStream mientras el modo está activo
+ring = None
+stream_timer = None
+stream_start = 0.0
+
 # Crear la figura y los ejes
 fig, (ax_voltage, ax_poincare) = plt.subplots(1, 2, figsize=(12, 5))
-plt.subplots_adjust(bottom=0.25)   # espacio para los widgets
+plt.subplots_adjust(bottom=0.30)   # espacio para los widgets
 
 # Elementos que se actualizarán
 line_voltage, = ax_voltage.plot([], [], 'k-', lw=0.8)
@@ -94,20 +109,31 @@ ax_poincare.grid(True, alpha=0.3)
 # 4. Función de actualización
 # =============================================================================
 def update_plot(r):
-    """Genera nuevos datos con el parámetro r y actualiza la figura."""
-    intervals = generate_intervals(r, n_intervals=N_INTERVALS)
-    beat_times = np.cumsum(intervals)
-    beat_times_in_window = beat_times[beat_times <= TOTAL_TIME]
+    """
+    Actualiza la figura para el parámetro r. Los valores del slider se leen
+    de la tabla precalculada; cualquier otro r se calcula en el momento.
+    """
+    state = table.lookup(r)
 
-    # Voltaje
-    t, v = generate_voltage(beat_times_in_window, total_time=TOTAL_TIME)
-    line_voltage.set_data(t, v)
+    if state is not None:
+        t, v, offsets = state
+    else:
+        intervals = generate_intervals(r, n_intervals=N_INTERVALS)
+        beat_times = np.cumsum(intervals)
+        beat_times_in_window = beat_times[beat_times <= TOTAL_TIME]
+        t, v = generate_voltage(beat_times_in_window, total_time=TOTAL_TIME)
+
+        # Mapa de Poincaré (descartando transitorios)
+        intervals_steady = intervals[TRANSIENT:]
+        offsets = np.c_[intervals_steady[:-1], intervals_steady[1:]]
+
+    if stream is not None:
+        # en tiempo real el voltaje sigue fluyendo; solo cambia r
+        stream.r = r
+    else:
+        line_voltage.set_data(t, v)
 
-    # Mapa de Poincaré (descartando transitorios)
-    intervals_steady = intervals[TRANSIENT:]
-    I_n = intervals_steady[1:]
-    I_n_minus_1 = intervals_steady[:-1]
-    scat_poincare.set_offsets(np.c_[I_n_minus_1, I_n])
+    scat_poincare.set_offsets(offsets)
 
     # Línea diagonal
     diag = np.linspace(0.15, 0.45, 10)
@@ -119,6 +145,44 @@ def update_plot(r):
 
     fig.canvas.draw_idle()
 
+def stream_step():
+    """Produce los bloques que marca el reloj y desplaza la ventana."""
+    due = (time.perf_counter() - stream_start) * STREAM_FS
+    while stream.samples < due:
+        t0, v = stream.next_block()
+        ring.write(v)
+
+    v = ring.latest()
+    t = (stream.samples - len(v) + np.arange(len(v))) / STREAM_FS
+    t_end = stream.samples / STREAM_FS
+
+    line_voltage.set_data(t, v)
+    ax_voltage.set_xlim(max(0, t_end - STREAM_WINDOW), max(STREAM_WINDOW, t_end))
+    fig.canvas.draw_idle()
+
+def toggle_stream(event):
+    """Activa o detiene el modo tiempo real."""
+    global stream, ring, stream_timer, stream_start
+
+    if stream_timer is None:
+        stream = CardiacStream(r=r_slider.val, fs=STREAM_FS, block=STREAM_BLOCK)
+        ring = RingBuffer(int(STREAM_WINDOW * STREAM_FS))
+        stream_start = time.perf_counter()
+
+        stream_timer = fig.canvas.new_timer(interval=40)
+        stream_timer.add_callback(stream_step)
+        stream_timer.start()
+        btn_stream.label.set_text('Detener')
+    else:
+        stream_timer.stop()
+        stream_timer = None
+        stream = None
+        ring = None
+        btn_stream.label.set_text('Tiempo real')
+
+        ax_voltage.set_xlim(0, TOTAL_TIME)
+        update_plot(r_slider.val)
+
 # =============================================================================
 # 5. Creación de los widgets
 # =============================================================================
@@ -133,6 +197,15 @@ r_slider = Slider(
     valstep=0.01
 )
 
+# Regímenes (periodo-k o caos) para toda la rejilla de r, sobre el slider
+regime_r, regime_period = regime_map(r_slider.valmin, r_slider.valmax, 1e-4,
+                                     n_intervals=N_INTERVALS, transient=TRANSIENT)
+ax_regimes = plt.axes([0.20, 0.135, 0.60, 0.015])
+draw_regimes(ax_regimes, regime_r, regime_period)
+ax_regimes.set_axis_off()
+fig.legend(handles=regime_legend_handles(), loc='lower center',
+           bbox_to_anchor=(0.5, 0.15), ncol=6, fontsize=8, frameon=False)
+
 # Botones para valores típicos
 ax_btn_p1 = plt.axes([0.15, 0.02, 0.12, 0.05])
 btn_p1 = Button(ax_btn_p1, 'Periodo‑1 (2.8)')
@@ -142,6 +215,8 @@ ax_btn_p4 = plt.axes([0.45, 0.02, 0.12, 0.05])
 btn_p4 = Button(ax_btn_p4, 'Periodo‑4 (3.5)')
 ax_btn_chaos = plt.axes([0.60, 0.02, 0.12, 0.05])
 btn_chaos = Button(ax_btn_chaos, 'Caos (3.8)')
+ax_btn_stream = plt.axes([0.75, 0.02, 0.12, 0.05])
+btn_stream = Button(ax_btn_stream, 'Tiempo real')
 
 # Conexión de los callbacks
 r_slider.on_changed(update_plot)
@@ -150,9 +225,11 @@ btn_p1.on_clicked(lambda event: r_slider.set_val(2.8))
 btn_p2.on_clicked(lambda event: r_slider.set_val(3.2))
 btn_p4.on_clicked(lambda event: r_slider.set_val(3.5))
 btn_chaos.on_clicked(lambda event: r_slider.set_val(3.8))
+btn_stream.on_clicked(toggle_stream)
 
 # =============================================================================
 # 6. Mostrar la figura y la primera actualización
 # =============================================================================
+table.start(on_done=lambda table: print(table.report()))
 update_plot(r_slider.val)
 plt.show()
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Generador de conjuntos de registros sintéticos (voltaje de potenciales de
+acción con intervalos del mapa logístico) para entrenar modelos.
+
+`generate_intervals` y `generate_voltage` producen una sola traza por
+llamada. Aquí se generan miles de registros que recorren r, x0, noise y el
+escalado scale_min / scale_max:
+
+    params = sample_parameters(10000, seed=1)
+    meta = generate_dataset('registros.npy', params, seed=1)
+
+El voltaje se escribe directamente en un .npy mapeado en memoria de forma
+(n_registros, n_muestras), sin pasar por la RAM del proceso principal, y los
+parámetros de cada registro se guardan en un .csv al lado. Los registros se
+reparten por bloques en un pool de procesos; dentro de cada bloque el mapa
+logístico se itera a la vez para todos los registros. Cada registro tiene
+su propio `np.random.Generator`, derivado con `SeedSequence.spawn`, así que
+el resultado no depende del número de procesos ni del tamaño de bloque.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import os
+
+import numpy as np
+
+from ap_synthesis import synthesize_voltage
+from regime_sweep import classify_period, sweep_intervals
+
+
+PARAMETERS = ('r', 'x0', 'noise', 'scale_min', 'scale_max')
+
+
+# =============================================================================
+# 1. Parámetros de los registros
+# =============================================================================
+def sample_parameters(n_records, seed=None, r=(2.5, 4.0), x0=(0.05, 0.95),
+                      noise=(0.0, 0.05), scale_min=(0.15, 0.25),
+                      scale_max=(0.35, 0.50)):
+    """
+    Parámetros uniformes en los rangos dados (mín, máx), un valor por
+    registro. Devuelve un dict {nombre: array (n_records,)}.
+    """
+    rng = np.random.default_rng(seed)
+    ranges = {'r': r, 'x0': x0, 'noise': noise,
+              'scale_min': scale_min, 'scale_max': scale_max}
+
+    return {name: rng.uniform(*ranges[name], n_records) for name in PARAMETERS}
+
+
+# =============================================================================
+# 2. Generación por bloques (en cada proceso)
+# =============================================================================
+def _write_block(path, start, params, seeds, total_time, n_generated,
+                 n_intervals, transient):
+    """
+    Escribe los registros start..start+len(seeds) en el .npy de `path` y
+    devuelve (start, latidos por registro, periodo por registro).
+
+    Se generan `n_generated` intervalos por registro y el periodo se
+    clasifica siempre en la ventana [transient, n_intervals), de modo que
+    no depende de qué registros comparten bloque.
+    """
+    out = np.load(path, mmap_mode='r+')
+    n_samples = out.shape[1]
+    dt = total_time / (n_samples - 1)
+
+    intervals = sweep_intervals(params['r'], n_generated, params['x0'],
+                                params['scale_min'], params['scale_max'])
+    beat_times = np.cumsum(intervals, axis=1)
+
+    n_beats = (beat_times <= total_time).sum(axis=1)
+    period = classify_period(intervals[:, transient:n_intervals])
+
+    for i, seed in enumerate(seeds):
+        bt = beat_times[i, :n_beats[i]]
+
+        v = synthesize_voltage(bt, n_samples, dt)
+        rng = np.random.default_rng(seed)
+        v += params['noise'][i] * rng.standard_normal(n_samples)
+        np.clip(v, 0, 1.2, out=v)
+
+        out[start + i] = v
+
+    out.flush()
+    return start, n_beats, period
+
+
+# =============================================================================
+# 3. Conjunto completo
+# =============================================================================
+def generate_dataset(path, params, total_time=5.0, fs=1000, seed=None,
+                     workers=None, block=256, n_intervals=200, transient=50,
+                     dtype=np.float32):
+    """
+    Genera un registro por fila de `params` (ver `sample_parameters`).
+
+    path    : .npy de salida, forma (n_registros, int(total_time * fs))
+    seed    : semilla raíz; cada registro recibe un hijo de SeedSequence(seed)
+    workers : procesos del pool (None = os.cpu_count(), 1 = sin pool)
+    block   : registros por tarea
+
+    El periodo se clasifica como en regime_sweep, con `n_intervals`
+    intervalos sin los `transient` primeros (los de la figura por defecto).
+
+    Escribe además `path` con extensión .csv: un registro por fila con sus
+    parámetros, número de latidos y periodo (0 = caos). Devuelve la tabla
+    como dict de arrays.
+    """
+    params = {name: np.asarray(params[name], dtype=float) for name in PARAMETERS}
+    n_records = len(params['r'])
+    n_samples = int(total_time * fs)
+
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype,
+                                    shape=(n_records, n_samples))
+    del out
+
+    seeds = np.random.SeedSequence(seed).spawn(n_records)
+
+    # intervalos suficientes para cubrir la duración con el escalado mínimo
+    # de todo el conjunto (no de cada bloque)
+    n_generated = max(n_intervals,
+                      int(np.ceil(total_time / params['scale_min'].min())) + 1)
+
+    tasks = []
+    for start in range(0, n_records, block):
+        stop = min(start + block, n_records)
+        tasks.append((path, start,
+                      {name: values[start:stop] for name, values in params.items()},
+                      seeds[start:stop], total_time, n_generated, n_intervals,
+                      transient))
+
+    meta = dict(params)
+    meta['n_beats'] = np.zeros(n_records, dtype=np.int64)
+    meta['period'] = np.zeros(n_records, dtype=np.int64)
+
+    if workers == 1:
+        results = (_write_block(*task) for task in tasks)
+        _collect(results, meta)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            _collect(pool.map(_write_block, *zip(*tasks)), meta)
+
+    write_metadata(os.path.splitext(path)[0] + '.csv', meta)
+    return meta
+
+def _collect(results, meta):
+    for start, n_beats, period in results:
+        meta['n_beats'][start:start + len(n_beats)] = n_beats
+        meta['period'][start:start + len(period)] = period
+
+def write_metadata(path, meta):
+    """Tabla de metadatos en CSV, con columna `record` (fila del .npy)."""
+    columns = list(meta)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['record'] + columns)
+        for i, row in enumerate(zip(*(meta[c] for c in columns))):
+            writer.writerow([i] + [f'{v:.6g}' for v in row])
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Registros sintéticos')
+    parser.add_argument('path', help='archivo .npy de salida')
+    parser.add_argument('-n', '--records', type=int, default=1000)
+    parser.add_argument('-t', '--total-time', type=float, default=5.0)
+    parser.add_argument('--fs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.time()
+    params = sample_parameters(args.records, seed=args.seed)
+    meta = generate_dataset(args.path, params, args.total_time, args.fs,
+                            seed=args.seed, workers=args.workers)
+    print(f'{args.records} registros en {time.time() - start:.1f} s;'
+          f' caos en {np.mean(meta["period"] == 0):.0%}')
@@ -0,0 +1,355 @@
+"""
+Métricas de variabilidad (HRV) y no lineales sobre series de intervalos.
+
+Pensado para series largas (horas de latidos, 10^6 intervalos) como las de
+`generate_intervals`, para comparar los regímenes del mapa logístico con
+ritmos reales:
+
+    sdnn, rmssd          : desviación estándar y raíz cuadrática media de
+                           las diferencias sucesivas
+    sample_entropy       : SampEn (Richman y Moorman, 2000)
+    approximate_entropy  : ApEn (Pincus, 1991)
+    dfa                  : análisis de fluctuaciones sin tendencia, exponente alfa
+
+SampEn y ApEn cuentan, para cada plantilla de m intervalos, cuántas otras
+están a distancia de Chebyshev <= r. Hacerlo par a par es O(N^2), y con la
+tolerancia habitual (0.2 desviaciones) coincide un porcentaje fijo de los
+pares, así que ni un KD-tree ni una ventana ordenada bajan de O(N^2) en el
+número de comparaciones. Aquí el recuento es exacto sin enumerar los pares:
+
+    - las plantillas se recorren ordenadas por su primera coordenada, con una
+      ventana deslizante de las anteriores a distancia <= r en esa coordenada;
+    - las de la ventana están en un árbol de Fenwick 2D sobre los rangos de la
+      segunda y tercera coordenada (un Fenwick por nodo sobre los rangos de la
+      tercera, ordenados por bloques como en un merge sort), que cuenta las
+      que caen en la caja [v - r, v + r] en O(log^2 N).
+
+Así se cubren plantillas de hasta 3 coordenadas (m <= 2, el caso habitual),
+con 2 x log2(N) arrays int32 de N elementos (unos 170 MB para 10^6); para m
+mayores se comparan los pares de la ventana uno a uno.
+"""
+
+import numpy as np
+
+from numba import njit
+
+
+# =============================================================================
+# 1. Estadísticos en el dominio del tiempo
+# =============================================================================
+def sdnn(intervals):
+    """Desviación estándar de los intervalos (mismas unidades)."""
+    return np.std(intervals, ddof=1)
+
+def rmssd(intervals):
+    """Raíz de la media de los cuadrados de las diferencias sucesivas."""
+    return np.sqrt(np.mean(np.diff(intervals) ** 2))
+
+
+# =============================================================================
+# 2. Recuento de vecinos (árbol de Fenwick 2D)
+# =============================================================================
+@njit(cache=True)
+def _bit_add(cnt, s, size, i, delta):
+    """Suma `delta` en la posición i (desde 0) del Fenwick cnt[s:s + size]."""
+    i += 1
+    while i <= size:
+        cnt[s + i - 1] += delta
+        i += i & -i
+
+@njit(cache=True)
+def _bit_range(cnt, s, i0, i1):
+    """
+    Suma de las posiciones [i0, i1) del Fenwick que empieza en s. Las dos
+    sumas parciales se recorren a la vez y se cortan donde se juntan.
+    """
+    total = 0
+    while i1 != i0:
+        if i1 > i0:
+            total += cnt[s + i1 - 1]
+            i1 -= i1 & -i1
+        else:
+            total -= cnt[s + i0 - 1]
+            i0 -= i0 & -i0
+    return total
+
+@njit(cache=True)
+def _sweep_counts_1d(a, y, y0, y1, r, centered):
+    """
+    Para cada i (con `a` creciente), número de j != i con |a_i - a_j| <= r
+    y rango y en [y0_i, y1_i); y es una permutación de 0..n-1.
+
+    Con centered=False solo cuenta los j < i (cada par una vez): la ventana
+    tiene los anteriores a distancia <= r en a. Con centered=True tiene
+    también los siguientes.
+    """
+    n = len(a)
+    cnt = np.zeros(n, dtype=np.int32)
+    counts = np.zeros(n, dtype=np.int64)
+
+    lo = hi = 0
+    for i in range(n):
+        while a[i] - a[lo] > r:
+            _bit_add(cnt, 0, n, y[lo], -1)
+            lo += 1
+        while hi < n and (a[hi] - a[i] <= r if centered else hi < i):
+            _bit_add(cnt, 0, n, y[hi], 1)
+            hi += 1
+
+        counts[i] = _bit_range(cnt, 0, y0[i], y1[i]) - centered
+
+    return counts
+
+@njit(cache=True)
+def _left(lc, L, s, p):
+    """Elementos del hijo izquierdo entre los p primeros del bloque."""
+    return 1 << (L - 1) if p == 1 << L else lc[L, s + p]
+
+@njit(cache=True)
+def _sweep_update(lc, cnt, top, size, p, q, delta):
+    """Suma `delta` al punto de rango y = p y rango z = q."""
+    _bit_add(cnt[top], 0, size, q, delta)
+
+    s = 0
+    for L in range(top, 0, -1):
+        half = 1 << (L - 1)
+        left = _left(lc, L, s, q)
+        if p < s + half:
+            q = left
+            _bit_add(cnt[L - 1], s, half, q, delta)
+        else:
+            s += half
+            q -= left
+
+@njit(cache=True)
+def _sweep_prefix(lc, cnt, top, size, end, q0, q1):
+    """Insertados con rango y < end y rango z en [q0, q1)."""
+    if end >= size:
+        return _bit_range(cnt[top], 0, q0, q1)
+
+    total = 0
+    s = 0
+    for L in range(top, 0, -1):
+        if end <= s:
+            break
+        half = 1 << (L - 1)
+        l0 = _left(lc, L, s, q0)
+        l1 = _left(lc, L, s, q1)
+        if end >= s + half:
+            total += _bit_range(cnt[L - 1], s, l0, l1)
+            s += half
+            q0 -= l0
+            q1 -= l1
+        else:
+            q0 = l0
+            q1 = l1
+    return total
+
+@njit(cache=True)
+def _sweep_counts_2d(a, y, y0, y1, z, z0, z1, r, centered):
+    """
+    Como `_sweep_counts_1d`, con además el rango z en [z0_i, z1_i).
+
+    Los rangos z se ordenan por bloques de 2^L en orden de y, como en un
+    merge sort. Los hijos izquierdos (y la raíz) son los nodos de un Fenwick
+    sobre y, cada uno con su propio Fenwick sobre las posiciones de su
+    bloque. lc[L] guarda, para cada posición de un bloque, cuántos elementos
+    anteriores vienen del hijo izquierdo, así que las posiciones en todos
+    los nodos salen bajando desde la raíz, sin búsquedas binarias.
+    """
+    n = len(a)
+    size = 1
+    top = 0
+    while size < n:
+        size *= 2
+        top += 1
+
+    lc = np.zeros((top + 1, size), dtype=np.int32)
+    cur = np.full(size, n, dtype=np.int32)
+    for i in range(n):
+        cur[y[i]] = z[i]
+    nxt = np.empty(size, dtype=np.int32)
+
+    for L in range(1, top + 1):
+        half = 1 << (L - 1)
+        for s in range(0, size, 2 * half):
+            i, j = s, s + half
+            for k in range(s, s + 2 * half):
+                lc[L, k] = i - s
+                if j >= s + 2 * half or (i < s + half and cur[i] <= cur[j]):
+                    nxt[k] = cur[i]
+                    i += 1
+                else:
+                    nxt[k] = cur[j]
+                    j += 1
+        cur, nxt = nxt, cur
+
+    # la raíz tiene todos los rangos 0..n-1 (y relleno n): la posición de q es q
+    cnt = np.zeros((top + 1, size), dtype=np.int32)
+    counts = np.zeros(n, dtype=np.int64)
+
+    lo = hi = 0
+    for i in range(n):
+        while a[i] - a[lo] > r:
+            _sweep_update(lc, cnt, top, size, y[lo], z[lo], -1)
+            lo += 1
+        while hi < n and (a[hi] - a[i] <= r if centered else hi < i):
+            _sweep_update(lc, cnt, top, size, y[hi], z[hi], 1)
+            hi += 1
+
+        counts[i] = (_sweep_prefix(lc, cnt, top, size, y1[i], z0[i], z1[i])
+                     - _sweep_prefix(lc, cnt, top, size, y0[i], z0[i], z1[i])
+                     - centered)
+
+    return counts
+
+@njit(cache=True)
+def _sweep_counts_pairs(points, r, centered):
+    """Como `_sweep_counts_1d`, comparando uno a uno (plantillas de k > 3)."""
+    k, n = points.shape
+    counts = np.zeros(n, dtype=np.int64)
+
+    lo = hi = 0
+    for i in range(n):
+        while points[0, i] - points[0, lo] > r:
+            lo += 1
+        while hi < n and (points[0, hi] - points[0, i] <= r if centered else hi < i):
+            hi += 1
+
+        c = 0
+        for j in range(lo, hi):
+            ok = True
+            for d in range(1, k):
+                ok = ok & (abs(points[d, j] - points[d, i]) <= r)
+            c += ok
+        counts[i] = c - centered
+
+    return counts
+
+def _rank_box(values, r):
+    """Rangos de `values` y rango [v - r, v + r] de cada uno en rangos."""
+    order = np.argsort(values, kind='stable')
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values))
+
+    s = values[order]
+    return (ranks, np.searchsorted(s, values - r, side='left'),
+            np.searchsorted(s, values + r, side='right'))
+
+def match_counts(templates, r, both_sides=True):
+    """
+    Número de otras plantillas (filas de `templates`) a distancia de
+    Chebyshev <= r de cada una, sin contarse a sí misma.
+
+    both_sides=False cuenta cada par una sola vez (para el total).
+    """
+    templates = np.asarray(templates, dtype=float)
+    order = np.argsort(templates[:, 0], kind='stable')
+    points = templates[order]
+
+    n, k = points.shape
+    a = np.ascontiguousarray(points[:, 0])
+
+    if k == 1:
+        lo = np.searchsorted(a, a - r, side='left')
+        hi = np.searchsorted(a, a + r, side='right') if both_sides else np.arange(n) + 1
+        counts = hi - lo - 1
+    elif k == 2:
+        counts = _sweep_counts_1d(a, *_rank_box(points[:, 1], r), r, both_sides)
+    elif k == 3:
+        counts = _sweep_counts_2d(a, *_rank_box(points[:, 1], r),
+                                  *_rank_box(points[:, 2], r), r, both_sides)
+    else:
+        counts = _sweep_counts_pairs(np.ascontiguousarray(points.T), r, both_sides)
+
+    result = np.empty_like(counts)
+    result[order] = counts
+    return result
+
+
+# =============================================================================
+# 3. Entropías
+# =============================================================================
+def _templates(x, m, n):
+    return np.lib.stride_tricks.sliding_window_view(x, m)[:n]
+
+def sample_entropy(intervals, m=2, r=0.2):
+    """
+    SampEn = -ln(A / B), con B (A) el número de pares de plantillas de m
+    (m + 1) intervalos a distancia <= r * desviación estándar, sobre las
+    mismas N - m plantillas. inf si A = 0.
+    """
+    x = np.asarray(intervals, dtype=float)
+    tol = r * np.std(x)
+    n = len(x) - m
+
+    B = match_counts(_templates(x, m, n), tol, both_sides=False).sum()
+    A = match_counts(_templates(x, m + 1, n), tol, both_sides=False).sum()
+
+    if B == 0:
+        return np.nan
+    return np.inf if A == 0 else -np.log(A / B)
+
+def approximate_entropy(intervals, m=2, r=0.2):
+    """ApEn = phi_m - phi_{m+1}, contando cada plantilla consigo misma."""
+    x = np.asarray(intervals, dtype=float)
+    tol = r * np.std(x)
+
+    def phi(k):
+        n = len(x) - k + 1
+        c = 1 + match_counts(_templates(x, k, n), tol)
+        return np.mean(np.log(c / n))
+
+    return phi(m) - phi(m + 1)
+
+
+# =============================================================================
+# 4. DFA
+# =============================================================================
+def dfa(intervals, scales=None, order=1):
+    """
+    Análisis de fluctuaciones sin tendencia.
+
+    El perfil (suma acumulada sin la media) se corta en ventanas de n
+    intervalos, desde el principio y desde el final. A cada ventana se le
+    quita su ajuste polinómico de grado `order` proyectando todas las
+    ventanas de una escala a la vez sobre una base ortonormal.
+
+    Devuelve (alfa, escalas, F(n)), con alfa la pendiente de log F frente a
+    log n.
+    """
+    x = np.asarray(intervals, dtype=float)
+    profile = np.cumsum(x - x.mean())
+    N = len(profile)
+
+    if scales is None:
+        scales = np.unique(np.geomspace(max(4, order + 2), N // 4, 20).astype(int))
+    scales = np.asarray(scales)
+
+    F = np.empty(len(scales))
+    for i, n in enumerate(scales):
+        k = N // n
+        windows = np.concatenate((profile[:k * n].reshape(k, n),
+                                  profile[N - k * n:].reshape(k, n)))
+
+        basis, _ = np.linalg.qr(np.vander(np.arange(n, dtype=float), order + 1))
+        residual = windows - (windows @ basis) @ basis.T
+
+        F[i] = np.sqrt(np.mean(residual ** 2))
+
+    alpha = np.polyfit(np.log(scales), np.log(F), 1)[0]
+    return alpha, scales, F
+
+
+# =============================================================================
+# 5. Resumen
+# =============================================================================
+def hrv_summary(intervals, m=2, r=0.2):
+    """Todas las métricas de una serie en un dict."""
+    return {
+        'sdnn': sdnn(intervals),
+        'rmssd': rmssd(intervals),
+        'sample_entropy': sample_entropy(intervals, m, r),
+        'approximate_entropy': approximate_entropy(intervals, m, r),
+        'dfa_alpha': dfa(intervals)[0],
+    }
@@ -0,0 +1,223 @@
+"""
+Estadísticas en flujo de órbitas muy largas del mapa logístico.
+
+`generate_intervals` (y `generar_datos` en Chaos/) guardan la órbita entera
+antes de analizarla. Para 10^9 pasos eso son 8 GB. Aquí la órbita se genera
+por bloques con un núcleo Numba y cada bloque se añade a acumuladores de
+tamaño fijo antes de descartarlo:
+
+    count, mean, var : media y varianza (Welford; los bloques se combinan
+                       con la fórmula de Chan)
+    min, max         : extremos
+    histogram        : histograma uniforme en un rango fijo
+    autocorrelation  : autocorrelación para los retardos 0..max_lag; los
+                       max_lag últimos valores de cada bloque se guardan para
+                       los pares que cruzan de un bloque al siguiente
+
+La memoria es la de un bloque más los acumuladores, sea cual sea la longitud:
+
+    stats = orbit_stats(3.9, 10**9, scale_min=0.20, scale_max=0.40)
+    stats.mean, stats.std, stats.autocorrelation()
+
+Con scale_min=0, scale_max=1 se resume la órbita x_n sin escalar.
+`OrbitStats.update` acepta además cualquier serie, por bloques.
+"""
+
+import numpy as np
+
+from numba import njit
+
+
+# =============================================================================
+# 1. Núcleos Numba
+# =============================================================================
+@njit(cache=True)
+def _orbit_chunk(x, r, scale_min, scale_max, out):
+    """
+    Itera el mapa desde x, escribe los valores escalados a [scale_min,
+    scale_max] en `out` y devuelve el último x (sin escalar).
+    """
+    span = scale_max - scale_min
+    for i in range(len(out)):
+        x = r * x * (1 - x)
+        out[i] = scale_min + span * x
+    return x
+
+@njit(cache=True)
+def _histogram_extremes(values, lo, hi, hist, extremes):
+    """
+    Suma `values` al histograma uniforme de [lo, hi] y actualiza
+    extremes = [mín, máx]. Devuelve cuántos valores quedan fuera del rango.
+    """
+    bins = len(hist)
+    scale = bins / (hi - lo)
+    vmin, vmax = extremes[0], extremes[1]
+    outside = 0
+
+    for v in values:
+        vmin = min(vmin, v)
+        vmax = max(vmax, v)
+        k = (v - lo) * scale
+        if 0 <= k < bins:
+            hist[int(k)] += 1
+        elif v == hi:
+            hist[bins - 1] += 1
+        else:
+            outside += 1
+
+    extremes[0], extremes[1] = vmin, vmax
+    return outside
+
+
+# =============================================================================
+# 2. Acumuladores
+# =============================================================================
+class OrbitStats:
+    """
+    Media, varianza, extremos, histograma y autocorrelación de una serie que
+    llega por bloques (`update`), en memoria constante.
+
+    value_range : rango del histograma; los valores fuera se cuentan en
+                  `outside`
+    max_lag     : mayor retardo de la autocorrelación
+    """
+
+    def __init__(self, bins=200, value_range=(0.0, 1.0), max_lag=20):
+        self.lo, self.hi = value_range
+        self.max_lag = max_lag
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.extremes = np.array([np.inf, -np.inf])
+        self.hist = np.zeros(bins, dtype=np.int64)
+        self.outside = 0
+
+        # productos retardados de y = x - shift (shift = media del primer
+        # bloque, para no restar números grandes al final)
+        self.shift = None
+        self.lagged = np.zeros(max_lag + 1)
+        self.head = np.empty(0)
+        self.tail = np.empty(0)
+
+    def update(self, values):
+        values = np.ascontiguousarray(values, dtype=float)
+        n = len(values)
+        if not n:
+            return
+
+        self.outside += _histogram_extremes(values, self.lo, self.hi,
+                                            self.hist, self.extremes)
+
+        # Welford por bloques (Chan et al.)
+        chunk_mean = values.mean()
+        chunk_m2 = np.sum((values - chunk_mean) ** 2)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        # sum_i y_i y_{i+lag} para los pares que terminan en este bloque
+        if self.shift is None:
+            self.shift = chunk_mean
+        y = np.concatenate([self.tail, values - self.shift])
+        start = len(self.tail)
+        for lag in range(min(self.max_lag, len(y) - 1) + 1):
+            first = max(start - lag, 0)
+            self.lagged[lag] += y[first:len(y) - lag] @ y[first + lag:]
+
+        if len(self.head) < self.max_lag:
+            self.head = y[:self.max_lag]
+        self.tail = y[-self.max_lag:] if self.max_lag else y[:0]
+
+    @property
+    def var(self):
+        """Varianza poblacional."""
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def min(self):
+        return self.extremes[0]
+
+    @property
+    def max(self):
+        return self.extremes[1]
+
+    def histogram(self, density=True):
+        """(bordes, valores) del histograma; density normaliza a integral 1."""
+        edges = np.linspace(self.lo, self.hi, len(self.hist) + 1)
+        if not density:
+            return edges, self.hist.copy()
+        return edges, self.hist / (self.hist.sum() * np.diff(edges))
+
+    def autocorrelation(self):
+        """
+        Autocorrelación para los retardos 0..max_lag (la 0 vale 1), con la
+        media y la varianza de toda la serie.
+        """
+        lags = np.arange(min(self.max_lag, self.count - 1) + 1)
+        n_pairs = self.count - lags
+        m = self.mean - self.shift
+
+        # sum_{i < N - lag} y_i y sum_{i >= lag} y_i, a partir del total
+        total = self.count * m
+        head = np.concatenate([[0.0], np.cumsum(self.head)])[lags]
+        tail = np.concatenate([[0.0], np.cumsum(self.tail[::-1])])[lags]
+
+        cov = (self.lagged[lags] - m * (2 * total - head - tail)
+               + n_pairs * m ** 2) / n_pairs
+        return cov / self.var
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'std': self.std,
+                'min': self.min, 'max': self.max, 'outside': self.outside,
+                'autocorrelation': self.autocorrelation()}
+
+
+# =============================================================================
+# 3. Órbita por bloques
+# =============================================================================
+def orbit_stats(r, n_steps, x0=0.5, scale_min=0.0, scale_max=1.0,
+                transient=1000, bins=200, max_lag=20, chunk=2**18):
+    """
+    Resume `n_steps` valores de la órbita desde x0 (tras `transient` pasos),
+    escalados a [scale_min, scale_max] como en `generate_intervals`.
+    Devuelve un OrbitStats con el histograma sobre [scale_min, scale_max].
+    """
+    stats = OrbitStats(bins, (scale_min, scale_max), max_lag)
+    buffer = np.empty(chunk)
+
+    x = x0
+    while transient > 0:
+        x = _orbit_chunk(x, r, 0.0, 1.0, buffer[:min(transient, chunk)])
+        transient -= chunk
+
+    for start in range(0, n_steps, chunk):
+        block = buffer[:min(chunk, n_steps - start)]
+        x = _orbit_chunk(x, r, scale_min, scale_max, block)
+        stats.update(block)
+
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Estadísticas de una órbita larga')
+    parser.add_argument('-r', type=float, default=3.9)
+    parser.add_argument('-n', '--steps', type=float, default=1e9)
+    parser.add_argument('--max-lag', type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.time()
+    stats = orbit_stats(args.r, int(args.steps), max_lag=args.max_lag)
+    print(f'r = {args.r}: {stats.count} pasos en {time.time() - start:.1f} s')
+    print(f'media {stats.mean:.6f}, desviación {stats.std:.6f},'
+          f' mín {stats.min:.6f}, máx {stats.max:.6f}')
+    print('autocorrelación:', np.round(stats.autocorrelation(), 4))
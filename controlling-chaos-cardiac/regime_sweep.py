@@ -0,0 +1,121 @@
+"""
+Barrido de r y clasificación del régimen (periodo-k o caos).
+
+La interfaz muestra el mapa de Poincaré de un solo r, y los botones fijan a
+mano los regímenes típicos (2.8, 3.2, 3.5, 3.8). Aquí se itera el mapa para
+toda una rejilla de r a la vez (un array de intervalos, una fila por r), se
+descartan los `transient` primeros intervalos como en la figura y se busca,
+para cada r, el menor k con x_{n+k} = x_n (dentro de `tol`) en todo el
+tramo estacionario. Si no hay ninguno hasta `max_period`, el régimen es caos.
+Con los mismos N_INTERVALS y TRANSIENT que la figura, la clasificación es la
+del mapa de Poincaré que se ve: cerca de cada bifurcación la convergencia es
+lenta y el régimen aparece ya como el de periodo doble.
+
+El resultado se compacta en tramos (r_inicio, r_fin, periodo) y se puede
+dibujar como una banda de colores bajo el slider.
+"""
+
+import numpy as np
+
+from matplotlib.colors import ListedColormap
+from matplotlib.patches import Patch
+
+
+CHAOS = 0
+
+# color por régimen : periodo 1, 2, 4, 8 o más, otros periodos (ventanas), caos
+REGIME_COLORS = ['#4f98ca', '#50d890', '#f2c14e', '#f78154', '#b07bd9', '#272727']
+REGIME_LABELS = ['periodo 1', 'periodo 2', 'periodo 4', 'periodo 8+',
+                 'ventana', 'caos']
+
+
+# =============================================================================
+# 1. Barrido
+# =============================================================================
+def sweep_intervals(r_values, n_intervals=200, x0=0.5,
+                    scale_min=0.20, scale_max=0.40):
+    """
+    `generate_intervals` para todos los r a la vez: el bucle es sobre los
+    intervalos y cada paso actualiza todas las órbitas. Devuelve un array
+    (len(r_values), n_intervals), fila i para r_values[i], en segundos.
+    x0, scale_min y scale_max pueden ser escalares o un valor por fila.
+    """
+    r = np.asarray(r_values, dtype=float)
+    x = np.broadcast_to(np.asarray(x0, dtype=float), r.shape).copy()
+    intervals = np.empty((len(r), n_intervals))
+
+    for n in range(n_intervals):
+        x = r * x * (1 - x)
+        intervals[:, n] = x
+
+    scale_min = np.broadcast_to(np.asarray(scale_min, dtype=float), r.shape)
+    scale_max = np.broadcast_to(np.asarray(scale_max, dtype=float), r.shape)
+
+    intervals *= (scale_max - scale_min)[:, None]
+    intervals += scale_min[:, None]
+    return intervals
+
+def classify_period(intervals, max_period=32, tol=2e-4):
+    """
+    Menor periodo k <= max_period de cada fila de `intervals` (ya sin
+    transitorio), o CHAOS (0) si no se repite. `tol` en segundos.
+    """
+    period = np.full(len(intervals), CHAOS, dtype=np.int16)
+    pending = np.arange(len(intervals))
+
+    for k in range(1, min(max_period, intervals.shape[1] - 1) + 1):
+        x = intervals[pending]
+        repeats = np.abs(x[:, k:] - x[:, :-k]).max(axis=1) < tol
+
+        period[pending[repeats]] = k
+        pending = pending[~repeats]
+
+        if not len(pending):
+            break
+
+    return period
+
+def regime_map(r_min=2.5, r_max=4.0, step=1e-4, n_intervals=200,
+               transient=50, x0=0.5, max_period=32, tol=2e-4):
+    """Rejilla de r y periodo de cada uno (CHAOS = 0)."""
+    r = np.arange(round((r_max - r_min) / step) + 1) * step + r_min
+    intervals = sweep_intervals(r, n_intervals, x0)
+    return r, classify_period(intervals[:, transient:], max_period, tol)
+
+def regime_segments(r, period):
+    """
+    Tramos consecutivos con el mismo periodo: (inicio, fin, periodo), con
+    inicio y fin los valores de r del primer y último punto del tramo.
+    """
+    change = np.flatnonzero(np.diff(period)) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(r)])) - 1
+    return r[starts], r[ends], period[starts]
+
+
+# =============================================================================
+# 2. Banda de colores
+# =============================================================================
+def regime_codes(period):
+    """Índice en REGIME_COLORS de cada periodo."""
+    codes = np.full(len(period), 4, dtype=np.int8)     # ventanas (3, 5, 6, ...)
+    codes[period == 1] = 0
+    codes[period == 2] = 1
+    codes[period == 4] = 2
+    codes[(period >= 8) & (period & (period - 1) == 0)] = 3
+    codes[period == CHAOS] = 5
+    return codes
+
+def draw_regimes(ax, r, period, alpha=0.6):
+    """Dibuja los regímenes como una banda en `ax` (p. ej. el eje del slider)."""
+    codes = regime_codes(period)
+    cmap = ListedColormap(REGIME_COLORS)
+
+    return ax.imshow(codes[None, :], aspect='auto', cmap=cmap, vmin=0,
+                     vmax=len(REGIME_COLORS) - 1, alpha=alpha,
+                     interpolation='nearest', zorder=0,
+                     extent=(r[0], r[-1], 0, 1))
+
+def regime_legend_handles(alpha=0.6):
+    return [Patch(color=c, alpha=alpha, label=l)
+            for c, l in zip(REGIME_COLORS, REGIME_LABELS)]
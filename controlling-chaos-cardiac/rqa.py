@@ -0,0 +1,257 @@
+"""
+Análisis de cuantificación de recurrencias (RQA).
+
+La gráfica de recurrencias de una serie (órbita del mapa logístico o serie de
+intervalos) marca R[i, j] = 1 cuando los estados i y j están a distancia
+<= eps. Sus líneas diagonales (tramos de órbita que se repiten) y verticales
+(estados que se quedan quietos) separan bien los regímenes: en periodo-4 casi
+todo son diagonales largas, en caos son cortas.
+
+Una matriz densa de float no pasa de unos 10^4 puntos (10^8 celdas). Aquí
+cada fila se guarda empaquetada en bits (uint64, 64 columnas por palabra) y
+la matriz se construye por bloques de filas (`tile`). Las líneas se cuentan
+a la vez, palabra a palabra:
+
+    - una diagonal sigue de (i-1, j-1) a (i, j): con la fila anterior
+      desplazada un bit, los inicios son R_i & ~prev y los finales prev & ~R_i;
+    - una vertical sigue de (i-1, j) a (i, j): lo mismo sin desplazar.
+
+Solo se visitan los bits de inicio y final de línea, y se guarda la fila de
+inicio de cada diagonal y cada columna entre bloques, así que la memoria es
+O(tile x N / 64) y nunca se forma la matriz entera.
+
+    stats = rqa(intervals, eps=0.01, dim=2, theiler=1)
+    stats['DET'], stats['LAM']
+
+`theiler` excluye las celdas con |i - j| < theiler (1 = solo la diagonal
+principal).
+"""
+
+import numpy as np
+
+from numba import njit, prange
+
+
+# =============================================================================
+# 1. Embebido y filas de la matriz de recurrencia
+# =============================================================================
+def embed(series, dim=1, delay=1):
+    """Vectores de retardo (x_i, x_{i+delay}, ...), forma (n, dim)."""
+    x = np.asarray(series, dtype=float)
+    n = len(x) - (dim - 1) * delay
+    return np.stack([x[k * delay:k * delay + n] for k in range(dim)], axis=1)
+
+def n_words(n):
+    """Palabras por fila: n columnas más una de margen para los desplazamientos."""
+    return (n + 64) // 64
+
+@njit(parallel=True, cache=True)
+def _recurrence_rows(points, i0, eps, theiler, out):
+    """
+    Filas i0..i0 + len(out) de la matriz de recurrencia (distancia máxima
+    <= eps, |i - j| >= theiler), empaquetadas en `out`. points es (dim, n).
+    """
+    dim, n = points.shape
+    one = np.uint64(1)
+
+    for row in prange(out.shape[0]):
+        i = i0 + row
+        for w in range(out.shape[1]):
+            word = np.uint64(0)
+            for b in range(min(64, n - w * 64)):
+                j = w * 64 + b
+                d = 0.0
+                for k in range(dim):
+                    d = max(d, abs(points[k, j] - points[k, i]))
+                word |= np.uint64(d <= eps) << np.uint64(b)
+            out[row, w] = word
+
+        # ventana de Theiler
+        for j in range(max(0, i - theiler + 1), min(n, i + theiler)):
+            out[row, j // 64] &= ~(one << np.uint64(j % 64))
+
+def recurrence_matrix(series, eps, dim=1, delay=1, theiler=0):
+    """Matriz de recurrencia completa empaquetada, forma (n, n_words(n))."""
+    points = np.ascontiguousarray(embed(series, dim, delay).T)
+    n = points.shape[1]
+
+    packed = np.empty((n, n_words(n)), dtype=np.uint64)
+    _recurrence_rows(points, 0, eps, theiler, packed)
+    return packed
+
+def unpack(packed, n):
+    """Matriz booleana (n, n) a partir de las filas empaquetadas."""
+    bits = np.unpackbits(packed.view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :n].astype(bool)
+
+
+# =============================================================================
+# 2. Líneas diagonales y verticales
+# =============================================================================
+_DEBRUIJN = np.zeros(64, dtype=np.int64)
+for _b in range(64):
+    _DEBRUIJN[(((1 << _b) * 0x03F79D71B4CB0A89) & (2**64 - 1)) >> 58] = _b
+
+@njit(cache=True)
+def _lowest_bit(w):
+    """Posición del bit más bajo de w (w != 0), con una secuencia de De Bruijn."""
+    isolated = w & (~w + np.uint64(1))
+    return _DEBRUIJN[(isolated * np.uint64(0x03F79D71B4CB0A89)) >> np.uint64(58)]
+
+
+@njit(cache=True)
+def _line_events(rows, i0, n, prev, start_diag, start_vert, diag_hist, vert_hist):
+    """
+    Procesa las filas i0.. (empaquetadas en `rows`) a continuación de `prev`
+    (la fila anterior). Al terminar cada línea suma su longitud al histograma;
+    `start_diag[d]` (d = j - i + n - 1) y `start_vert[j]` guardan la fila en
+    la que empezó la línea abierta.
+    """
+    words = rows.shape[1]
+    shifted = np.empty(words, dtype=np.uint64)
+    one = np.uint64(1)
+
+    for row in range(rows.shape[0]):
+        i = i0 + row
+        cur = rows[row]
+
+        # fila anterior desplazada una columna: (i-1, j-1) pasa a (i, j)
+        carry = np.uint64(0)
+        for w in range(words):
+            shifted[w] = (prev[w] << one) | carry
+            carry = prev[w] >> np.uint64(63)
+
+        for w in range(words):
+            ends = shifted[w] & ~cur[w]
+            while ends:
+                j = w * 64 + _lowest_bit(ends)
+                diag_hist[i - start_diag[j - i + n - 1]] += 1
+                ends &= ends - one
+
+            starts = cur[w] & ~shifted[w]
+            while starts:
+                j = w * 64 + _lowest_bit(starts)
+                start_diag[j - i + n - 1] = i
+                starts &= starts - one
+
+            ends = prev[w] & ~cur[w]
+            while ends:
+                j = w * 64 + _lowest_bit(ends)
+                vert_hist[i - start_vert[j]] += 1
+                ends &= ends - one
+
+            starts = cur[w] & ~prev[w]
+            while starts:
+                j = w * 64 + _lowest_bit(starts)
+                start_vert[j] = i
+                starts &= starts - one
+
+        prev[:] = cur
+
+def line_histograms(series, eps, dim=1, delay=1, theiler=1, tile=1024):
+    """
+    Histogramas de longitudes de líneas diagonales y verticales,
+    (diag_hist, vert_hist), con hist[l] = número de líneas de longitud l.
+    """
+    points = np.ascontiguousarray(embed(series, dim, delay).T)
+    n = points.shape[1]
+    words = n_words(n)
+
+    prev = np.zeros(words, dtype=np.uint64)
+    start_diag = np.zeros(2 * n + 1, dtype=np.int64)
+    start_vert = np.zeros(words * 64, dtype=np.int64)
+    diag_hist = np.zeros(n + 2, dtype=np.int64)
+    vert_hist = np.zeros(n + 2, dtype=np.int64)
+
+    rows = np.empty((min(tile, n), words), dtype=np.uint64)
+    for i0 in range(0, n, tile):
+        block = rows[:min(tile, n - i0)]
+        _recurrence_rows(points, i0, eps, theiler, block)
+        _line_events(block, i0, n, prev, start_diag, start_vert,
+                     diag_hist, vert_hist)
+
+    # una fila vacía al final cierra las líneas abiertas
+    _line_events(np.zeros((1, words), dtype=np.uint64), n, n, prev,
+                 start_diag, start_vert, diag_hist, vert_hist)
+
+    return diag_hist, vert_hist
+
+
+# =============================================================================
+# 3. Medidas
+# =============================================================================
+def _line_stats(hist, lmin):
+    lengths = np.arange(len(hist))
+    long_lines = hist[lmin:]
+    points = lengths[lmin:] * long_lines
+
+    if not long_lines.sum():
+        return 0.0, 0.0, 0, 0.0
+
+    p = long_lines[long_lines > 0] / long_lines.sum()
+    return (points.sum() / (lengths * hist).sum(),
+            points.sum() / long_lines.sum(),
+            lengths[np.flatnonzero(hist)[-1]],
+            -np.sum(p * np.log(p)))
+
+def rqa(series, eps=None, dim=1, delay=1, theiler=1, lmin=2, vmin=2,
+        tile=1024):
+    """
+    Medidas de RQA de una serie.
+
+    eps : umbral de recurrencia (distancia máxima); por defecto 0.1 x std
+
+    Devuelve un dict con:
+        RR   : tasa de recurrencia (sin la ventana de Theiler)
+        DET  : fracción de puntos recurrentes en diagonales de longitud >= lmin
+        L    : longitud media de esas diagonales; Lmax la mayor
+        ENTR : entropía de Shannon de sus longitudes
+        LAM  : fracción de puntos en verticales de longitud >= vmin
+        TT   : longitud media de esas verticales; Vmax la mayor
+    """
+    if eps is None:
+        eps = 0.1 * np.std(series)
+
+    diag_hist, vert_hist = line_histograms(series, eps, dim, delay, theiler, tile)
+
+    n = len(series) - (dim - 1) * delay
+    excluded = n * n - (n - theiler) * (n - theiler + 1) if theiler > 0 else 0
+    n_rec = (np.arange(len(diag_hist)) * diag_hist).sum()
+
+    det, L, Lmax, entr = _line_stats(diag_hist, lmin)
+    lam, TT, Vmax, _ = _line_stats(vert_hist, vmin)
+
+    return {'RR': n_rec / (n * n - excluded), 'DET': det, 'L': L,
+            'Lmax': Lmax, 'ENTR': entr, 'LAM': lam, 'TT': TT, 'Vmax': Vmax}
+
+
+# =============================================================================
+# 4. Periodo-4 frente a caos
+# =============================================================================
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+
+    from regime_sweep import sweep_intervals
+
+    n_plot, n_stats, transient = 1000, 20000, 100
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 6))
+
+    for ax, r in zip(axes, (3.5, 3.8)):
+        intervals = sweep_intervals([r], transient + n_stats)[0, transient:]
+        intervals += 0.002 * np.random.default_rng(0).standard_normal(n_stats)
+
+        start = time.time()
+        stats = rqa(intervals, eps=0.005, dim=2)
+        print(f'r = {r}: {n_stats} intervalos en {time.time() - start:.2f} s', stats)
+
+        R = unpack(recurrence_matrix(intervals[:n_plot], 0.005, dim=2), n_plot - 1)
+        ax.imshow(R, cmap='binary', origin='lower', interpolation='nearest')
+        ax.set_title(f"r = {r}: RR {stats['RR']:.3f}, DET {stats['DET']:.2f},"
+                     f" LAM {stats['LAM']:.2f}, L {stats['L']:.1f}")
+        ax.set_xlabel('j')
+        ax.set_ylabel('i')
+
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,110 @@
+"""
+Tabla precalculada de estados para los valores del slider.
+
+`r_slider` tiene valstep=0.01 en [2.5, 4.0], es decir solo 151 valores
+posibles. En lugar de recalcular intervalos, voltaje y ruido en cada
+movimiento, la tabla guarda para cada valor:
+
+    intervals : serie de intervalos (n_intervals,)
+    voltage   : señal de voltaje con ruido sobre `t` (n_samples,)
+    offsets   : puntos del mapa de Poincaré sin transitorio (n - transient - 1, 2)
+
+en arrays float32 reservados de antemano, con el tamaño total acotado por
+`max_bytes`. Un hilo en segundo plano rellena las filas; si se pide una que
+aún no está lista, se calcula en el momento. El ruido de cada fila sale de
+un generador propio (seed, fila), así que el resultado no depende de quién
+la calcule.
+"""
+
+import threading
+
+import numpy as np
+
+from ap_synthesis import synthesize_voltage
+from regime_sweep import sweep_intervals
+
+
+class StateTable:
+    """
+    Estados precalculados para r = r_min, r_min + step, ..., r_max.
+
+        table = StateTable(2.5, 4.0, 0.01)
+        table.start()                       # rellena en segundo plano
+        t, v, offsets = table.lookup(3.2)   # None si r no está en la rejilla
+    """
+
+    def __init__(self, r_min=2.5, r_max=4.0, step=0.01, n_intervals=200,
+                 transient=50, total_time=5.0, fs=1000, noise=0.02, seed=0,
+                 max_bytes=64 * 2**20, dtype=np.float32):
+        self.r_min = r_min
+        self.step = step
+        self.r = r_min + step * np.arange(round((r_max - r_min) / step) + 1)
+        self.total_time = total_time
+        self.noise = noise
+        self.seed = seed
+
+        n = len(self.r)
+        self.t = np.linspace(0, total_time, int(total_time * fs))
+        self.dt = total_time / (len(self.t) - 1)
+
+        itemsize = np.dtype(dtype).itemsize
+        n_points = n_intervals - transient - 1
+        self.nbytes = n * itemsize * (n_intervals + len(self.t) + 2 * n_points)
+        if self.nbytes > max_bytes:
+            raise ValueError(f'la tabla ocuparía {self.nbytes / 2**20:.1f} MB'
+                             f' (máximo {max_bytes / 2**20:.1f} MB)')
+
+        # los intervalos de toda la rejilla salen de un solo barrido
+        self.intervals = sweep_intervals(self.r, n_intervals).astype(dtype)
+        self.offsets = np.empty((n, n_points, 2), dtype=dtype)
+        self.offsets[:, :, 0] = self.intervals[:, transient:-1]
+        self.offsets[:, :, 1] = self.intervals[:, transient + 1:]
+
+        self.voltage = np.empty((n, len(self.t)), dtype=dtype)
+        self.ready = np.zeros(n, dtype=bool)
+
+        self._thread = None
+
+    def index(self, r):
+        """Fila de r, o None si r no está en la rejilla."""
+        i = int(round((r - self.r_min) / self.step))
+        if 0 <= i < len(self.r) and np.isclose(self.r[i], r):
+            return i
+        return None
+
+    def _fill(self, i):
+        beat_times = np.cumsum(self.intervals[i], dtype=float)
+        beat_times = beat_times[beat_times <= self.total_time]
+
+        v = synthesize_voltage(beat_times, len(self.t), self.dt)
+        rng = np.random.default_rng((self.seed, i))
+        v += self.noise * rng.standard_normal(len(v))
+        np.clip(v, 0, 1.2, out=v)
+
+        self.voltage[i] = v
+        self.ready[i] = True
+
+    def lookup(self, r):
+        """(t, voltaje, puntos de Poincaré) para r, o None fuera de la rejilla."""
+        i = self.index(r)
+        if i is None:
+            return None
+        if not self.ready[i]:
+            self._fill(i)
+        return self.t, self.voltage[i], self.offsets[i]
+
+    def start(self, on_done=None):
+        """Rellena las filas pendientes en un hilo en segundo plano."""
+        def run():
+            for i in range(len(self.r)):
+                if not self.ready[i]:
+                    self._fill(i)
+            if on_done is not None:
+                on_done(self)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def report(self):
+        return (f'tabla de estados: {len(self.r)} valores de r,'
+                f' {self.ready.sum()} listos, {self.nbytes / 2**20:.1f} MB')
@@ -0,0 +1,55 @@
+"""
+Pruebas de ap_synthesis: la síntesis por plantilla coincide con la suma
+directa de `ap_waveform` latido a latido y muestra a muestra.
+"""
+
+import numpy as np
+import pytest
+
+from ap_synthesis import ap_template, synthesize_voltage
+
+
+def ap_waveform(t, t_peak=0.01, tau_decay=0.05):
+    # la plantilla de controlling-chaos-cardiac.py
+    if t < 0:
+        return 0.0
+    elif t < t_peak:
+        return (t / t_peak) ** 2
+    else:
+        return np.exp(-(t - t_peak) / tau_decay)
+
+def direct_voltage(beat_times, n_samples, dt, **kwargs):
+    t = np.arange(n_samples) * dt
+    v = np.zeros(n_samples)
+    for bt in beat_times:
+        v += [ap_waveform(ti - bt, **kwargs) for ti in t]
+    return v
+
+
+@pytest.mark.parametrize('dt', [1e-3, 2.5e-3, 1 / 360])
+def test_matches_direct_sum(dt):
+    rng = np.random.default_rng(0)
+    n_samples = 1500
+    # latidos fuera de la rejilla, seguidos y alguno fuera de la señal
+    beat_times = np.concatenate([np.cumsum(rng.uniform(0.15, 0.45, 12)),
+                                 [0.0, 3 * dt, -0.2, 10.0]])
+
+    v = synthesize_voltage(beat_times, n_samples, dt, block=5)
+    expected = direct_voltage(beat_times[(beat_times >= 0)
+                                         & (beat_times <= (n_samples - 1) * dt)],
+                              n_samples, dt)
+    # la plantilla se corta cuando cae por debajo de 1e-7
+    np.testing.assert_allclose(v, expected, atol=1e-6)
+
+def test_other_shape():
+    beat_times = [0.0123, 0.31, 0.3107]
+    v = synthesize_voltage(beat_times, 800, 1e-3, t_peak=0.02, tau_decay=0.1)
+    np.testing.assert_allclose(v, direct_voltage(beat_times, 800, 1e-3,
+                                                 t_peak=0.02, tau_decay=0.1),
+                               atol=1e-6)
+
+def test_template_is_cached_and_read_only():
+    decay, n_rise = ap_template(1e-3)
+    assert ap_template(1e-3)[0] is decay
+    assert not decay.flags.writeable
+    assert decay[-1] < 1e-7 <= decay[-2]
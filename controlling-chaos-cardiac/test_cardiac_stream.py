@@ -0,0 +1,74 @@
+"""
+Pruebas de cardiac_stream: la señal por bloques es la misma que la síntesis
+de una vez, sea cual sea el tamaño de bloque, y el buffer circular guarda
+las últimas muestras en orden.
+"""
+
+import numpy as np
+import pytest
+
+from ap_synthesis import synthesize_voltage
+from cardiac_stream import CardiacStream, RingBuffer
+
+
+def beat_times(r_values, x0=0.5, scale_min=0.20, scale_max=0.40):
+    """Tiempos de latido con un r por intervalo."""
+    x, t, times = x0, 0.0, []
+    for r in r_values:
+        x = r * x * (1 - x)
+        t += scale_min + (scale_max - scale_min) * x
+        times.append(t)
+    return np.array(times)
+
+def expected_voltage(times, n_samples, fs):
+    # los tiempos relativos al bloque pueden dejar un latido justo en una
+    # muestra a uno u otro lado: cambia solo la cola cortada en 1e-7
+    v = synthesize_voltage(times, n_samples, 1 / fs)
+    return np.clip(v, 0, 1.2)
+
+
+@pytest.mark.parametrize('block', [1, 64, 256, 1000])
+def test_blocks_match_full_synthesis(block):
+    stream = CardiacStream(r=3.8, fs=500, block=block, noise=0)
+    blocks = list(stream.blocks(duration=6.0))
+
+    t0 = np.array([t for t, _ in blocks])
+    v = np.concatenate([v for _, v in blocks])
+    np.testing.assert_allclose(t0, np.arange(len(blocks)) * block / 500)
+
+    times = beat_times([3.8] * 100)
+    np.testing.assert_allclose(v, expected_voltage(times, len(v), 500), atol=1e-6)
+    assert stream.beats == np.sum(times < len(v) / 500)
+    assert stream.samples == len(v) >= 6.0 * 500
+
+def test_r_changes_from_the_next_interval():
+    stream = CardiacStream(r=3.2, fs=1000, block=100, noise=0)
+    first = [stream.next_block()[1] for _ in range(20)]
+    n_intervals = stream.beats + 1         # el siguiente ya estaba calculado
+
+    stream.r = 3.9
+    second = [stream.next_block()[1] for _ in range(30)]
+    v = np.concatenate(first + second)
+
+    times = beat_times([3.2] * n_intervals + [3.9] * 50)
+    np.testing.assert_allclose(v, expected_voltage(times, len(v), 1000), atol=1e-6)
+
+def test_noise_is_reproducible():
+    a = np.concatenate([v for _, v in CardiacStream(seed=4).blocks(1.0)])
+    b = np.concatenate([v for _, v in CardiacStream(seed=4).blocks(1.0)])
+    np.testing.assert_array_equal(a, b)
+    assert a.min() >= 0 and a.max() <= 1.2
+
+def test_ring_buffer():
+    ring = RingBuffer(10)
+    written = []
+    rng = np.random.default_rng(0)
+
+    for n in (3, 4, 0, 9, 1, 25, 2):
+        values = rng.random(n)
+        ring.write(values)
+        written += list(values)
+
+        np.testing.assert_array_equal(ring.latest(), written[-10:])
+        np.testing.assert_array_equal(ring.latest(4), written[-4:])
+        assert ring.count == min(len(written), 10)
@@ -0,0 +1,85 @@
+"""
+Pruebas de chaos_control: la simulación por lotes coincide con el lazo
+escalar combinación a combinación, OGY con gain = 1 cae en x* y sin
+ganancia ninguna órbita caótica cuenta como controlada.
+"""
+
+import numpy as np
+import pytest
+
+from chaos_control import fixed_point, simulate_control, control_grid
+
+
+def scalar_control(r, gain, threshold, method, n_steps, x0=0.5, tol=1e-3):
+    """El mismo lazo para una sola combinación, paso a paso."""
+    x, x_star = x0, 1 - 1 / r
+    energy, n_pert, last_out = 0.0, 0, -1
+
+    for n in range(n_steps):
+        error = x - x_star
+        delta = 0.0
+        if abs(error) < threshold:
+            n_pert += 1
+            if method == 'ogy':
+                delta = -gain * (2 - r) / (x_star * (1 - x_star)) * error
+            else:
+                delta = -gain * error
+
+        if method == 'ogy':
+            r_n = min(max(r + delta, 0), 4)
+            x = r_n * x * (1 - x)
+        else:
+            x = min(max(x + delta, 0), 1)
+            x = r * x * (1 - x)
+
+        energy += delta ** 2
+        if abs(x - x_star) >= tol:
+            last_out = n
+
+    return last_out + 1, energy, n_pert
+
+
+@pytest.mark.parametrize('method', ['ogy', 'ppf'])
+def test_grid_matches_scalar_loop(method):
+    r_values = [3.6, 3.8, 3.95]
+    gains = [0.5, 1.0, 1.3]
+    thresholds = [0.005, 0.02, 0.1]
+    result = control_grid(r_values, gains, thresholds, method=method,
+                          n_steps=400)
+
+    for i, j, k in np.ndindex(3, 3, 3):
+        time, energy, n_pert = scalar_control(r_values[i], gains[j],
+                                              thresholds[k], method, 400)
+        assert result['time_to_control'][i, j, k] == (time if time <= 350 else -1)
+        assert result['energy'][i, j, k] == pytest.approx(energy)
+        assert result['n_perturbations'][i, j, k] == n_pert
+
+def test_ogy_lands_on_the_fixed_point():
+    r = np.array([3.7, 3.9])
+    x_star = fixed_point(r)
+    x0 = x_star + 0.004
+
+    # un paso con gain = 1: error de segundo orden
+    result = simulate_control(r, 1.0, 0.01, n_steps=1, x0=x0, dwell=1)
+    assert np.all(result['n_perturbations'] == 1)
+    assert result['controlled'].all()
+
+    result = simulate_control(r, 1.0, 0.01, n_steps=2000, x0=0.3)
+    assert result['controlled'].all()
+    np.testing.assert_allclose(result['x_star'], x_star)
+
+def test_no_control_without_gain():
+    result = simulate_control(3.9, 0.0, 0.05, n_steps=500)
+    assert not result['controlled']
+    assert result['energy'] == 0
+
+    # órbitas caóticas que pasan cerca de x* al final no están controladas
+    rng = np.random.default_rng(0)
+    r = rng.uniform(3.7, 4.0, 20_000)
+    x0 = rng.uniform(0.01, 0.99, 20_000)
+    result = simulate_control(r, 0.0, 0.05, x0=x0)
+    assert not result['controlled'].any()
+    assert np.all(result['time_to_control'] == -1)
+
+    with pytest.raises(ValueError):
+        simulate_control(3.9, 1.0, 0.05, method='pid')
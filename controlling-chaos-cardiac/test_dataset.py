@@ -0,0 +1,87 @@
+"""
+Pruebas de dataset: cada registro es la traza que daría la síntesis directa
+con su semilla, y el conjunto no depende del tamaño de bloque ni del número
+de procesos.
+"""
+
+import csv
+
+import numpy as np
+
+from ap_synthesis import synthesize_voltage
+from dataset import sample_parameters, generate_dataset
+from regime_sweep import classify_period, sweep_intervals
+
+
+def direct_record(params, i, seed, total_time, fs, n_intervals=200, transient=50):
+    intervals = sweep_intervals([params['r'][i]], n_intervals, params['x0'][i],
+                                params['scale_min'][i], params['scale_max'][i])
+    beat_times = np.cumsum(intervals[0])
+    beat_times = beat_times[beat_times <= total_time]
+
+    n_samples = int(total_time * fs)
+    v = synthesize_voltage(beat_times, n_samples, total_time / (n_samples - 1))
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(i + 1)[i])
+    v += params['noise'][i] * rng.standard_normal(n_samples)
+
+    period = classify_period(intervals[:, transient:])[0]
+    return np.clip(v, 0, 1.2), len(beat_times), period
+
+
+def test_records_match_direct_synthesis(tmp_path):
+    params = sample_parameters(12, seed=1)
+    meta = generate_dataset(tmp_path / 'a.npy', params, total_time=2.0, fs=200,
+                            seed=3, workers=1, block=5)
+    data = np.load(tmp_path / 'a.npy')
+    assert data.shape == (12, 400) and data.dtype == np.float32
+
+    for i in range(12):
+        v, n_beats, period = direct_record(params, i, 3, 2.0, 200)
+        np.testing.assert_allclose(data[i], v, atol=1e-6)
+        assert meta['n_beats'][i] == n_beats
+        assert meta['period'][i] == period
+
+    with open(tmp_path / 'a.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 12
+    assert [int(r['record']) for r in rows] == list(range(12))
+    np.testing.assert_allclose([float(r['r']) for r in rows], params['r'], rtol=1e-5)
+
+def test_blocks_do_not_change_the_dataset(tmp_path):
+    params = sample_parameters(30, seed=1)
+    kwargs = dict(total_time=2.0, fs=200, seed=3)
+
+    a = generate_dataset(tmp_path / 'a.npy', params, workers=1, block=30, **kwargs)
+    b = generate_dataset(tmp_path / 'b.npy', params, workers=1, block=7, **kwargs)
+    c = generate_dataset(tmp_path / 'c.npy', params, workers=2, block=4, **kwargs)
+
+    for other, name in ((b, 'b.npy'), (c, 'c.npy')):
+        np.testing.assert_array_equal(a['period'], other['period'])
+        np.testing.assert_array_equal(a['n_beats'], other['n_beats'])
+        np.testing.assert_array_equal(np.load(tmp_path / 'a.npy'),
+                                      np.load(tmp_path / name))
+
+def test_period_does_not_depend_on_the_block(tmp_path):
+    # 60 s necesitan más de 200 intervalos, tantos más cuanto menor es el
+    # scale_min del bloque; el periodo se clasifica igual en todos los casos.
+    # r = 3.0205 converge tan despacio que en una ventana más larga no
+    # llegaría a periodo 2
+    params = {'r': np.array([3.0205151, 3.5, 3.9]),
+              'x0': np.array([0.1255327, 0.3, 0.6]),
+              'noise': np.zeros(3),
+              'scale_min': np.array([0.15, 0.15, 0.10]),
+              'scale_max': np.array([0.40, 0.40, 0.40])}
+    kwargs = dict(total_time=60.0, fs=10, seed=0, workers=1)
+
+    a = generate_dataset(tmp_path / 'a.npy', params, block=3, **kwargs)
+    b = generate_dataset(tmp_path / 'b.npy', params, block=1, **kwargs)
+    np.testing.assert_array_equal(a['period'], b['period'])
+    np.testing.assert_array_equal(a['n_beats'], b['n_beats'])
+    np.testing.assert_array_equal(np.load(tmp_path / 'a.npy'),
+                                  np.load(tmp_path / 'b.npy'))
+
+    intervals = sweep_intervals(params['r'], 200, params['x0'],
+                                params['scale_min'], params['scale_max'])
+    np.testing.assert_array_equal(a['period'],
+                                  classify_period(intervals[:, 50:]))
+    assert a['period'][0] == 2
@@ -0,0 +1,64 @@
+"""
+Pruebas de hrv: recuento de vecinos (Fenwick) y entropías frente a la
+definición directa O(N^2).
+"""
+
+import numpy as np
+import pytest
+
+from hrv import match_counts, sample_entropy, approximate_entropy, sdnn, rmssd
+
+
+def series(n, seed=0):
+    # redondeada a 0.01 para que haya empates; r = 0.035 cae entre dos
+    # distancias posibles y el redondeo en el borde no cambia el recuento
+    return np.round(np.random.default_rng(seed).normal(0.8, 0.05, n), 2)
+
+def brute_counts(templates, r, both_sides=True):
+    d = np.abs(templates[:, None, :] - templates[None, :, :]).max(axis=2)
+    close = d <= r
+    np.fill_diagonal(close, False)
+    if not both_sides:
+        close = np.triu(close)
+    return close.sum(axis=1)
+
+def brute_sampen(x, m, r):
+    tol = r * np.std(x)
+    n = len(x) - m
+    B = brute_counts(np.lib.stride_tricks.sliding_window_view(x, m)[:n], tol).sum()
+    A = brute_counts(np.lib.stride_tricks.sliding_window_view(x, m + 1)[:n], tol).sum()
+    return -np.log(A / B)
+
+def brute_apen(x, m, r):
+    tol = r * np.std(x)
+
+    def phi(k):
+        t = np.lib.stride_tricks.sliding_window_view(x, k)
+        c = 1 + brute_counts(t, tol)
+        return np.mean(np.log(c / len(t)))
+
+    return phi(m) - phi(m + 1)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3, 4])
+@pytest.mark.parametrize('both_sides', [True, False])
+def test_match_counts(k, both_sides):
+    templates = np.lib.stride_tricks.sliding_window_view(series(400), k)
+    counts = match_counts(templates, 0.035, both_sides)
+
+    if both_sides:
+        np.testing.assert_array_equal(counts, brute_counts(templates, 0.035))
+    else:
+        # cada par se cuenta una vez, en uno de sus dos extremos
+        assert counts.sum() == brute_counts(templates, 0.035, False).sum()
+
+@pytest.mark.parametrize('m', [1, 2, 3])
+def test_entropies(m):
+    x = series(500, seed=m)
+    assert sample_entropy(x, m) == pytest.approx(brute_sampen(x, m, 0.2))
+    assert approximate_entropy(x, m) == pytest.approx(brute_apen(x, m, 0.2))
+
+def test_time_domain():
+    x = series(100)
+    assert sdnn(x) == pytest.approx(np.std(x, ddof=1))
+    assert rmssd(x) == pytest.approx(np.sqrt(np.mean((x[1:] - x[:-1]) ** 2)))
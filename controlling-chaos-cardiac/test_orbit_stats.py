@@ -0,0 +1,66 @@
+"""
+Pruebas de orbit_stats: los acumuladores por bloques dan lo mismo que
+numpy sobre la órbita entera.
+"""
+
+import numpy as np
+import pytest
+
+from orbit_stats import OrbitStats, orbit_stats
+
+
+def full_orbit(r, n, x0=0.5, scale_min=0.0, scale_max=1.0, transient=1000):
+    x = x0
+    for _ in range(transient):
+        x = r * x * (1 - x)
+    out = np.empty(n)
+    for i in range(n):
+        x = r * x * (1 - x)
+        out[i] = scale_min + (scale_max - scale_min) * x
+    return out
+
+def autocorrelation(y, max_lag):
+    d = y - y.mean()
+    return np.array([d[:len(y) - k] @ d[k:] / (len(y) - k)
+                     for k in range(max_lag + 1)]) / y.var()
+
+
+@pytest.mark.parametrize('chunk', [7, 100, 4096])
+def test_orbit_stats_matches_full_orbit(chunk):
+    y = full_orbit(3.9, 3000, scale_min=0.2, scale_max=0.4, transient=50)
+    stats = orbit_stats(3.9, 3000, scale_min=0.2, scale_max=0.4,
+                        transient=50, bins=40, max_lag=12, chunk=chunk)
+
+    assert stats.count == len(y)
+    assert stats.mean == pytest.approx(y.mean())
+    assert stats.var == pytest.approx(y.var())
+    assert (stats.min, stats.max) == (y.min(), y.max())
+    assert stats.outside == 0
+
+    edges, counts = stats.histogram(density=False)
+    np.testing.assert_array_equal(counts, np.histogram(y, edges)[0])
+    np.testing.assert_allclose(stats.autocorrelation(), autocorrelation(y, 12),
+                               atol=1e-10)
+
+def test_uneven_blocks_merge():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.standard_normal(2000)) * 0.01 + 5
+
+    stats = OrbitStats(bins=10, value_range=(4.9, 5.1), max_lag=30)
+    for block in np.split(y, [1, 3, 40, 41, 900, 1990]):
+        stats.update(block)
+    stats.update(y[:0])
+
+    assert stats.count == len(y)
+    assert stats.mean == pytest.approx(y.mean())
+    assert stats.std == pytest.approx(y.std())
+    assert stats.outside == np.sum((y < 4.9) | (y > 5.1))
+    np.testing.assert_allclose(stats.autocorrelation(), autocorrelation(y, 30),
+                               atol=1e-9)
+
+def test_short_series():
+    stats = OrbitStats(max_lag=20)
+    stats.update([0.1, 0.5, 0.3])
+    assert len(stats.autocorrelation()) == 3
+    np.testing.assert_allclose(stats.autocorrelation(),
+                               autocorrelation(np.array([0.1, 0.5, 0.3]), 2))
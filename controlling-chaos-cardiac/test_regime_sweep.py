@@ -0,0 +1,51 @@
+"""
+Pruebas de regime_sweep: el barrido coincide con `generate_intervals` r a
+r y la clasificación encuentra los periodos conocidos del mapa logístico.
+"""
+
+import numpy as np
+
+from regime_sweep import (CHAOS, sweep_intervals, classify_period, regime_map,
+                          regime_segments, regime_codes)
+
+
+def generate_intervals(r, n_intervals=150, x0=0.5, scale_min=0.20, scale_max=0.40):
+    # la de controlling-chaos-cardiac.py
+    x = x0
+    intervals = []
+    for _ in range(n_intervals):
+        x = r * x * (1 - x)
+        intervals.append(x)
+    return scale_min + (scale_max - scale_min) * np.array(intervals)
+
+
+def test_sweep_matches_generate_intervals():
+    r = np.linspace(2.5, 4.0, 31)
+    intervals = sweep_intervals(r, 120, x0=0.3, scale_min=0.1, scale_max=0.5)
+    assert intervals.shape == (31, 120)
+    for row, ri in zip(intervals, r):
+        np.testing.assert_allclose(row, generate_intervals(ri, 120, 0.3, 0.1, 0.5))
+
+def test_known_periods():
+    # periodo 1, 2, 4, 8, la ventana de periodo 3 y caos
+    r = np.array([2.8, 3.2, 3.5, 3.55, 3.83, 3.9, 3.97])
+    intervals = sweep_intervals(r, 2000)[:, 1000:]
+    np.testing.assert_array_equal(classify_period(intervals),
+                                  [1, 2, 4, 8, 3, CHAOS, CHAOS])
+
+def test_short_stationary_part_shows_period_doubling():
+    # con 200 intervalos, justo después de r = 3 aún no ha convergido
+    r, period = regime_map(2.9, 3.1, 0.01)
+    assert period[0] == 1 and period[-1] == 2
+    assert np.all(np.diff(period) >= 0)
+
+def test_segments_and_codes():
+    r = np.arange(8) * 0.1
+    period = np.array([1, 1, 2, 2, 2, 0, 3, 16], dtype=np.int16)
+
+    starts, ends, periods = regime_segments(r, period)
+    np.testing.assert_allclose(starts, [0.0, 0.2, 0.5, 0.6, 0.7])
+    np.testing.assert_allclose(ends, [0.1, 0.4, 0.5, 0.6, 0.7])
+    np.testing.assert_array_equal(periods, [1, 2, 0, 3, 16])
+
+    np.testing.assert_array_equal(regime_codes(period), [0, 0, 1, 1, 1, 5, 4, 3])
@@ -0,0 +1,64 @@
+"""
+Pruebas de rqa: histogramas de líneas sobre filas empaquetadas frente a la
+matriz de recurrencia densa.
+"""
+
+import numpy as np
+import pytest
+
+from rqa import embed, recurrence_matrix, unpack, line_histograms, rqa
+
+
+def logistic(r, n, x=0.3):
+    out = np.empty(n)
+    for i in range(n):
+        x = r * x * (1 - x)
+        out[i] = x
+    return out
+
+def dense_matrix(series, eps, dim, theiler):
+    p = embed(series, dim)
+    R = np.abs(p[:, None, :] - p[None, :, :]).max(axis=2) <= eps
+    i, j = np.indices(R.shape)
+    return R & (np.abs(i - j) >= theiler)
+
+def runs(line):
+    """Longitudes de los tramos de unos de un vector booleano."""
+    edges = np.diff(np.concatenate([[0], line.astype(int), [0]]))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+def brute_histograms(R):
+    n = len(R)
+    diag = np.zeros(n + 2, dtype=np.int64)
+    vert = np.zeros(n + 2, dtype=np.int64)
+    for k in range(-n + 1, n):
+        np.add.at(diag, runs(np.diagonal(R, k)), 1)
+    for j in range(n):
+        np.add.at(vert, runs(R[:, j]), 1)
+    return diag, vert
+
+
+@pytest.mark.parametrize('dim, theiler, tile', [(1, 1, 1024), (1, 0, 7),
+                                                (2, 3, 64), (3, 1, 50)])
+def test_line_histograms(dim, theiler, tile):
+    # caos con ruido: diagonales y verticales de muchas longitudes
+    x = logistic(3.9, 300) + 0.01 * np.random.default_rng(0).random(300)
+    R = dense_matrix(x, 0.05, dim, theiler)
+
+    diag, vert = line_histograms(x, 0.05, dim=dim, theiler=theiler, tile=tile)
+    expected_diag, expected_vert = brute_histograms(R)
+
+    np.testing.assert_array_equal(diag, expected_diag)
+    np.testing.assert_array_equal(vert, expected_vert)
+
+def test_recurrence_matrix():
+    x = logistic(3.7, 200)
+    np.testing.assert_array_equal(unpack(recurrence_matrix(x, 0.02, 2, theiler=2), 199),
+                                  dense_matrix(x, 0.02, 2, 2))
+
+def test_period_4_is_deterministic():
+    # periodo 4: todo en diagonales largas
+    stats = rqa(logistic(3.5, 2100)[100:], eps=1e-3)
+    assert stats['RR'] == pytest.approx(0.25, abs=1e-3)
+    assert stats['DET'] == pytest.approx(1.0)
+    assert rqa(logistic(3.9, 2000), eps=1e-3)['DET'] < 0.9
@@ -0,0 +1,68 @@
+"""
+Pruebas de state_table: cada fila es el estado que se calcularía al mover
+el slider, la rellene el hilo o se pida antes de tiempo.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from ap_synthesis import synthesize_voltage
+from regime_sweep import sweep_intervals
+from state_table import StateTable
+
+
+def direct_state(r, i, total_time=2.0, fs=500, noise=0.02, seed=0,
+                 n_intervals=60, transient=10):
+    """Intervalos, voltaje y puntos de Poincaré para un solo r."""
+    intervals = sweep_intervals([r], n_intervals)[0]
+    t = np.linspace(0, total_time, int(total_time * fs))
+
+    beat_times = np.cumsum(intervals)
+    v = synthesize_voltage(beat_times[beat_times <= total_time], len(t),
+                           total_time / (len(t) - 1))
+    v += noise * np.random.default_rng((seed, i)).standard_normal(len(v))
+    np.clip(v, 0, 1.2, out=v)
+
+    offsets = np.c_[intervals[transient:-1], intervals[transient + 1:]]
+    return t, v, offsets
+
+def small_table(**kwargs):
+    return StateTable(3.0, 3.5, 0.05, n_intervals=60, transient=10,
+                      total_time=2.0, fs=500, **kwargs)
+
+
+def test_lookup_matches_direct_state():
+    table = small_table(dtype=np.float64)
+    for i, r in enumerate(table.r):
+        t, v, offsets = table.lookup(r)
+        t0, v0, offsets0 = direct_state(r, i)
+        np.testing.assert_allclose(t, t0)
+        np.testing.assert_allclose(v, v0, atol=1e-12)
+        np.testing.assert_allclose(offsets, offsets0, atol=1e-12)
+    assert table.ready.all()
+
+def test_background_fill_gives_the_same_rows():
+    eager = small_table(seed=3)
+    done = threading.Event()
+    eager.start(on_done=lambda table: done.set())
+    assert done.wait(10)
+    assert eager.ready.all()
+
+    lazy = small_table(seed=3)
+    for r in lazy.r[::-1]:
+        np.testing.assert_array_equal(lazy.lookup(r)[1], eager.lookup(r)[1])
+    assert eager.voltage.dtype == np.float32
+
+def test_grid():
+    table = small_table()
+    assert len(table.r) == 11
+    assert table.index(3.2) == 4
+    assert table.index(3.2 + 1e-12) == 4
+    assert table.index(3.225) is None
+    assert table.lookup(2.9) is None
+    assert '11 valores de r' in table.report()
+
+    with pytest.raises(ValueError):
+        StateTable(2.5, 4.0, 0.01, max_bytes=2**20)